@@ -0,0 +1,128 @@
+# benchmarks/conftest.py
+"""
+Fixtures and reporting for the endpoint benchmarks.
+
+The benchmarks are skipped by a plain ``pytest`` run; run them with
+``pytest benchmarks`` (or ``RUN_BENCHMARKS=1``). Environment knobs:
+
+    BENCHMARK_SCALE          Data volume relative to the generator sizes (default 1)
+    BENCHMARK_ROUNDS         Measured requests per benchmark (default 5)
+    BENCHMARK_TOLERANCE      Allowed relative slowdown of the median (default 0.5)
+    BENCHMARK_STRICT_TIMING  Fail, instead of warn, on a slower median
+    BENCHMARK_UPDATE         Write the measurements to baselines.json
+"""
+from pathlib import Path
+from types import SimpleNamespace
+
+import decouple
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+
+from benchmarks.harness import Baselines, measure, report_rows
+
+BENCHMARKS_DIR = Path(__file__).parent
+
+SCALE = decouple.config('BENCHMARK_SCALE', default=1.0, cast=float)
+ROUNDS = decouple.config('BENCHMARK_ROUNDS', default=5, cast=int)
+TOLERANCE = decouple.config('BENCHMARK_TOLERANCE', default=0.5, cast=float)
+STRICT_TIMING = decouple.config('BENCHMARK_STRICT_TIMING', default=False, cast=bool)
+UPDATE_BASELINES = decouple.config('BENCHMARK_UPDATE', default=False, cast=bool)
+
+_comparisons = []
+
+
+def _requested_explicitly(config):
+    for arg in config.args:
+        path = Path(str(arg).split('::')[0]).resolve()
+        if path == BENCHMARKS_DIR or BENCHMARKS_DIR in path.parents:
+            return True
+    return False
+
+
+def pytest_ignore_collect(collection_path, config):
+    if collection_path.name.startswith('test_') and BENCHMARKS_DIR in collection_path.parents:
+        enabled = decouple.config('RUN_BENCHMARKS', default=False, cast=bool) or _requested_explicitly(config)
+        return None if enabled else True
+    return None
+
+
+@pytest.fixture(scope='session')
+def bench_data(django_db_setup, django_db_blocker):
+    """Seed every benchmark dataset once per session and remove it afterwards."""
+    from benchmarks import generators
+
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            user = generators.create_bench_user()
+            sacco, passbook = generators.seed_sacco(user, scale=SCALE)
+            batch, activated_qr_codes = generators.seed_tickets(user, scale=SCALE)
+            generators.seed_personal_finance(user, scale=SCALE)
+            generators.seed_company_finance(scale=SCALE)
+            generators.seed_tasks(user, scale=SCALE)
+        cache.clear()
+
+    yield SimpleNamespace(
+        user=user, sacco=sacco, passbook=passbook, batch=batch, activated_qr_codes=activated_qr_codes,
+    )
+
+    with django_db_blocker.unblock():
+        # With --reuse-db on a server database the seeded rows would otherwise persist
+        call_command('flush', interactive=False, verbosity=0)
+    cache.clear()
+
+
+@pytest.fixture
+def api_client(bench_data):
+    """A client authenticated as the benchmark user through the normal JWT path."""
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(bench_data.user)}')
+    return client
+
+
+@pytest.fixture
+def benchmark():
+    """
+    Measure a request and check it against its baseline.
+
+    Usage: ``benchmark('label', lambda: client.get(url), before_each=None, expected_status=200)``
+    """
+    baselines = Baselines(SCALE)
+
+    def run(label, request, **kwargs):
+        kwargs.setdefault('rounds', ROUNDS)
+        measurement = measure(label, request, **kwargs)
+        comparison = baselines.compare(measurement, tolerance=TOLERANCE, strict_timing=STRICT_TIMING)
+        _comparisons.append(comparison)
+        if comparison.failures and not UPDATE_BASELINES:
+            pytest.fail('\n'.join(comparison.failures))
+        return measurement
+
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if UPDATE_BASELINES and _comparisons:
+        Baselines(SCALE).update(comparison.measurement for comparison in _comparisons)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _comparisons:
+        return
+
+    headers = ('benchmark', 'queries', 'baseline', 'median ms', 'baseline', 'max ms', 'status')
+    rows = report_rows(_comparisons)
+    widths = [max(len(row[index]) for row in [headers, *rows]) for index in range(len(headers))]
+
+    terminalreporter.section(f'endpoint benchmarks (scale={SCALE:g}, rounds={ROUNDS})')
+    for row in [headers, *rows]:
+        terminalreporter.write_line('  '.join(value.ljust(width) for value, width in zip(row, widths)))
+    for comparison in _comparisons:
+        for message in comparison.warnings:
+            terminalreporter.write_line(f'WARNING {message}', yellow=True)
+    if UPDATE_BASELINES:
+        terminalreporter.write_line(f'Baselines for scale={SCALE:g} written to {Baselines(SCALE).path}')
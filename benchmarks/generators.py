@@ -0,0 +1,289 @@
+# benchmarks/generators.py
+"""
+Synthetic data generators for the endpoint benchmarks.
+
+Each generator bulk-inserts a realistic volume of rows for one area of the API
+(``bulk_create`` skips ``save()`` and signals, so derived values such as running
+balances, account balances and usage counters are computed here instead). The
+sizes below are the volumes at ``scale=1``; every generator takes a ``scale`` so
+the same suite can run quickly on a laptop and at full size before a release.
+Data is generated from a fixed seed, so runs at the same scale are comparable.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from common.enums import (
+    AccountType, FinanceScope, PaymentCategory, PersonalExpenseCategory, PersonalIncomeSource,
+    PriorityLevel, TaskStatus,
+)
+from finance.models import Account, PersonalTransaction, Transaction
+from saccos.models import MemberPassbook, PassbookEntry, PassbookSection, SaccoMember, SaccoOrganization
+from tasks.models import Task
+from ticketing.models import Batch, Event, Ticket
+from users.models import User
+
+SACCO_MEMBERS = 2000
+PASSBOOK_YEARS = 3
+TICKETS_PER_BATCH = 10000
+PERSONAL_TRANSACTIONS = 100000
+COMPANY_TRANSACTIONS = 20000
+TASKS = 5000
+
+BATCH_SIZE = 5000
+SEED = 20250101
+
+PASSBOOK_SECTIONS = [
+    ('Compulsory Savings', 'savings', Decimal('20000')),
+    ('Welfare', 'welfare', Decimal('5000')),
+    ('Development', 'development', Decimal('10000')),
+]
+
+
+def scaled(size, scale, minimum=1):
+    return max(minimum, int(size * scale))
+
+
+def _month_starts(years, today=None):
+    """First day of each of the last ``years`` years of months, oldest first."""
+    today = today or timezone.localdate()
+    first = date(today.year - years, today.month, 1)
+    months = []
+    while first <= today:
+        months.append(first)
+        first = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return months
+
+
+def create_bench_user(username='bench'):
+    """The user every benchmark request is made as (created normally, so signals run)."""
+    return User.objects.create_user(
+        username=username, email=f'{username}@bench.example.com', password='bench-pass-123',
+        is_verified=True,
+    )
+
+
+def seed_sacco(owner, scale=1.0, years=PASSBOOK_YEARS, rng=None):
+    """
+    A SACCO with ``SACCO_MEMBERS`` members, each with a passbook holding a monthly
+    contribution per section (plus the odd welfare payout) for ``years`` years.
+
+    ``owner`` joins as the chairperson, so the passbook endpoints can be called as them.
+
+    Returns:
+        tuple: (SaccoOrganization, owner's MemberPassbook)
+    """
+    rng = rng or random.Random(SEED)
+    sacco = SaccoOrganization.objects.create(name='Benchmark SACCO', registration_number='BENCH-SACCO')
+    sacco.admins.add(owner)
+    sections = [
+        PassbookSection.objects.create(
+            sacco=sacco, name=name, section_type=section_type, weekly_amount=amount,
+            is_compulsory=section_type == 'savings', display_order=order,
+        )
+        for order, (name, section_type, amount) in enumerate(PASSBOOK_SECTIONS)
+    ]
+
+    member_count = scaled(SACCO_MEMBERS, scale)
+    password = make_password(None)
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=f'bench_member_{index}', email=f'bench_member_{index}@bench.example.com',
+                first_name='Member', last_name=str(index), password=password,
+                role=User.Role.SACCO_MEMBER,
+            )
+            for index in range(1, member_count)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    members = SaccoMember.objects.bulk_create(
+        [SaccoMember(user=owner, sacco=sacco, member_number='M00000', role='Chairperson', is_chairperson=True)]
+        + [
+            SaccoMember(user=user, sacco=sacco, member_number=f'M{index:05d}')
+            for index, user in enumerate(users, start=1)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    passbooks = MemberPassbook.objects.bulk_create(
+        [
+            MemberPassbook(member=member, sacco=sacco, passbook_number=f'BENCH-{member.member_number}')
+            for member in members
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    months = _month_starts(years)
+    entries = []
+    for passbook in passbooks:
+        for section in sections:
+            balance = Decimal('0')
+            for month in months:
+                amount = section.weekly_amount * rng.choice((2, 4, 4, 5))
+                balance += amount
+                entries.append(PassbookEntry(
+                    passbook=passbook, section=section, transaction_date=month + timedelta(days=rng.randrange(28)),
+                    transaction_type='credit', amount=amount, balance_after=balance,
+                    description=f'{section.name} contribution', recorded_by=owner,
+                ))
+                if section.section_type == 'welfare' and rng.random() < 0.05:
+                    payout = min(balance, section.weekly_amount * 6)
+                    balance -= payout
+                    entries.append(PassbookEntry(
+                        passbook=passbook, section=section, transaction_date=month + timedelta(days=27),
+                        transaction_type='debit', amount=payout, balance_after=balance,
+                        description='Welfare payout', recorded_by=owner,
+                    ))
+        if len(entries) >= BATCH_SIZE:
+            PassbookEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+            entries = []
+    PassbookEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+
+    from saccos.services.subscription_service import SubscriptionService
+
+    SubscriptionService.recount_usage_counters([sacco])
+    return sacco, passbooks[0]
+
+
+def seed_tickets(owner, scale=1.0, rng=None):
+    """
+    An event owned by ``owner`` with one full batch of tickets: mostly activated,
+    some already scanned and the rest unsold.
+
+    Returns:
+        tuple: (Batch, list of activated ticket QR codes)
+    """
+    rng = rng or random.Random(SEED)
+    now = timezone.now()
+    event = Event.objects.create(
+        name='Benchmark Festival', date=now + timedelta(days=7), venue='Bench Grounds', created_by=owner,
+    )
+    quantity = min(scaled(TICKETS_PER_BATCH, scale), TICKETS_PER_BATCH)
+    batch = Batch.objects.create(event=event, quantity=quantity, created_by=owner)
+
+    tickets = []
+    for index in range(quantity):
+        roll = rng.random()
+        status = 'activated' if roll < 0.7 else 'scanned' if roll < 0.85 else 'unused'
+        tickets.append(Ticket(
+            batch=batch, short_code=f'BN{index:06d}', qr_code=f'TTBENCH{index:010d}', status=status,
+            activated_at=now if status != 'unused' else None,
+            activated_by=owner if status != 'unused' else None,
+            scanned_at=now if status == 'scanned' else None,
+            scanned_by=owner if status == 'scanned' else None,
+        ))
+    Ticket.objects.bulk_create(tickets, batch_size=BATCH_SIZE)
+    return batch, [ticket.qr_code for ticket in tickets if ticket.status == 'activated']
+
+
+def seed_personal_finance(user, scale=1.0, years=PASSBOOK_YEARS, rng=None):
+    """
+    Personal accounts for ``user`` with ``PERSONAL_TRANSACTIONS`` transactions spread
+    over ``years`` years up to now; account balances are set from the totals.
+
+    Returns:
+        list: The user's personal Accounts
+    """
+    rng = rng or random.Random(SEED)
+    accounts = [
+        Account.objects.create(
+            name=name, type=account_type, scope=FinanceScope.PERSONAL, owner=user, domain='studio',
+        )
+        for name, account_type in (('Bench Bank', AccountType.PERSONAL_BANK), ('Bench Wallet', AccountType.WALLET))
+    ]
+
+    now = timezone.now()
+    span = int(timedelta(days=365 * years).total_seconds())
+    sources = [choice for choice, _ in PersonalIncomeSource.choices]
+    categories = [choice for choice, _ in PersonalExpenseCategory.choices]
+    balances = {account.pk: Decimal('0') for account in accounts}
+    transactions = []
+    for _ in range(scaled(PERSONAL_TRANSACTIONS, scale)):
+        account = rng.choice(accounts)
+        is_income = rng.random() < 0.3
+        amount = Decimal(rng.randrange(1000, 500000 if is_income else 150000, 500))
+        charge = Decimal('0') if is_income else Decimal(rng.choice((0, 0, 500, 1000)))
+        balances[account.pk] += amount if is_income else -(amount + charge)
+        transactions.append(PersonalTransaction(
+            user=user, account=account, type='income' if is_income else 'expense', amount=amount,
+            transaction_charge=charge,
+            income_source=rng.choice(sources) if is_income else '',
+            expense_category='' if is_income else rng.choice(categories),
+            description='Benchmark transaction', reason='Benchmark',
+            date=now - timedelta(seconds=rng.randrange(span)),
+        ))
+        if len(transactions) >= BATCH_SIZE:
+            PersonalTransaction.objects.bulk_create(transactions)
+            transactions = []
+    PersonalTransaction.objects.bulk_create(transactions)
+
+    for account in accounts:
+        account.balance = balances[account.pk]
+    Account.objects.bulk_update(accounts, ['balance'])
+    return accounts
+
+
+def seed_company_finance(scale=1.0, years=PASSBOOK_YEARS, rng=None):
+    """
+    Studio accounts with ``COMPANY_TRANSACTIONS`` income/expense transactions,
+    the data behind the finance summary.
+
+    Returns:
+        list: The company Accounts
+    """
+    rng = rng or random.Random(SEED)
+    accounts = [
+        Account.objects.create(name=name, type=account_type, scope=FinanceScope.COMPANY, domain='studio')
+        for name, account_type in (('Studio Bank', AccountType.BANK), ('Studio Mobile Money', AccountType.MOBILE_MONEY))
+    ]
+
+    today = timezone.localdate()
+    days = 365 * years
+    categories = [choice for choice, _ in PaymentCategory.choices]
+    transactions = []
+    for _ in range(scaled(COMPANY_TRANSACTIONS, scale)):
+        is_income = rng.random() < 0.4
+        transactions.append(Transaction(
+            type='income' if is_income else 'expense', account=rng.choice(accounts),
+            amount=Decimal(rng.randrange(10000, 5000000, 1000)),
+            transaction_charge=Decimal('0') if is_income else Decimal(rng.choice((0, 1000, 2500))),
+            category=rng.choice(categories), description='Benchmark transaction',
+            date=today - timedelta(days=rng.randrange(days)),
+        ))
+    Transaction.objects.bulk_create(transactions, batch_size=BATCH_SIZE)
+    return accounts
+
+
+def seed_tasks(user, scale=1.0, rng=None):
+    """
+    ``TASKS`` tasks visible to ``user``: most created by them, the rest created by
+    someone else and assigned to them through ``assigned_users``.
+
+    Returns:
+        int: Number of tasks created
+    """
+    rng = rng or random.Random(SEED)
+    colleague = create_bench_user('bench_colleague')
+    now = timezone.now()
+    statuses = [choice for choice, _ in TaskStatus.choices]
+    priorities = [choice for choice, _ in PriorityLevel.choices]
+    tasks = []
+    for index in range(scaled(TASKS, scale)):
+        status = rng.choice(statuses)
+        tasks.append(Task(
+            title=f'Benchmark task {index}', status=status, priority=rng.choice(priorities),
+            due_date=now + timedelta(days=rng.randrange(-60, 90)) if rng.random() < 0.7 else None,
+            is_completed=status == TaskStatus.DONE, position=index,
+            created_by=user if rng.random() < 0.8 else colleague,
+        ))
+    tasks = Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+
+    Assignment = Task.assigned_users.through
+    Assignment.objects.bulk_create(
+        [Assignment(task_id=task.pk, user_id=user.pk) for task in tasks if task.created_by_id == colleague.pk],
+        batch_size=BATCH_SIZE,
+    )
+    return len(tasks)
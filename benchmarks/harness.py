@@ -0,0 +1,156 @@
+# benchmarks/harness.py
+"""
+Timing, query counting and baseline comparison for the endpoint benchmarks.
+
+A benchmark is a labelled request run ``rounds`` times after a warm-up; its
+median latency and query count are compared with ``baselines.json``, keyed by
+data scale. More queries than the baseline always fails (query counts are
+deterministic); a slower median only warns unless strict timing is on, since
+wall-clock numbers depend on the machine.
+"""
+import json
+import statistics
+import time
+from pathlib import Path
+
+from common.query_stats import QueryStats
+
+BASELINES_PATH = Path(__file__).with_name('baselines.json')
+
+
+class Measurement:
+    """Latencies of the measured rounds of one benchmark and its query count."""
+
+    def __init__(self, label, queries, timings_ms):
+        self.label = label
+        self.queries = queries
+        self.timings_ms = timings_ms
+
+    @property
+    def median_ms(self):
+        return round(statistics.median(self.timings_ms), 2)
+
+    @property
+    def max_ms(self):
+        return round(max(self.timings_ms), 2)
+
+    def as_baseline(self):
+        return {'queries': self.queries, 'median_ms': self.median_ms}
+
+
+class Comparison:
+    """A measurement checked against its baseline (``None`` when there is none yet)."""
+
+    def __init__(self, measurement, baseline=None):
+        self.measurement = measurement
+        self.baseline = baseline
+        self.failures = []
+        self.warnings = []
+
+    @property
+    def status(self):
+        if self.failures:
+            return 'REGRESSION'
+        if self.warnings:
+            return 'slower'
+        return 'new' if self.baseline is None else 'ok'
+
+
+def measure(label, request, rounds=5, warmup=1, before_each=None, expected_status=200):
+    """
+    Time ``request()`` and count its queries.
+
+    Args:
+        label: Benchmark name (the baseline key)
+        request: Callable returning a test client response
+        rounds: Measured runs
+        warmup: Unmeasured runs first (fill caches, compile statements)
+        before_each: Optional callable run untimed before every call (e.g. to pick fresh data)
+        expected_status: Status code every response must have
+
+    Returns:
+        Measurement: Timings of every round and the largest query count seen
+    """
+    timings, queries = [], 0
+    for index in range(warmup + rounds):
+        if before_each is not None:
+            before_each()
+        with QueryStats() as stats:
+            start = time.perf_counter()
+            response = request()
+            elapsed = (time.perf_counter() - start) * 1000
+        assert response.status_code == expected_status, (
+            f"{label}: expected {expected_status}, got {response.status_code}: {getattr(response, 'data', '')}"
+        )
+        if index >= warmup:
+            timings.append(elapsed)
+            queries = max(queries, stats.count)
+    return Measurement(label, queries, timings)
+
+
+class Baselines:
+    """The stored ``{scale: {label: {'queries', 'median_ms'}}}`` baselines."""
+
+    def __init__(self, scale, path=BASELINES_PATH):
+        self.path = Path(path)
+        self.scale_key = f'scale={scale:g}'
+        self.data = json.loads(self.path.read_text()) if self.path.exists() else {}
+
+    def get(self, label):
+        return self.data.get(self.scale_key, {}).get(label)
+
+    def compare(self, measurement, tolerance=0.5, strict_timing=False):
+        """
+        Check a measurement against its baseline.
+
+        Args:
+            measurement: Measurement to check
+            tolerance: Allowed relative slowdown of the median (0.5 = 50%)
+            strict_timing: Treat a slower median as a failure instead of a warning
+
+        Returns:
+            Comparison: With failure/warning messages (no baseline means nothing to compare)
+        """
+        baseline = self.get(measurement.label)
+        comparison = Comparison(measurement, baseline)
+        if baseline is None:
+            return comparison
+
+        if measurement.queries > baseline['queries']:
+            comparison.failures.append(
+                f"{measurement.label}: {measurement.queries} queries (baseline {baseline['queries']})"
+            )
+        limit = baseline['median_ms'] * (1 + tolerance)
+        if measurement.median_ms > limit:
+            message = (
+                f"{measurement.label}: median {measurement.median_ms}ms "
+                f"(baseline {baseline['median_ms']}ms, limit {limit:.2f}ms)"
+            )
+            (comparison.failures if strict_timing else comparison.warnings).append(message)
+        return comparison
+
+    def update(self, measurements):
+        """Replace this scale's baselines for the given measurements and write the file."""
+        entries = self.data.setdefault(self.scale_key, {})
+        for measurement in measurements:
+            entries[measurement.label] = measurement.as_baseline()
+        self.data = {key: dict(sorted(value.items())) for key, value in sorted(self.data.items())}
+        self.path.write_text(json.dumps(self.data, indent=2) + '\n')
+
+
+def report_rows(comparisons):
+    """Rows for the end-of-session table."""
+    rows = []
+    for comparison in comparisons:
+        measurement, baseline = comparison.measurement, comparison.baseline or {}
+        rows.append((
+            measurement.label,
+            str(measurement.queries),
+            str(baseline.get('queries', '-')),
+            f'{measurement.median_ms:.2f}',
+            f"{baseline['median_ms']:.2f}" if 'median_ms' in baseline else '-',
+            f'{measurement.max_ms:.2f}',
+            comparison.status,
+        ))
+    return rows
+
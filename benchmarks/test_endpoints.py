@@ -0,0 +1,50 @@
+# benchmarks/test_endpoints.py
+"""Latency and query-count benchmarks for the busiest API endpoints."""
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+
+def test_passbook_balances(bench_data, api_client, benchmark):
+    url = f'/api/saccos/passbooks/{bench_data.passbook.id}/balances/'
+    benchmark('passbook_balances', lambda: api_client.get(url))
+
+    balances = api_client.get(url).data
+    assert len(balances) == 3
+    assert all(section['balance'] > 0 for section in balances.values())
+
+
+def test_sacco_dashboard(bench_data, api_client, benchmark):
+    url = f'/api/saccos/{bench_data.sacco.id}/analytics/dashboard/'
+    benchmark('sacco_dashboard_refresh', lambda: api_client.get(url, {'refresh': 'true'}))
+    benchmark('sacco_dashboard_cached', lambda: api_client.get(url))
+
+
+def test_ticket_verify(bench_data, api_client, benchmark):
+    codes = iter(bench_data.activated_qr_codes)
+    payload = {}
+
+    def next_ticket():
+        # Each scan consumes an activated ticket; a repeat would take the duplicate path
+        payload['qr_code'] = next(codes)
+
+    benchmark(
+        'ticket_verify',
+        lambda: api_client.post('/api/ticketing/tickets/verify/', payload, format='json'),
+        before_each=next_ticket,
+    )
+    response = api_client.post('/api/ticketing/tickets/verify/', payload, format='json')
+    assert response.data['error'] == 'Already scanned'
+
+
+def test_personal_finance_dashboard(api_client, benchmark):
+    benchmark('personal_finance_dashboard', lambda: api_client.get('/api/finance/personal/dashboard/'))
+
+
+def test_finance_summary(api_client, benchmark):
+    benchmark('finance_summary', lambda: api_client.get('/api/finance/summary/'))
+
+
+def test_task_list(api_client, benchmark):
+    benchmark('task_list', lambda: api_client.get('/api/tasks/'))
+    benchmark('task_list_sparse', lambda: api_client.get('/api/tasks/', {'fields': 'id,title,status,dueDate'}))
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     SaccoEnterprise, EnterpriseConfiguration,
-    StockItem, StockMovement,
+    StockItem, StockMovement, StockSnapshot,
     Sale, SaleItem
 )
 from .services.business_service import BusinessService
@@ -104,7 +104,7 @@ class StockItemAdmin(admin.ModelAdmin):
     list_filter = ['enterprise', 'category', 'is_active']
     search_fields = ['name', 'sku', 'description', 'barcode']
     readonly_fields = [
-        'uuid', 'created_at', 'updated_at', 'total_value', 'profit_margin',
+        'uuid', 'quantity_on_hand', 'created_at', 'updated_at', 'total_value', 'profit_margin',
         'is_pack_item', 'unit_cost_from_pack', 'pack_revenue', 'pack_profit', 'pack_profit_margin'
     ]
     
@@ -193,6 +193,24 @@ class StockMovementAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = [
+        'stock_item', 'period_end', 'quantity', 'unit_cost',
+        'value', 'quantity_in', 'quantity_out', 'cogs'
+    ]
+    list_filter = ['period_end', 'stock_item__enterprise']
+    search_fields = ['stock_item__name']
+    date_hierarchy = 'period_end'
+    
+    def has_add_permission(self, request):
+        # Built by the snapshot_stock command
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # ============================================================================
 # PHASE 3: SALES MANAGEMENT ADMIN
 # ============================================================================
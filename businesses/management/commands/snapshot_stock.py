@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from businesses.models import SaccoEnterprise, StockMovement
+from businesses.services.stock_service import StockService
+
+
+def month_end(month_start):
+    return (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+class Command(BaseCommand):
+    help = "Write month-end stock snapshots (defaults to last month). Months are built in order."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', type=str, default=None, help='Month to snapshot (YYYY-MM)')
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Rebuild every month from the first recorded movement up to --month'
+        )
+        parser.add_argument('--enterprise-id', type=int, help='Limit to one enterprise')
+
+    def handle(self, *args, **options):
+        if options.get('month'):
+            try:
+                last_month = date.fromisoformat(f"{options['month']}-01")
+            except ValueError:
+                self.stdout.write(self.style.ERROR(f"Invalid month format: {options['month']}. Use YYYY-MM."))
+                return
+        else:
+            last_month = (timezone.now().date().replace(day=1) - timedelta(days=1)).replace(day=1)
+
+        enterprise = None
+        movements = StockMovement.objects.all()
+        if options.get('enterprise_id'):
+            enterprise = SaccoEnterprise.objects.filter(id=options['enterprise_id']).first()
+            if enterprise is None:
+                self.stdout.write(self.style.ERROR(f"Enterprise {options['enterprise_id']} not found"))
+                return
+            movements = movements.filter(stock_item__enterprise=enterprise)
+
+        month = last_month
+        if options['rebuild']:
+            first_date = movements.order_by('movement_date').values_list('movement_date', flat=True).first()
+            if first_date:
+                month = min(first_date.replace(day=1), last_month)
+
+        total = 0
+        while month <= last_month:
+            written = StockService.build_stock_snapshots(month_end(month), enterprise=enterprise)
+            total += written
+            self.stdout.write(f"✓ {month:%Y-%m}: {written} items")
+            month = month_end(month) + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"\nCompleted! Wrote {total} stock snapshots."))
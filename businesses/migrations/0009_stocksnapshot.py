@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:05
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0008_add_pack_pricing_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False)),
+                ('period_end', models.DateField(help_text='Last day of the snapshot period')),
+                ('quantity', models.IntegerField(default=0, help_text='Closing quantity from the movement ledger')),
+                ('unit_cost', models.DecimalField(decimal_places=2, default=0, help_text='Unit cost of the latest movement up to period end', max_digits=15)),
+                ('value', models.DecimalField(decimal_places=2, default=0, help_text='quantity × unit_cost', max_digits=15)),
+                ('quantity_in', models.IntegerField(default=0)),
+                ('quantity_out', models.IntegerField(default=0)),
+                ('cogs', models.DecimalField(decimal_places=2, default=0, help_text='Cost of stock issued for sales in the period', max_digits=15)),
+                ('stock_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='businesses.stockitem')),
+            ],
+            options={
+                'db_table': 'businesses_stock_snapshot',
+                'ordering': ['-period_end'],
+                'indexes': [models.Index(fields=['period_end'], name='businesses__period__046a7a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('stock_item', 'period_end'), name='uniq_stock_snapshot_period')],
+            },
+        ),
+    ]
@@ -405,6 +405,63 @@ class StockMovement(BaseModel):
         return abs(self.quantity) * self.unit_cost
 
 
+class StockSnapshot(BaseModel):
+    """
+    Month-end stock position of an item, rolled up from its movements.
+    
+    Each snapshot carries the closing quantity forward from the previous one, so
+    as-of valuation only replays the movements recorded after the latest snapshot.
+    Built by StockService.build_stock_snapshots (see the snapshot_stock command).
+    """
+    stock_item = models.ForeignKey(
+        StockItem,
+        on_delete=models.CASCADE,
+        related_name='snapshots'
+    )
+    period_end = models.DateField(help_text="Last day of the snapshot period")
+    
+    # Closing position
+    quantity = models.IntegerField(
+        default=0,
+        help_text="Closing quantity from the movement ledger"
+    )
+    unit_cost = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=0,
+        help_text="Unit cost of the latest movement up to period end"
+    )
+    value = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=0,
+        help_text="quantity × unit_cost"
+    )
+    
+    # Activity during the period
+    quantity_in = models.IntegerField(default=0)
+    quantity_out = models.IntegerField(default=0)
+    cogs = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=0,
+        help_text="Cost of stock issued for sales in the period"
+    )
+    
+    class Meta:
+        db_table = 'businesses_stock_snapshot'
+        ordering = ['-period_end']
+        constraints = [
+            models.UniqueConstraint(fields=['stock_item', 'period_end'], name='uniq_stock_snapshot_period'),
+        ]
+        indexes = [
+            models.Index(fields=['period_end']),
+        ]
+    
+    def __str__(self):
+        return f"{self.stock_item.name} @ {self.period_end}: {self.quantity}"
+
+
 # ============================================================================
 # PHASE 3: SALES MANAGEMENT MODULE
 # ============================================================================
@@ -519,26 +576,28 @@ class Sale(BaseModel):
         return f"Sale #{self.sale_number} - {self.total_amount}"
     
     def generate_sale_number(self):
-        """Auto-generate unique sale number"""
+        """Auto-generate unique sale number from the day's counter"""
         from django.utils import timezone
+        from common.sequences import next_sequence_value
         
         today = timezone.now().date()
         prefix = f"S{today.strftime('%Y%m%d')}"
         
-        # Find last sale with this prefix
-        last_sale = Sale.objects.filter(
-            sale_number__startswith=prefix
-        ).order_by('-sale_number').first()
-        
-        if last_sale:
-            # Extract sequence number and increment
-            last_num = int(last_sale.sale_number[-4:])
-            new_num = last_num + 1
-        else:
-            new_num = 1
+        def last_sale_number():
+            # Only consulted when the day's counter is first created
+            last_sale = Sale.objects.filter(
+                sale_number__startswith=prefix
+            ).order_by('-sale_number').first()
+            return int(last_sale.sale_number[-4:]) if last_sale else 0
         
+        new_num = next_sequence_value(f"businesses.sale:{prefix}", seed=last_sale_number)
         return f"{prefix}{new_num:04d}"
     
+    def save(self, *args, **kwargs):
+        if not self.sale_number:
+            self.sale_number = self.generate_sale_number()
+        super().save(*args, **kwargs)
+    
     @property
     def change_amount(self):
         """Calculate change to give customer"""
@@ -121,6 +121,16 @@ class StockItemSerializer(serializers.ModelSerializer):
             'is_pack_item', 'unit_cost_from_pack', 'pack_revenue', 'pack_profit', 'pack_profit_margin',
             'created_at', 'updated_at'
         ]
+    
+    def validate_quantity_on_hand(self, value):
+        """Opening stock only; later changes go through the stock movement actions"""
+        if self.instance is not None and value != self.instance.quantity_on_hand:
+            raise serializers.ValidationError(
+                'Use the receive, issue, adjust or damage actions to change stock.'
+            )
+        if value < 0:
+            raise serializers.ValidationError('Opening stock cannot be negative.')
+        return value
 
 
 class StockMovementSerializer(serializers.ModelSerializer):
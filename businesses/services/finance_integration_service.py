@@ -162,6 +162,73 @@ class BusinessFinanceService:
         
         return expense_transaction
     
+    @staticmethod
+    def _report_sums(accounts):
+        """Conditional SUMs for every P&L and cash flow line, keyed by line name."""
+        from django.db.models import Q, Sum
+        
+        lines = {
+            'revenue': Q(account=accounts.get('revenue'), type='income'),
+            'cogs': Q(account=accounts.get('cogs'), type='expense'),
+            'expenses': Q(account=accounts.get('expenses'), type='expense'),
+            'cash_in': Q(account=accounts.get('cash'), type='income'),
+            'cash_out': Q(account=accounts.get('cash'), type='expense'),
+        }
+        any_line = Q()
+        for condition in lines.values():
+            any_line |= condition
+        sums = {name: Sum('amount', filter=condition) for name, condition in lines.items()}
+        return any_line, sums
+    
+    @staticmethod
+    def _period_totals(accounts, start_date, end_date):
+        """All report lines for a period from one conditional aggregate over Transaction."""
+        any_line, sums = BusinessFinanceService._report_sums(accounts)
+        totals = Transaction.objects.filter(
+            any_line,
+            date__gte=start_date,
+            date__lte=end_date
+        ).aggregate(**sums)
+        return {name: value or Decimal('0') for name, value in totals.items()}
+    
+    @staticmethod
+    def _build_profit_and_loss(totals, start_date, end_date):
+        revenue, cogs, expenses = totals['revenue'], totals['cogs'], totals['expenses']
+        
+        # Calculate profits
+        gross_profit = revenue - cogs
+        net_profit = gross_profit - expenses
+        profit_margin = (net_profit / revenue * 100) if revenue > 0 else Decimal('0')
+        
+        return {
+            'revenue': revenue,
+            'cogs': cogs,
+            'expenses': expenses,
+            'gross_profit': gross_profit,
+            'net_profit': net_profit,
+            'profit_margin': profit_margin,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+    
+    @staticmethod
+    def _build_cash_flow(totals, opening_balance, start_date, end_date):
+        cash_in, cash_out = totals['cash_in'], totals['cash_out']
+        
+        # Net cash flow
+        net_cash_flow = cash_in - cash_out
+        closing_balance = opening_balance + net_cash_flow
+        
+        return {
+            'opening_balance': opening_balance,
+            'cash_in': cash_in,
+            'cash_out': cash_out,
+            'net_cash_flow': net_cash_flow,
+            'closing_balance': closing_balance,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+    
     @staticmethod
     def get_profit_and_loss(enterprise, start_date, end_date):
         """
@@ -175,8 +242,6 @@ class BusinessFinanceService:
         Returns:
             dict with P&L data
         """
-        from django.db.models import Sum, Q
-        
         accounts = BusinessService.get_business_accounts(enterprise)
         
         if not accounts:
@@ -189,51 +254,17 @@ class BusinessFinanceService:
                 'profit_margin': Decimal('0')
             }
         
-        # Get all revenue
-        revenue = Transaction.objects.filter(
-            account=accounts.get('revenue'),
-            type='income',
-            date__gte=start_date,
-            date__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        # Get COGS
-        cogs = Transaction.objects.filter(
-            account=accounts.get('cogs'),
-            type='expense',
-            date__gte=start_date,
-            date__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        # Get operating expenses
-        expenses = Transaction.objects.filter(
-            account=accounts.get('expenses'),
-            type='expense',
-            date__gte=start_date,
-            date__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        # Calculate profits
-        gross_profit = revenue - cogs
-        net_profit = gross_profit - expenses
-        profit_margin = (net_profit / revenue * 100) if revenue > 0 else Decimal('0')
-        
-        return {
-            'revenue': revenue,
-            'cogs': cogs,
-            'expenses': expenses,
-            'gross_profit': gross_profit,
-            'net_profit': net_profit,
-            'profit_margin': profit_margin,
-            'start_date': start_date,
-            'end_date': end_date
-        }
+        totals = BusinessFinanceService._period_totals(accounts, start_date, end_date)
+        return BusinessFinanceService._build_profit_and_loss(totals, start_date, end_date)
     
     @staticmethod
     def get_cash_flow(enterprise, start_date, end_date):
         """
         Calculate cash flow for an enterprise within a date range.
         
+        The opening balance comes from the cash account's daily rollup rather
+        than a scan of all earlier transactions.
+        
         Args:
             enterprise: SaccoEnterprise instance
             start_date: Start date
@@ -242,7 +273,7 @@ class BusinessFinanceService:
         Returns:
             dict with cash flow data
         """
-        from django.db.models import Sum
+        from finance.models import AccountDailyTotal
         
         accounts = BusinessService.get_business_accounts(enterprise)
         
@@ -255,49 +286,71 @@ class BusinessFinanceService:
                 'closing_balance': Decimal('0')
             }
         
-        cash_account = accounts.get('cash')
-        
-        # Opening balance (balance before start_date)
-        opening_transactions_in = Transaction.objects.filter(
-            account=cash_account,
-            type='income',
-            date__lt=start_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        opening_transactions_out = Transaction.objects.filter(
-            account=cash_account,
-            type='expense',
-            date__lt=start_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        totals = BusinessFinanceService._period_totals(accounts, start_date, end_date)
+        opening_balance = AccountDailyTotal.balance_before(accounts['cash'], start_date)
+        return BusinessFinanceService._build_cash_flow(totals, opening_balance, start_date, end_date)
+    
+    @staticmethod
+    def get_monthly_comparison(enterprise, year):
+        """
+        P&L and cash flow for every month of a year, for month-over-month comparison.
         
-        opening_balance = opening_transactions_in - opening_transactions_out
+        One grouped query covers all twelve months; the January opening balance
+        comes from the daily rollup and later months chain from it.
         
-        # Cash inflows in period
-        cash_in = Transaction.objects.filter(
-            account=cash_account,
-            type='income',
-            date__gte=start_date,
-            date__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        Args:
+            enterprise: SaccoEnterprise instance
+            year: Calendar year
         
-        # Cash outflows in period
-        cash_out = Transaction.objects.filter(
-            account=cash_account,
-            type='expense',
-            date__gte=start_date,
-            date__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        Returns:
+            dict with 'year', per-month 'months' and full-year 'totals'
+        """
+        import calendar
+        from datetime import date
+        from django.db.models.functions import TruncMonth
+        from finance.models import AccountDailyTotal
         
-        # Net cash flow
-        net_cash_flow = cash_in - cash_out
-        closing_balance = opening_balance + net_cash_flow
+        accounts = BusinessService.get_business_accounts(enterprise)
+        year_start, year_end = date(year, 1, 1), date(year, 12, 31)
+        
+        by_month = {}
+        opening_balance = Decimal('0')
+        if accounts:
+            any_line, sums = BusinessFinanceService._report_sums(accounts)
+            rows = Transaction.objects.filter(
+                any_line,
+                date__gte=year_start,
+                date__lte=year_end
+            ).annotate(month=TruncMonth('date')).values('month').annotate(**sums).order_by()
+            for row in rows:
+                month = row.pop('month')
+                by_month[month.month] = {name: value or Decimal('0') for name, value in row.items()}
+            if accounts.get('cash'):
+                opening_balance = AccountDailyTotal.balance_before(accounts['cash'], year_start)
+        
+        empty = {name: Decimal('0') for name in ('revenue', 'cogs', 'expenses', 'cash_in', 'cash_out')}
+        year_totals = dict(empty)
+        year_opening = opening_balance
+        months = []
+        for month in range(1, 13):
+            start_date = date(year, month, 1)
+            end_date = date(year, month, calendar.monthrange(year, month)[1])
+            totals = by_month.get(month, empty)
+            cash_flow = BusinessFinanceService._build_cash_flow(totals, opening_balance, start_date, end_date)
+            months.append({
+                'month': month,
+                'profit_and_loss': BusinessFinanceService._build_profit_and_loss(totals, start_date, end_date),
+                'cash_flow': cash_flow,
+            })
+            opening_balance = cash_flow['closing_balance']
+            for name in year_totals:
+                year_totals[name] += totals[name]
         
         return {
-            'opening_balance': opening_balance,
-            'cash_in': cash_in,
-            'cash_out': cash_out,
-            'net_cash_flow': net_cash_flow,
-            'closing_balance': closing_balance,
-            'start_date': start_date,
-            'end_date': end_date
+            'year': year,
+            'months': months,
+            'totals': {
+                'profit_and_loss': BusinessFinanceService._build_profit_and_loss(year_totals, year_start, year_end),
+                'cash_flow': BusinessFinanceService._build_cash_flow(year_totals, year_opening, year_start, year_end),
+            }
         }
@@ -45,29 +45,28 @@ class SalesService:
         if not items_data or len(items_data) == 0:
             raise ValueError("Sale must have at least one item")
         
-        # Create sale (draft status)
-        sale = Sale.objects.create(
-            enterprise=enterprise,
-            sale_date=timezone.now().date(),
-            customer_name=customer_name,
-            customer_phone=customer_phone,
-            payment_method=payment_method,
-            served_by=user,
-            notes=notes,
-            status='draft'
-        )
+        # Ids may arrive as strings from the untyped items payload; in_bulk keys by int
+        item_ids = []
+        for item_data in items_data:
+            try:
+                item_ids.append(int(item_data['stock_item_id']))
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid stock item id {item_data['stock_item_id']!r}")
         
-        # Generate sale number
-        sale.sale_number = sale.generate_sale_number()
-        sale.save(update_fields=['sale_number'])
+        # Load every stock item in the cart in one query
+        stock_items = StockItem.objects.in_bulk(set(item_ids))
+        tax_rate = enterprise.configuration.tax_rate
         
-        # Add items and calculate totals
+        # Price the lines and calculate totals
         subtotal = Decimal('0')
         total_discount = Decimal('0')
         total_tax = Decimal('0')
+        sale_items = []
         
-        for item_data in items_data:
-            stock_item = StockItem.objects.get(id=item_data['stock_item_id'])
+        for item_id, item_data in zip(item_ids, items_data):
+            stock_item = stock_items.get(item_id)
+            if stock_item is None:
+                raise ValueError(f"Stock item {item_id} does not exist")
             quantity = int(item_data['quantity'])
             
             if quantity <= 0:
@@ -87,8 +86,7 @@ class SalesService:
             # Discount
             discount_amount = Decimal(str(item_data.get('discount', 0)))
             
-            # Tax (use enterprise default or item-specific)
-            tax_rate = enterprise.configuration.tax_rate
+            # Tax (enterprise default rate)
             line_after_discount = line_subtotal - discount_amount
             tax_amount = (line_after_discount * tax_rate) / 100
             
@@ -103,9 +101,7 @@ class SalesService:
                 # For regular items, use cost_price
                 unit_cost = stock_item.cost_price or Decimal('0')
             
-            # Create sale item
-            SaleItem.objects.create(
-                sale=sale,
+            sale_items.append(SaleItem(
                 stock_item=stock_item,
                 quantity=quantity,
                 unit_price=unit_price,
@@ -116,19 +112,33 @@ class SalesService:
                 tax_amount=tax_amount,
                 subtotal=line_subtotal,
                 total=line_total
-            )
+            ))
             
             subtotal += line_subtotal
             total_discount += discount_amount
             total_tax += tax_amount
         
-        # Update sale totals
-        sale.subtotal = subtotal
-        sale.discount_amount = total_discount
-        sale.tax_amount = total_tax
-        sale.total_amount = subtotal - total_discount + total_tax
-        sale.amount_paid = sale.total_amount  # Assume full payment for now
-        sale.save()
+        # Create sale (draft status) with its totals; the sale number is allocated on save
+        total_amount = subtotal - total_discount + total_tax
+        sale = Sale.objects.create(
+            enterprise=enterprise,
+            sale_date=timezone.now().date(),
+            customer_name=customer_name,
+            customer_phone=customer_phone,
+            payment_method=payment_method,
+            served_by=user,
+            notes=notes,
+            status='draft',
+            subtotal=subtotal,
+            discount_amount=total_discount,
+            tax_amount=total_tax,
+            total_amount=total_amount,
+            amount_paid=total_amount  # Assume full payment for now
+        )
+        
+        for sale_item in sale_items:
+            sale_item.sale = sale
+        SaleItem.objects.bulk_create(sale_items)
         
         return sale
     
@@ -148,6 +158,10 @@ class SalesService:
         Raises:
             ValueError: If sale is not in draft status or stock insufficient
         """
+        # Lock the sale so two completions of the same draft cannot both issue stock
+        locked_status = Sale.objects.select_for_update().filter(pk=sale.pk).values_list('status', flat=True).first()
+        if locked_status is not None:
+            sale.status = locked_status
         if sale.status != 'draft':
             raise ValueError(f"Cannot complete sale with status '{sale.status}'")
         
@@ -155,26 +169,15 @@ class SalesService:
         
         # Check if sales should affect stock
         if config.stock_management_enabled and config.sales_affect_stock:
-            # Verify stock availability first
-            for sale_item in sale.items.all():
-                if sale_item.stock_item.quantity_on_hand < sale_item.quantity:
-                    raise ValueError(
-                        f"Insufficient stock for {sale_item.stock_item.name}. "
-                        f"Available: {sale_item.stock_item.quantity_on_hand}, "
-                        f"Required: {sale_item.quantity}"
-                    )
-            
-            # Deduct stock for each item
-            for sale_item in sale.items.all():
-                StockService.issue_stock(
-                    stock_item=sale_item.stock_item,
-                    quantity=sale_item.quantity,
-                    user=sale.served_by,
-                    notes=f"Sale #{sale.sale_number}",
-                    reference=sale.sale_number,
-                    source_type='sale',
-                    source_id=sale.id
-                )
+            # Lock, verify and deduct all lines together
+            StockService.issue_stock_bulk(
+                sale.items.values_list('stock_item_id', 'quantity'),
+                user=sale.served_by,
+                notes=f"Sale #{sale.sale_number}",
+                reference=sale.sale_number,
+                source_type='sale',
+                source_id=sale.id
+            )
         
         # Mark as completed
         sale.status = 'completed'
@@ -236,39 +239,89 @@ class SalesService:
         if date is None:
             date = timezone.now().date()
         
-        from django.db.models import Sum, Count, Avg
+        rows = SalesService._daily_sales_rows(enterprise, date, date)
+        return SalesService._summary_from_row(date, rows[0] if rows else {})
+    
+    @staticmethod
+    def get_daily_sales_series(enterprise, start_date, end_date):
+        """
+        Get one sales summary per day for a date range (for charts).
         
-        sales = Sale.objects.filter(
-            enterprise=enterprise,
-            sale_date=date,
-            status='completed'
-        )
+        Args:
+            enterprise: SaccoEnterprise instance
+            start_date: First day of the series
+            end_date: Last day of the series (inclusive)
         
-        summary = sales.aggregate(
-            total_sales=Count('id'),
-            total_revenue=Sum('total_amount'),
-            total_discount=Sum('discount_amount'),
-            total_tax=Sum('tax_amount'),
-            average_sale=Avg('total_amount')
-        )
+        Returns:
+            List of summary dicts, one per day; days without sales are zero-filled
+        """
+        from datetime import timedelta
         
-        # Calculate total cost and profit
-        total_cost = Decimal('0')
-        for sale in sales:
-            total_cost += sale.total_cost
+        rows = {
+            row['sale_date']: row
+            for row in SalesService._daily_sales_rows(enterprise, start_date, end_date)
+        }
+        return [
+            SalesService._summary_from_row(day, rows.get(day, {}))
+            for day in (
+                start_date + timedelta(days=offset)
+                for offset in range((end_date - start_date).days + 1)
+            )
+        ]
+    
+    @staticmethod
+    def _daily_sales_rows(enterprise, start_date, end_date):
+        """
+        Completed-sale totals grouped by sale_date in a single query.
         
-        total_profit = (summary['total_revenue'] or Decimal('0')) - total_cost
+        Item cost is summed per sale in a correlated subquery so that joining the
+        lines does not multiply the sale-level amounts.
+        """
+        from django.db.models import Sum, Count, Avg, F, OuterRef, Subquery, DecimalField
+        from django.db.models.functions import Coalesce
+        
+        item_cost = SaleItem.objects.filter(sale=OuterRef('pk')).values('sale').annotate(
+            cost=Sum(F('quantity') * F('unit_cost'), output_field=DecimalField(max_digits=15, decimal_places=2))
+        ).values('cost')
+        
+        return list(
+            Sale.objects.filter(
+                enterprise=enterprise,
+                sale_date__gte=start_date,
+                sale_date__lte=end_date,
+                status='completed'
+            ).annotate(
+                items_cost=Coalesce(
+                    Subquery(item_cost, output_field=DecimalField(max_digits=15, decimal_places=2)),
+                    Decimal('0'),
+                    output_field=DecimalField(max_digits=15, decimal_places=2)
+                )
+            ).order_by().values('sale_date').annotate(
+                total_sales=Count('id'),
+                total_revenue=Sum('total_amount'),
+                total_discount=Sum('discount_amount'),
+                total_tax=Sum('tax_amount'),
+                average_sale=Avg('total_amount'),
+                total_cost=Sum('items_cost')
+            ).order_by('sale_date')
+        )
+    
+    @staticmethod
+    def _summary_from_row(date, row):
+        total_revenue = row.get('total_revenue') or Decimal('0')
+        total_cost = row.get('total_cost') or Decimal('0')
+        total_profit = total_revenue - total_cost
         
         return {
             'date': date,
-            'total_sales': summary['total_sales'] or 0,
-            'total_revenue': summary['total_revenue'] or Decimal('0'),
-            'total_discount': summary['total_discount'] or Decimal('0'),
-            'total_tax': summary['total_tax'] or Decimal('0'),
-            'average_sale': summary['average_sale'] or Decimal('0'),
+            'total_sales': row.get('total_sales') or 0,
+            'total_revenue': total_revenue,
+            'total_discount': row.get('total_discount') or Decimal('0'),
+            'total_tax': row.get('total_tax') or Decimal('0'),
+            'average_sale': row.get('average_sale') or Decimal('0'),
             'total_cost': total_cost,
             'total_profit': total_profit,
-            'profit_margin': (total_profit / summary['total_revenue'] * 100) if summary['total_revenue'] else 0
+            'profit_margin': (total_profit / total_revenue * 100) if total_revenue else 0
         }
     
     @staticmethod
@@ -1,10 +1,16 @@
 from django.db import transaction
-from django.db.models import Sum, F, Value, DecimalField, Count
+from django.db.models import (
+    Sum, F, Q, Value, DecimalField, IntegerField, Count, Case, When,
+    ExpressionWrapper, OuterRef, Subquery
+)
 from django.db.models.functions import Coalesce
 from django.utils import timezone
+import datetime
 from decimal import Decimal
 
-from businesses.models import StockItem, StockMovement
+from businesses.models import StockItem, StockMovement, StockSnapshot
+
+MONEY_FIELD = DecimalField(max_digits=15, decimal_places=2)
 
 
 class StockService:
@@ -12,8 +18,28 @@ class StockService:
     All stock operations go through this service.
     Ensures quantity_on_hand stays in sync with movements.
     Phase 2: Stock Management
+    
+    Writers lock the item's row and change quantity_on_hand with F() updates,
+    so concurrent sales, receipts and corrections cannot overwrite each other.
     """
     
+    @staticmethod
+    def _lock_stock_item(stock_item):
+        """Lock the item's row and return a fresh copy of its quantity and cost."""
+        return StockItem.objects.select_for_update().only(
+            'id', 'name', 'quantity_on_hand', 'cost_price'
+        ).get(pk=stock_item.pk)
+    
+    @staticmethod
+    def _change_quantity(stock_item, quantity_change, **fields):
+        """Apply a quantity change to a locked item and refresh the caller's instance."""
+        StockItem.objects.filter(pk=stock_item.pk).update(
+            quantity_on_hand=F('quantity_on_hand') + quantity_change,
+            updated_at=timezone.now(),
+            **fields
+        )
+        stock_item.refresh_from_db(fields=['quantity_on_hand', 'updated_at', *fields])
+    
     @staticmethod
     @transaction.atomic
     def receive_stock(stock_item, quantity, unit_cost, user, notes='', date=None, reference=''):
@@ -38,6 +64,8 @@ class StockService:
         if quantity <= 0:
             raise ValueError("Quantity must be positive for stock receipt")
         
+        StockService._lock_stock_item(stock_item)
+        
         # Create movement record
         movement = StockMovement.objects.create(
             stock_item=stock_item,
@@ -50,10 +78,43 @@ class StockService:
             recorded_by=user
         )
         
-        # Update stock item
-        stock_item.quantity_on_hand += quantity
-        stock_item.cost_price = unit_cost  # Update to latest cost
-        stock_item.save(update_fields=['quantity_on_hand', 'cost_price', 'updated_at'])
+        # Update stock item (cost moves to the latest receipt)
+        StockService._change_quantity(stock_item, quantity, cost_price=unit_cost)
+        
+        return movement
+    
+    @staticmethod
+    @transaction.atomic
+    def record_opening_stock(stock_item, quantity, user, date=None):
+        """
+        Record the stock a new item starts with
+        
+        Valuations are rebuilt from movements, so opening stock is written as an
+        IN movement at the item's cost instead of being set on the item directly.
+        
+        Args:
+            stock_item: StockItem instance
+            quantity: Opening quantity (must be positive)
+            user: User recording the movement
+            date: Movement date (defaults to today)
+        
+        Returns:
+            StockMovement instance
+        """
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive for opening stock")
+        
+        locked = StockService._lock_stock_item(stock_item)
+        movement = StockMovement.objects.create(
+            stock_item=stock_item,
+            movement_type='IN',
+            quantity=quantity,
+            unit_cost=locked.cost_price or Decimal('0'),
+            movement_date=date or timezone.now().date(),
+            notes='Opening stock',
+            recorded_by=user
+        )
+        StockService._change_quantity(stock_item, quantity)
         
         return movement
     
@@ -82,32 +143,102 @@ class StockService:
         if quantity <= 0:
             raise ValueError("Quantity must be positive for stock issue")
         
-        if stock_item.quantity_on_hand < quantity:
-            raise ValueError(
-                f"Insufficient stock for {stock_item.name}. "
-                f"Available: {stock_item.quantity_on_hand}, "
-                f"Requested: {quantity}"
-            )
-        
-        # Create movement record (negative quantity)
-        movement = StockMovement.objects.create(
-            stock_item=stock_item,
-            movement_type='OUT',
-            quantity=-quantity,  # Negative for OUT
-            unit_cost=stock_item.cost_price or Decimal('0'),
-            movement_date=date or timezone.now().date(),
-            reference_number=reference,
+        movements = StockService.issue_stock_bulk(
+            [(stock_item.id, quantity)],
+            user=user,
             notes=notes,
-            recorded_by=user,
+            date=date,
+            reference=reference,
             source_type=source_type,
             source_id=source_id
         )
         
-        # Update stock item
-        stock_item.quantity_on_hand -= quantity
-        stock_item.save(update_fields=['quantity_on_hand', 'updated_at'])
+        # Keep the caller's instance in step with the locked row
+        stock_item.refresh_from_db(fields=['quantity_on_hand', 'updated_at'])
         
-        return movement
+        return movements[0]
+    
+    @staticmethod
+    @transaction.atomic
+    def issue_stock_bulk(lines, user, notes='', date=None, reference='', source_type='', source_id=None):
+        """
+        Remove stock for several lines at once under row locks.
+        
+        The stock items are locked in one SELECT ... FOR UPDATE (in id order, so
+        concurrent issues cannot deadlock), availability is checked against the
+        locked quantities, the decrements are applied with a single F() update and
+        the movements are written with bulk_create.
+        
+        Args:
+            lines: Iterable of (stock_item_id, quantity) pairs; an item may repeat
+            user: User recording the movements
+            notes: Optional notes
+            date: Movement date (defaults to today)
+            reference: Reference number
+            source_type: Type of source (sale, damage, etc.)
+            source_id: ID of source record
+        
+        Returns:
+            List of StockMovement instances, one per line
+        
+        Raises:
+            ValueError: If a quantity is invalid or stock is insufficient
+        """
+        lines = list(lines)
+        required = {}
+        for stock_item_id, quantity in lines:
+            if quantity <= 0:
+                raise ValueError("Quantity must be positive for stock issue")
+            required[stock_item_id] = required.get(stock_item_id, 0) + quantity
+        
+        if not required:
+            return []
+        
+        locked = {
+            item.id: item
+            for item in StockItem.objects.select_for_update().filter(
+                id__in=required
+            ).order_by('id').only('id', 'name', 'quantity_on_hand', 'cost_price')
+        }
+        
+        for stock_item_id, quantity in required.items():
+            item = locked.get(stock_item_id)
+            if item is None:
+                raise ValueError(f"Stock item {stock_item_id} does not exist")
+            if item.quantity_on_hand < quantity:
+                raise ValueError(
+                    f"Insufficient stock for {item.name}. "
+                    f"Available: {item.quantity_on_hand}, "
+                    f"Requested: {quantity}"
+                )
+        
+        StockItem.objects.filter(id__in=required).update(
+            quantity_on_hand=Case(
+                *[
+                    When(id=stock_item_id, then=F('quantity_on_hand') - quantity)
+                    for stock_item_id, quantity in required.items()
+                ],
+                default=F('quantity_on_hand')
+            ),
+            updated_at=timezone.now()
+        )
+        
+        movement_date = date or timezone.now().date()
+        return StockMovement.objects.bulk_create([
+            StockMovement(
+                stock_item_id=stock_item_id,
+                movement_type='OUT',
+                quantity=-quantity,  # Negative for OUT
+                unit_cost=locked[stock_item_id].cost_price or Decimal('0'),
+                movement_date=movement_date,
+                reference_number=reference,
+                notes=notes,
+                recorded_by=user,
+                source_type=source_type,
+                source_id=source_id
+            )
+            for stock_item_id, quantity in lines
+        ])
     
     @staticmethod
     @transaction.atomic
@@ -134,8 +265,9 @@ class StockService:
         if not reason or reason.strip() == '':
             raise ValueError("Reason is required for stock adjustments")
         
-        # Calculate difference
-        difference = new_quantity - stock_item.quantity_on_hand
+        # Calculate difference against the locked row, not the caller's copy
+        locked = StockService._lock_stock_item(stock_item)
+        difference = new_quantity - locked.quantity_on_hand
         
         if difference == 0:
             raise ValueError("New quantity is same as current quantity. No adjustment needed.")
@@ -145,15 +277,14 @@ class StockService:
             stock_item=stock_item,
             movement_type='ADJUSTMENT',
             quantity=difference,  # Can be positive or negative
-            unit_cost=stock_item.cost_price or Decimal('0'),
+            unit_cost=locked.cost_price or Decimal('0'),
             movement_date=date or timezone.now().date(),
-            notes=f"Adjustment: {reason}. Old quantity: {stock_item.quantity_on_hand}, New quantity: {new_quantity}",
+            notes=f"Adjustment: {reason}. Old quantity: {locked.quantity_on_hand}, New quantity: {new_quantity}",
             recorded_by=user
         )
         
         # Update stock item
-        stock_item.quantity_on_hand = new_quantity
-        stock_item.save(update_fields=['quantity_on_hand', 'updated_at'])
+        StockService._change_quantity(stock_item, difference)
         
         return movement
     
@@ -176,10 +307,11 @@ class StockService:
         if quantity <= 0:
             raise ValueError("Quantity must be positive")
         
-        if stock_item.quantity_on_hand < quantity:
+        locked = StockService._lock_stock_item(stock_item)
+        if locked.quantity_on_hand < quantity:
             raise ValueError(
                 f"Cannot record damage exceeding available stock. "
-                f"Available: {stock_item.quantity_on_hand}, "
+                f"Available: {locked.quantity_on_hand}, "
                 f"Damage: {quantity}"
             )
         
@@ -187,15 +319,14 @@ class StockService:
             stock_item=stock_item,
             movement_type='DAMAGE',
             quantity=-quantity,  # Negative
-            unit_cost=stock_item.cost_price or Decimal('0'),
+            unit_cost=locked.cost_price or Decimal('0'),
             movement_date=date or timezone.now().date(),
             notes=f"Damage/Loss: {reason}",
             recorded_by=user
         )
         
         # Update stock
-        stock_item.quantity_on_hand -= quantity
-        stock_item.save(update_fields=['quantity_on_hand', 'updated_at'])
+        StockService._change_quantity(stock_item, -quantity)
         
         return movement
     
@@ -218,19 +349,19 @@ class StockService:
         if quantity <= 0:
             raise ValueError("Quantity must be positive")
         
+        locked = StockService._lock_stock_item(stock_item)
         movement = StockMovement.objects.create(
             stock_item=stock_item,
             movement_type='RETURN',
             quantity=quantity,  # Positive (adds stock)
-            unit_cost=stock_item.cost_price or Decimal('0'),
+            unit_cost=locked.cost_price or Decimal('0'),
             movement_date=date or timezone.now().date(),
             notes=f"Customer return: {notes}",
             recorded_by=user
         )
         
         # Update stock
-        stock_item.quantity_on_hand += quantity
-        stock_item.save(update_fields=['quantity_on_hand', 'updated_at'])
+        StockService._change_quantity(stock_item, quantity)
         
         return movement
     
@@ -316,6 +447,209 @@ class StockService:
         
         return movements.select_related('recorded_by').order_by('-movement_date', '-created_at')
     
+    @staticmethod
+    def get_movement_summary(stock_item, start_date=None, end_date=None):
+        """
+        Summarize movements for a stock item by type
+        
+        Args:
+            stock_item: StockItem instance
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+        
+        Returns:
+            List of dicts with movement_type, count, quantity and value
+        """
+        movements = StockMovement.objects.filter(stock_item=stock_item)
+        
+        if start_date:
+            movements = movements.filter(movement_date__gte=start_date)
+        
+        if end_date:
+            movements = movements.filter(movement_date__lte=end_date)
+        
+        return list(
+            movements.order_by().values('movement_type').annotate(
+                count=Count('id'),
+                total_quantity=Sum('quantity'),
+                total_value=Sum(F('quantity') * F('unit_cost'), output_field=MONEY_FIELD)
+            ).order_by('movement_type')
+        )
+    
+    # Snapshots and valuation history
+    
+    @staticmethod
+    def _annotate_position(items, as_of, before=False):
+        """
+        Annotate stock items with their ledger position at the end of ``as_of``.
+        
+        Starts from the latest snapshot on or before ``as_of`` (strictly before
+        when ``before`` is set) and adds the movements recorded after it, all in
+        correlated subqueries so the result is a single query.
+        """
+        snapshots = StockSnapshot.objects.filter(stock_item=OuterRef('pk'))
+        snapshots = snapshots.filter(period_end__lt=as_of) if before else snapshots.filter(period_end__lte=as_of)
+        snapshots = snapshots.order_by('-period_end')
+        
+        moved = StockMovement.objects.filter(
+            stock_item=OuterRef('pk'),
+            movement_date__gt=OuterRef('snapshot_end'),
+            movement_date__lte=as_of
+        ).order_by().values('stock_item').annotate(total=Sum('quantity')).values('total')
+        
+        last_cost = StockMovement.objects.filter(
+            stock_item=OuterRef('pk'),
+            movement_date__lte=as_of
+        ).order_by('-movement_date', '-created_at', '-id').values('unit_cost')[:1]
+        
+        return items.annotate(
+            snapshot_end=Coalesce(Subquery(snapshots.values('period_end')[:1]), Value(datetime.date.min)),
+            position_quantity=(
+                Coalesce(Subquery(snapshots.values('quantity')[:1]), 0)
+                + Coalesce(Subquery(moved, output_field=IntegerField()), 0)
+            ),
+            position_unit_cost=Coalesce(
+                Subquery(last_cost, output_field=MONEY_FIELD),
+                F('cost_price'),
+                Value(Decimal('0')),
+                output_field=MONEY_FIELD
+            ),
+        ).annotate(
+            position_value=ExpressionWrapper(
+                F('position_quantity') * F('position_unit_cost'), output_field=MONEY_FIELD
+            )
+        )
+    
+    @staticmethod
+    def build_stock_snapshots(period_end, enterprise=None):
+        """
+        Write (or refresh) month-end snapshots for every stock item.
+        
+        Snapshots must be built in period order: each one carries forward the
+        closing quantity of the previous snapshot. Movements back-dated into an
+        already snapshotted month need the later months rebuilt.
+        
+        Args:
+            period_end: Last day of the month to snapshot
+            enterprise: Optional SaccoEnterprise to limit the snapshot to
+        
+        Returns:
+            Number of snapshots written
+        """
+        period_start = period_end.replace(day=1)
+        items = StockItem.objects.all()
+        movements = StockMovement.objects.filter(movement_date__gte=period_start, movement_date__lte=period_end)
+        if enterprise is not None:
+            items = items.filter(enterprise=enterprise)
+            movements = movements.filter(stock_item__enterprise=enterprise)
+        
+        activity = {
+            row['stock_item']: row
+            for row in movements.order_by().values('stock_item').annotate(
+                quantity_in=Coalesce(Sum('quantity', filter=Q(quantity__gt=0)), 0),
+                quantity_out=Coalesce(Sum('quantity', filter=Q(quantity__lt=0)), 0),
+                cogs=Coalesce(
+                    Sum(
+                        F('quantity') * F('unit_cost'),
+                        filter=Q(movement_type='OUT', source_type='sale'),
+                        output_field=MONEY_FIELD
+                    ),
+                    Value(Decimal('0')),
+                    output_field=MONEY_FIELD
+                )
+            )
+        }
+        
+        positions = StockService._annotate_position(items, period_end, before=True).values_list(
+            'id', 'position_quantity', 'position_unit_cost', 'position_value'
+        )
+        snapshots = []
+        for stock_item_id, quantity, unit_cost, value in positions:
+            row = activity.get(stock_item_id, {})
+            snapshots.append(StockSnapshot(
+                stock_item_id=stock_item_id,
+                period_end=period_end,
+                quantity=quantity,
+                unit_cost=unit_cost,
+                value=value,
+                quantity_in=row.get('quantity_in', 0),
+                quantity_out=-row.get('quantity_out', 0),
+                cogs=-row.get('cogs', Decimal('0'))
+            ))
+        
+        StockSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=['stock_item', 'period_end'],
+            update_fields=['quantity', 'unit_cost', 'value', 'quantity_in', 'quantity_out', 'cogs', 'updated_at'],
+        )
+        return len(snapshots)
+    
+    @staticmethod
+    def get_stock_valuation(enterprise, as_of=None):
+        """
+        Value the enterprise's stock as of the end of a date
+        
+        Args:
+            enterprise: SaccoEnterprise instance
+            as_of: Valuation date (defaults to today)
+        
+        Returns:
+            dict with total_quantity, total_value and per-item positions
+        """
+        as_of = as_of or timezone.now().date()
+        items = StockService._annotate_position(
+            StockItem.objects.filter(enterprise=enterprise, is_active=True), as_of
+        ).values('id', 'name', 'position_quantity', 'position_unit_cost', 'position_value').order_by('name')
+        
+        rows = [
+            {
+                'stock_item_id': item['id'],
+                'name': item['name'],
+                'quantity': item['position_quantity'],
+                'unit_cost': item['position_unit_cost'],
+                'value': item['position_value'],
+            }
+            for item in items
+        ]
+        return {
+            'as_of': as_of,
+            'total_quantity': sum(row['quantity'] for row in rows),
+            'total_value': sum((row['value'] for row in rows), Decimal('0')),
+            'items': rows,
+        }
+    
+    @staticmethod
+    def get_valuation_history(enterprise, start_date=None, end_date=None):
+        """
+        Month-end stock value, stock in/out and COGS from the snapshots
+        
+        Args:
+            enterprise: SaccoEnterprise instance
+            start_date: Optional first period end to include
+            end_date: Optional last period end to include
+        
+        Returns:
+            List of dicts, one per snapshotted month
+        """
+        snapshots = StockSnapshot.objects.filter(stock_item__enterprise=enterprise)
+        
+        if start_date:
+            snapshots = snapshots.filter(period_end__gte=start_date)
+        
+        if end_date:
+            snapshots = snapshots.filter(period_end__lte=end_date)
+        
+        return list(
+            snapshots.order_by().values('period_end').annotate(
+                total_quantity=Sum('quantity'),
+                total_value=Sum('value'),
+                quantity_in=Sum('quantity_in'),
+                quantity_out=Sum('quantity_out'),
+                cogs=Sum('cogs')
+            ).order_by('period_end')
+        )
+    
     @staticmethod
     def get_stock_summary(enterprise):
         """
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from datetime import date
 
 from .models import (
     SaccoEnterprise, EnterpriseConfiguration,
@@ -213,6 +214,30 @@ class SaccoEnterpriseViewSet(viewsets.ModelViewSet):
         )
         
         return Response(cf_data)
+    
+    @action(detail=True, methods=['get'])
+    def financial_comparison(self, request, pk=None):
+        """
+        Get month-by-month P&L and cash flow for a year in one request.
+        
+        GET /api/businesses/enterprises/{id}/financial_comparison/?year=YYYY
+        """
+        enterprise = self.get_object()
+        
+        year = request.query_params.get('year')
+        try:
+            year = int(year) if year else timezone.now().year
+        except ValueError:
+            return Response({'error': 'year must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if not date.min.year <= year <= date.max.year:
+            return Response(
+                {'error': f'year must be between {date.min.year} and {date.max.year}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        comparison = BusinessFinanceService.get_monthly_comparison(enterprise, year)
+        
+        return Response(comparison)
 
 
 # ============================================================================
@@ -255,6 +280,16 @@ class StockItemViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('name')
     
+    def perform_create(self, serializer):
+        """Create the item and record any opening stock as a movement"""
+        from django.db import transaction
+        
+        opening_quantity = serializer.validated_data.pop('quantity_on_hand', 0)
+        with transaction.atomic():
+            item = serializer.save()
+            if opening_quantity:
+                StockService.record_opening_stock(item, opening_quantity, self.request.user)
+    
     @action(detail=True, methods=['post'])
     def receive(self, request, pk=None):
         """
@@ -453,6 +488,71 @@ class StockItemViewSet(viewsets.ModelViewSet):
         
         return Response(summary)
 
+    
+    @action(detail=False, methods=['get'])
+    def valuation(self, request):
+        """
+        Get stock valuation as of a date (from snapshots plus later movements).
+        
+        GET /api/businesses/stock/valuation/?enterprise={id}&as_of=2024-10-31
+        """
+        enterprise_id = request.query_params.get('enterprise')
+        if not enterprise_id:
+            return Response(
+                {'error': 'enterprise parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        enterprise = get_object_or_404(SaccoEnterprise, id=enterprise_id)
+        
+        as_of = request.query_params.get('as_of')
+        if as_of:
+            from datetime import datetime
+            try:
+                as_of = datetime.strptime(as_of, '%Y-%m-%d').date()
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        valuation = StockService.get_stock_valuation(enterprise, as_of or None)
+        
+        return Response(valuation)
+    
+    @action(detail=False, methods=['get'])
+    def valuation_history(self, request):
+        """
+        Get month-end stock value, stock in/out and COGS.
+        
+        GET /api/businesses/stock/valuation_history/?enterprise={id}&start_date=2024-01-01&end_date=2024-12-31
+        """
+        enterprise_id = request.query_params.get('enterprise')
+        if not enterprise_id:
+            return Response(
+                {'error': 'enterprise parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        enterprise = get_object_or_404(SaccoEnterprise, id=enterprise_id)
+        
+        from datetime import datetime
+        dates = {}
+        for param in ('start_date', 'end_date'):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                dates[param] = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        history = StockService.get_valuation_history(enterprise, **dates)
+        
+        return Response(history)
 
 class StockMovementViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -645,6 +745,47 @@ class SaleViewSet(viewsets.ModelViewSet):
         
         return Response(summary)
     
+    @action(detail=False, methods=['get'])
+    def daily_series(self, request):
+        """
+        Get per-day sales summaries for a date range (for charts).
+        
+        GET /api/businesses/sales/daily_series/?enterprise={id}&start_date=2024-10-01&end_date=2024-10-31
+        """
+        enterprise_id = request.query_params.get('enterprise')
+        if not enterprise_id:
+            return Response(
+                {'error': 'enterprise parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        enterprise = get_object_or_404(SaccoEnterprise, id=enterprise_id)
+        
+        from datetime import datetime, timedelta
+        try:
+            end_date = request.query_params.get('end_date')
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else timezone.now().date()
+            start_date = request.query_params.get('start_date')
+            start_date = (
+                datetime.strptime(start_date, '%Y-%m-%d').date() if start_date
+                else end_date - timedelta(days=29)
+            )
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if start_date > end_date or (end_date - start_date).days > 366:
+            return Response(
+                {'error': 'start_date must be on or before end_date and within a year of it'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        series = SalesService.get_daily_sales_series(enterprise, start_date, end_date)
+        
+        return Response(series)
+    
     @action(detail=False, methods=['get'])
     def top_products(self, request):
         """
@@ -0,0 +1,145 @@
+# common/fieldsets.py
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def _parse_field_list(request, param):
+    """Read a comma separated query parameter (repeatable) into a set of names."""
+    if request is None:
+        return set()
+    names = set()
+    for raw in request.query_params.getlist(param):
+        names.update(name.strip() for name in raw.split(',') if name.strip())
+    return names
+
+
+class SparseFieldsetMixin:
+    """
+    Viewset mixin adding ``fields=``, ``omit=`` and ``expand=`` query parameters.
+
+    - ``fields=id,title,status`` returns only the listed fields (``id`` is always kept)
+    - ``omit=tags,notes`` drops the listed fields
+    - ``expand=tags`` includes fields listed in ``expandable_fields``, which are
+      left out of responses unless explicitly requested
+
+    Dropped fields are removed from the serializer before rendering, so
+    ``SerializerMethodField`` getters for them never run. When every remaining
+    field can be mapped to model attributes, the queryset is trimmed as well:
+    unused columns are deferred and unused prefetches are skipped.
+    """
+
+    sparse_fieldset_actions = ('list', 'retrieve')
+    # Expensive fields excluded from responses unless requested via ``expand=``
+    expandable_fields = ()
+    # Model attributes needed by computed fields, e.g. {'is_overdue': ('due_date', 'status')}
+    sparse_field_sources = {}
+
+    def sparse_fieldset_enabled(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method != 'GET':
+            return False
+        action = getattr(self, 'action', None)
+        # Plain generic views have no action; any GET is a list/retrieve there
+        return action is None or action in self.sparse_fieldset_actions
+
+    def get_sparse_fieldset(self):
+        """Return the (fields, omit, expand) sets requested by the client."""
+        if not hasattr(self, '_sparse_fieldset'):
+            request = getattr(self, 'request', None)
+            self._sparse_fieldset = (
+                _parse_field_list(request, 'fields'),
+                _parse_field_list(request, 'omit'),
+                _parse_field_list(request, 'expand'),
+            )
+        return self._sparse_fieldset
+
+    def is_sparse_fieldset_requested(self):
+        fields, omit, expand = self.get_sparse_fieldset()
+        return bool(fields or omit or self.expandable_fields)
+
+    def get_sparse_field_names(self, available):
+        """Return the serializer field names to keep out of ``available``."""
+        fields, omit, expand = self.get_sparse_fieldset()
+        keep = set(available)
+        if fields:
+            keep &= fields | {'id'}
+        keep -= {name for name in self.expandable_fields if name not in expand and name not in fields}
+        keep -= omit
+        return keep
+
+    def apply_sparse_fieldset(self, serializer):
+        target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+        if not isinstance(target, serializers.Serializer):
+            return serializer
+        keep = self.get_sparse_field_names(target.fields)
+        for name in list(target.fields):
+            if name not in keep:
+                target.fields.pop(name)
+        return serializer
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.sparse_fieldset_enabled() and self.is_sparse_fieldset_requested():
+            self.apply_sparse_fieldset(serializer)
+        return serializer
+
+    def get_required_model_attributes(self, model, serializer):
+        """
+        Map the kept serializer fields to top-level model attributes.
+
+        Returns ``None`` when a field cannot be resolved safely (method fields,
+        properties, ``source='*'``) unless it is described in ``sparse_field_sources``.
+        """
+        required = set()
+        for name, field in serializer.fields.items():
+            if name in self.sparse_field_sources:
+                required.update(self.sparse_field_sources[name])
+                continue
+            if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+                return None
+            attribute = field.source.split('.')[0]
+            try:
+                model_field = model._meta.get_field(attribute)
+            except FieldDoesNotExist:
+                return None
+            required.add(model_field.name)
+        return required
+
+    def trim_queryset(self, queryset):
+        """Defer columns and drop prefetches that the kept fields do not need."""
+        if getattr(queryset, '_fields', None) is not None:
+            return queryset
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        self.apply_sparse_fieldset(serializer)
+        model = queryset.model
+        required = self.get_required_model_attributes(model, serializer)
+        if required is None:
+            return queryset
+
+        deferred = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and not field.is_relation and field.name not in required
+        ]
+        if deferred:
+            queryset = queryset.defer(*deferred)
+
+        lookups = list(queryset._prefetch_related_lookups)
+        if lookups:
+            kept = []
+            for lookup in lookups:
+                if isinstance(lookup, Prefetch):
+                    names = {lookup.prefetch_through.split('__')[0], lookup.to_attr}
+                else:
+                    names = {lookup.split('__')[0]}
+                if names & required:
+                    kept.append(lookup)
+            if len(kept) != len(lookups):
+                queryset = queryset.prefetch_related(None).prefetch_related(*kept)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.sparse_fieldset_enabled() and self.is_sparse_fieldset_requested():
+            queryset = self.trim_queryset(queryset)
+        return queryset
@@ -1,7 +1,14 @@
 # common/middleware.py
+import logging
 from zoneinfo import ZoneInfo
+from django.conf import settings
 from django.utils import timezone
 
+from common.query_stats import QueryStats, resolve_query_budget
+from common.request_context import get_request_context
+
+stats_logger = logging.getLogger('common.query_stats')
+
 
 class UserTimezoneMiddleware:
     """
@@ -13,17 +20,8 @@ class UserTimezoneMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        # Get user timezone from preferences
-        user_timezone = None
-        if hasattr(request, 'user') and request.user.is_authenticated:
-            try:
-                user_timezone = getattr(
-                    getattr(request.user, 'preferences', None), 
-                    'timezone', 
-                    None
-                )
-            except AttributeError:
-                pass
+        # Get user timezone from the cached request context (no query on a cache hit)
+        user_timezone = get_request_context(request).timezone
         
         # Activate timezone if found, otherwise deactivate to use default
         if user_timezone:
@@ -41,3 +39,49 @@ class UserTimezoneMiddleware:
         timezone.deactivate()
         
         return response
+
+
+class QueryStatsMiddleware:
+    """
+    Record query count, DB time and repeated statements for every request.
+
+    Adds ``X-Query-Count``/``X-DB-Time-Ms``/``X-Duplicate-Queries`` headers when
+    ``QUERY_STATS_HEADERS`` (default: DEBUG) is on, logs a structured record for
+    requests at or above ``QUERY_STATS_LOG_THRESHOLD`` queries, and enforces the
+    view's query budget (see common.query_stats).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_STATS_ENABLED', settings.DEBUG):
+            return self.get_response(request)
+
+        stats = QueryStats(capture_origins=getattr(settings, 'QUERY_STATS_CAPTURE_ORIGINS', settings.DEBUG))
+        with stats:
+            response = self.get_response(request)
+
+        if getattr(settings, 'QUERY_STATS_HEADERS', settings.DEBUG):
+            response['X-Query-Count'] = str(stats.count)
+            response['X-DB-Time-Ms'] = str(stats.db_time_ms)
+            response['X-Duplicate-Queries'] = str(stats.duplicate_count)
+
+        threshold = getattr(settings, 'QUERY_STATS_LOG_THRESHOLD', None)
+        if threshold is not None and stats.count >= threshold:
+            stats_logger.info(
+                "%s %s ran %s queries in %sms",
+                request.method, request.path, stats.count, stats.db_time_ms,
+                extra={'query_stats': {
+                    'method': request.method,
+                    'path': request.path,
+                    'status': response.status_code,
+                    **stats.as_dict(),
+                }},
+            )
+
+        stats.check_budget(getattr(request, 'query_budget', None), f"{request.method} {request.path}")
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = resolve_query_budget(view_func, request.method)
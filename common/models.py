@@ -1,3 +1,11 @@
 from django.db import models
 
-# Create your models here.
+
+class DocumentSequence(models.Model):
+    """Last number handed out for a document numbering scope (see common.sequences)"""
+    scope = models.CharField(max_length=150, unique=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope}: {self.last_value}"
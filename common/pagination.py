@@ -1,7 +1,253 @@
 # common/pagination.py
-from rest_framework.pagination import PageNumberPagination
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorValueEncoder(DjangoJSONEncoder):
+    """JSON encoder keeping full microsecond precision, which keyset cursors need."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
 
 class DefaultPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+def estimate_queryset_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset`` or ``None`` when unavailable.
+
+    Only PostgreSQL exposes a usable estimate (via ``EXPLAIN``); other backends
+    return ``None`` so callers fall back to an exact ``COUNT(*)``.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that trusts the planner estimate once a result set is large."""
+
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = None
+        if hasattr(self.object_list, 'query'):
+            estimate = estimate_queryset_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_threshold:
+            self.count_is_estimate = False
+            return Paginator.count.func(self)
+        self.count_is_estimate = True
+        return estimate
+
+
+class EstimatedCountPagination(DefaultPagination):
+    """
+    Page-number pagination that skips the exact ``COUNT(*)`` on large result sets.
+
+    Small results are counted exactly; above ``exact_count_threshold`` rows the
+    count comes from the query planner and ``count_is_estimate`` is ``true``.
+    """
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_is_estimate', getattr(self.page.paginator, 'count_is_estimate', False)),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {'type': 'boolean', 'example': False}
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in cursor pagination over a composite, unique ordering.
+
+    Requests without ``?cursor=`` or ``?pagination=cursor`` get the regular
+    page-number pagination (``count``, ``?page=``, ``?ordering=``). In cursor mode
+    pages are selected with a lexicographic OR-chain on the ordering fields
+    (``a < x OR (a = x AND b < y) OR ...``) rather than ``OFFSET``, and no
+    ``COUNT(*)`` is issued, so every page costs the same. Views choose the ordering
+    with ``keyset_ordering`` (e.g. ``('-created_at', '-id')``); it must end with a
+    unique, non-null field. An ``?ordering=`` in cursor mode is rejected.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    ordering_query_param = 'ordering'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+    page_number_class = DefaultPagination
+
+    def __init__(self):
+        self.page_number = None
+
+    def is_cursor_request(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def get_ordering(self, view):
+        return tuple(getattr(view, 'keyset_ordering', None) or self.ordering)
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': int(reverse)}, cls=CursorValueEncoder)
+        encoded = base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))
+            values, reverse = payload['v'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering_fields):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def _keyset_filter(self, values, reverse):
+        """Build the lexicographic ``row > cursor`` condition for the ordering."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering_fields, values):
+            descending = field.startswith('-')
+            name = field.lstrip('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _row_values(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering_fields]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_cursor_request(request):
+            self.page_number = self.page_number_class()
+            return self.page_number.paginate_queryset(queryset, request, view)
+        self.page_number = None
+        if request.query_params.get(self.ordering_query_param):
+            raise ValidationError({
+                self.ordering_query_param: 'Cursor pagination uses a fixed ordering; '
+                                           'omit it or use page-number pagination.'
+            })
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering_fields = self.get_ordering(view)
+
+        values, reverse = self.decode_cursor(request)
+        ordering = self.ordering_fields
+        if reverse:
+            ordering = tuple(f[1:] if f.startswith('-') else f'-{f}' for f in ordering)
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Moving backwards, "more" means an earlier page; the later page always exists
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if self.page_number is not None:
+            return self.page_number.get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._row_values(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if self.page_number is not None:
+            return self.page_number.get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._row_values(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        if self.page_number is not None:
+            return self.page_number.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        # Page-number responses by default; ``count`` is absent in cursor mode
+        response_schema = self.page_number_class().get_paginated_response_schema(schema)
+        response_schema['required'] = ['results']
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return self.page_number_class().get_schema_operation_parameters(view) + [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': "Set to 'cursor' for cursor pagination (no count, fixed ordering).",
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value (implies cursor pagination).',
+                'schema': {'type': 'string'},
+            },
+        ]
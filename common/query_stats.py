@@ -0,0 +1,155 @@
+# common/query_stats.py
+"""
+Per-request SQL instrumentation and query budgets.
+
+``QueryStats`` hooks every database connection with ``execute_wrapper`` (so it
+works with DEBUG off) and records the query count, DB time, statements repeated
+with different parameters (the N+1 signature) and, optionally, the project code
+line that issued each query, which points at serializer methods doing per-row
+lookups. ``QueryStatsMiddleware`` in common.middleware reports it per request.
+
+Views opt into a budget with ``@query_budget(n)`` (on a function view or a
+viewset action/handler) or a ``query_budget = n`` class attribute. On an
+``@api_view`` function the decorator goes above ``@api_view``.
+"""
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised instead of logged when ``QUERY_BUDGET_STRICT`` is on (tests)."""
+
+
+def query_budget(limit):
+    """Set the maximum number of queries a view may run per request."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def resolve_query_budget(view_func, method):
+    """Find the budget for a resolved view: handler/action, the class, then the view itself."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, 'query_budget', None)
+
+    handler_name = (getattr(view_func, 'actions', None) or {}).get(method.lower(), method.lower())
+    budget = getattr(getattr(view_class, handler_name, None), 'query_budget', None)
+    if budget is not None:
+        return budget
+    budget = getattr(view_class, 'query_budget', None)
+    if budget is not None:
+        return budget
+    return getattr(view_func, 'query_budget', None)
+
+
+def fingerprint(sql):
+    """Normalize a statement so the same query with other literals matches."""
+    return _NUMBER.sub('?', _STRING.sub('?', sql))
+
+
+def _project_origin():
+    """``path:line function`` of the innermost project frame outside this module."""
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and filename != __file__
+            and 'site-packages' not in filename
+        ):
+            return f"{os.path.relpath(filename, base_dir)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+class QueryStats:
+    """Collect query statistics on all connections while used as a context manager."""
+
+    def __init__(self, capture_origins=False):
+        self.capture_origins = capture_origins
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.origins = Counter()
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        return False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[fingerprint(sql)] += 1
+            if self.capture_origins:
+                self.origins[_project_origin()] += 1
+
+    @property
+    def db_time_ms(self):
+        return round(self.duration * 1000, 2)
+
+    @property
+    def duplicate_count(self):
+        """Queries beyond the first run of each distinct statement."""
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    def top_duplicates(self, limit=5):
+        return [
+            {'sql': sql[:300], 'count': count}
+            for sql, count in self.statements.most_common(limit)
+            if count > 1
+        ]
+
+    def hotspots(self, limit=5):
+        return [{'origin': origin, 'count': count} for origin, count in self.origins.most_common(limit)]
+
+    def as_dict(self):
+        return {
+            'queries': self.count,
+            'db_time_ms': self.db_time_ms,
+            'duplicate_queries': self.duplicate_count,
+            'top_duplicates': self.top_duplicates(),
+            'hotspots': self.hotspots(),
+        }
+
+    def check_budget(self, budget, label='block'):
+        """Raise or log when more than ``budget`` queries ran; return True if within it."""
+        if budget is None or self.count <= budget:
+            return True
+
+        message = f"{label} ran {self.count} queries (budget {budget})"
+        if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            details = '\n'.join(
+                f"  {item['count']}x {item['sql']}" for item in self.top_duplicates()
+            ) + ''.join(
+                f"\n  {item['count']}x from {item['origin']}" for item in self.hotspots()
+            )
+            raise QueryBudgetExceeded(f"{message}\n{details}" if details else message)
+        logger.warning(message, extra={'query_stats': self.as_dict(), 'query_budget': budget})
+        return False
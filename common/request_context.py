@@ -0,0 +1,101 @@
+# common/request_context.py
+"""
+Lazy, cached per-request user context (SACCO membership and preferences).
+
+Nothing is resolved when the context is attached to a request; each part is loaded
+on first access and cached per user for ``CONTEXT_CACHE_TIMEOUT`` seconds, so
+endpoints that never ask for tenant data pay no queries for it. Signals drop the
+cached parts when memberships or preferences change.
+"""
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+CONTEXT_CACHE_TIMEOUT = 60
+
+
+def user_context_cache_key(part, user_id):
+    return f"request_context:{part}:{user_id}"
+
+
+def invalidate_user_context(user_id, parts=('membership', 'preferences')):
+    """Drop cached context parts for a user (e.g. after a membership change)."""
+    if user_id:
+        cache.delete_many([user_context_cache_key(part, user_id) for part in parts])
+
+
+def _cached_part(part, user_id, load):
+    key = user_context_cache_key(part, user_id)
+    value = cache.get(key)
+    if value is None:
+        # Store {} rather than None so "no membership" is cached too
+        value = load() or {}
+        cache.set(key, value, CONTEXT_CACHE_TIMEOUT)
+    return value
+
+
+def load_membership(user_id):
+    from saccos.models import SaccoMember
+
+    return SaccoMember.objects.filter(user_id=user_id).values(
+        'id', 'sacco_id', 'role', 'is_secretary', 'status'
+    ).first()
+
+
+def load_preferences(user_id):
+    from users.models import UserPreferences
+
+    return UserPreferences.objects.filter(user_id=user_id).values('timezone', 'language').first()
+
+
+class RequestContext:
+    """Tenant and preference data for the current request user, resolved on demand."""
+
+    def __init__(self, request, user=None):
+        self._request = request
+        self._user = user
+
+    @cached_property
+    def user_id(self):
+        user = self._user or getattr(self._request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return user.pk
+
+    @cached_property
+    def membership(self):
+        """Cached ``{'id', 'sacco_id', 'role', 'is_secretary', 'status'}`` or ``{}``."""
+        if self.user_id is None:
+            return {}
+        return _cached_part('membership', self.user_id, lambda: load_membership(self.user_id))
+
+    @property
+    def sacco_id(self):
+        return self.membership.get('sacco_id')
+
+    @cached_property
+    def sacco(self):
+        from saccos.models import SaccoOrganization
+
+        if self.sacco_id is None:
+            return None
+        return SaccoOrganization.objects.filter(pk=self.sacco_id).first()
+
+    @cached_property
+    def preferences(self):
+        """Cached ``{'timezone', 'language'}`` or ``{}``."""
+        if self.user_id is None:
+            return {}
+        return _cached_part('preferences', self.user_id, lambda: load_preferences(self.user_id))
+
+    @property
+    def timezone(self):
+        return self.preferences.get('timezone')
+
+
+def get_request_context(request):
+    """Return the request's context, attaching a new lazy one on first use."""
+    context = getattr(request, 'tenant', None)
+    if not isinstance(context, RequestContext):
+        context = RequestContext(request)
+        request.tenant = context
+    return context
@@ -0,0 +1,67 @@
+# common/sequences.py
+"""
+Counter-table allocator for human-readable document numbers.
+
+Each scope (e.g. ``saccos.loan:12:KLA``) owns one ``DocumentSequence`` row that is
+advanced with a single ``UPDATE ... SET last_value = last_value + n``, so concurrent
+writers never hand out the same number and no "last row" lookup is needed.
+The row stays locked until the surrounding transaction commits; hot scopes can pass
+``block_size`` to reserve numbers in blocks that are then served from memory.
+"""
+import threading
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import DocumentSequence
+
+_blocks = {}
+_blocks_lock = threading.Lock()
+
+
+def allocate_sequence_values(scope, count=1, seed=None):
+    """
+    Reserve ``count`` consecutive values in ``scope`` and return them as a range.
+
+    ``seed`` is an optional callable returning the last value already in use; it is
+    only called when the scope's counter row is first created, so existing numbering
+    carries on instead of restarting at 1.
+    """
+    with transaction.atomic():
+        updated = DocumentSequence.objects.filter(scope=scope).update(last_value=F('last_value') + count)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    DocumentSequence.objects.create(scope=scope, last_value=(seed() if seed else 0) + count)
+            except IntegrityError:
+                # Another writer created the row first
+                DocumentSequence.objects.filter(scope=scope).update(last_value=F('last_value') + count)
+        last_value = DocumentSequence.objects.filter(scope=scope).values_list('last_value', flat=True).get()
+    return range(last_value - count + 1, last_value + 1)
+
+
+def _stash_block(scope, values):
+    with _blocks_lock:
+        _blocks[scope] = iter(values)
+
+
+def next_sequence_value(scope, seed=None, block_size=1):
+    """
+    Return the next value in ``scope``.
+
+    With ``block_size > 1`` the process reserves that many values at once and serves
+    the rest from memory. Numbers stay unique but may be used out of order across
+    workers, and unused reservations leave gaps.
+    """
+    if block_size > 1:
+        with _blocks_lock:
+            block = _blocks.get(scope)
+            value = next(block, None) if block else None
+        if value is not None:
+            return value
+
+    values = allocate_sequence_values(scope, count=block_size, seed=seed)
+    if block_size > 1:
+        # Only reuse the block once the reservation is committed
+        transaction.on_commit(lambda: _stash_block(scope, values[1:]))
+    return values[0]
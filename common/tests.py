@@ -1,3 +1,264 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.decorators import api_view
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
 
-# Create your tests here.
+from common.models import DocumentSequence
+from common.middleware import QueryStatsMiddleware, UserTimezoneMiddleware
+from common.pagination import KeysetPagination
+from common.query_stats import QueryBudgetExceeded, QueryStats, query_budget, resolve_query_budget
+from common.request_context import get_request_context
+from common.sequences import allocate_sequence_values, next_sequence_value
+
+from saccos.middleware import SaccoTenantMiddleware
+from saccos.models import SaccoMember, SaccoOrganization
+from tasks.models import Task
+from users.models import User
+
+
+class SparseFieldsetTests(TestCase):
+    """Tests for the fields=/omit= query parameters of SparseFieldsetMixin"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='fieldsets', email='fieldsets@example.com', password='pass123'
+        )
+        Task.objects.create(title='Write report', notes='Long notes', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _first_result(self, params):
+        response = self.client.get('/api/tasks/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'][0]
+
+    def test_fields_limits_payload(self):
+        item = self._first_result({'fields': 'title,status'})
+        self.assertEqual(set(item), {'id', 'title', 'status'})
+
+    def test_omit_drops_fields(self):
+        item = self._first_result({'omit': 'notes,tags'})
+        self.assertNotIn('notes', item)
+        self.assertNotIn('tags', item)
+        self.assertIn('title', item)
+
+    def test_full_payload_without_params(self):
+        item = self._first_result({})
+        self.assertIn('notes', item)
+        self.assertIn('domain', item)
+
+    def test_sparse_request_skips_unused_prefetch(self):
+        # Count and page only: the tags prefetch is skipped
+        with self.assertNumQueries(2):
+            self._first_result({'fields': 'title,status'})
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests for cursor pagination on a composite ordering"""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.paginator = KeysetPagination()
+        self.paginator.page_size = 2
+        self.paginator.page_size_query_param = None
+        self.user = User.objects.create_user(
+            username='keyset', email='keyset@example.com', password='pass123'
+        )
+        # Identical created_at values force the id tie-breaker to be used
+        for index in range(5):
+            Task.objects.create(title=f'Task {index}', created_by=self.user)
+        Task.objects.update(created_at=Task.objects.first().created_at)
+
+    def _page(self, url):
+        request = Request(self.factory.get(url))
+        rows = self.paginator.paginate_queryset(Task.objects.all(), request)
+        return [task.title for task in rows], self.paginator.get_next_link(), self.paginator.get_previous_link()
+
+    def test_walks_forward_and_back_without_gaps(self):
+        titles, next_link, previous_link = self._page('/tasks/?pagination=cursor')
+        self.assertEqual(titles, ['Task 4', 'Task 3'])
+        self.assertIsNone(previous_link)
+
+        titles, next_link, previous_link = self._page(next_link)
+        self.assertEqual(titles, ['Task 2', 'Task 1'])
+
+        titles, last_next, _ = self._page(next_link)
+        self.assertEqual(titles, ['Task 0'])
+        self.assertIsNone(last_next)
+
+        titles, _, _ = self._page(previous_link)
+        self.assertEqual(titles, ['Task 4', 'Task 3'])
+
+    def test_invalid_cursor_is_not_found(self):
+        with self.assertRaises(NotFound):
+            self._page('/tasks/?cursor=not-a-cursor')
+
+    def test_page_numbers_unless_cursor_is_requested(self):
+        request = Request(self.factory.get('/tasks/?page=2&page_size=2&ordering=title'))
+        rows = self.paginator.paginate_queryset(Task.objects.order_by('title'), request)
+        self.assertEqual([task.title for task in rows], ['Task 2', 'Task 3'])
+        response = self.paginator.get_paginated_response([])
+        self.assertEqual(response.data['count'], 5)
+        self.assertIn('page=3', response.data['next'])
+
+    def test_cursor_mode_rejects_an_ordering(self):
+        with self.assertRaises(ValidationError):
+            self._page('/tasks/?pagination=cursor&ordering=title')
+
+
+class DocumentSequenceTests(TestCase):
+    """Tests for the counter-table document number allocator"""
+
+    def test_values_increase_per_scope(self):
+        self.assertEqual(next_sequence_value('tests.a'), 1)
+        self.assertEqual(next_sequence_value('tests.a'), 2)
+        self.assertEqual(next_sequence_value('tests.b'), 1)
+        self.assertEqual(list(allocate_sequence_values('tests.a', count=3)), [3, 4, 5])
+
+    def test_seed_only_used_when_counter_is_created(self):
+        calls = []
+
+        def seed():
+            calls.append(1)
+            return 41
+
+        self.assertEqual(next_sequence_value('tests.seeded', seed=seed), 42)
+        self.assertEqual(next_sequence_value('tests.seeded', seed=seed), 43)
+        self.assertEqual(len(calls), 1)
+
+    def test_block_allocation_serves_from_memory(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(next_sequence_value('tests.block', block_size=5), 1)
+        with self.assertNumQueries(0):
+            values = [next_sequence_value('tests.block', block_size=5) for _ in range(4)]
+        self.assertEqual(values, [2, 3, 4, 5])
+        self.assertEqual(DocumentSequence.objects.get(scope='tests.block').last_value, 5)
+
+
+class RequestContextTests(TestCase):
+    """Tests for the lazy, cached tenant/preferences request context"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(
+            username='tenant', email='tenant@example.com', password='pass123'
+        )
+        self.sacco = SaccoOrganization.objects.create(name='Tenant SACCO')
+        self.member = SaccoMember.objects.create(user=self.user, sacco=self.sacco, member_number='TN01')
+        self.user.preferences.timezone = 'Europe/London'
+        self.user.preferences.save()
+
+    def _request(self):
+        request = self.factory.get('/api/tasks/')
+        request.user = User.objects.get(pk=self.user.pk)
+        return request
+
+    def test_unused_tenant_costs_no_queries(self):
+        request = self._request()
+        with self.assertNumQueries(0):
+            SaccoTenantMiddleware(lambda r: HttpResponse())(request)
+        self.assertIsNone(get_request_context(self.factory.get('/')).sacco)
+
+    def test_membership_and_preferences_are_cached(self):
+        tenant = get_request_context(self._request())
+        with self.assertNumQueries(3):
+            self.assertEqual(tenant.sacco, self.sacco)
+            self.assertEqual(tenant.timezone, 'Europe/London')
+
+        seen = {}
+
+        def view(request):
+            seen['tz'] = timezone.get_current_timezone_name()
+            seen['sacco_id'] = request.tenant.sacco_id
+            return HttpResponse()
+
+        request = self._request()
+        with self.assertNumQueries(0):
+            UserTimezoneMiddleware(SaccoTenantMiddleware(view))(request)
+        self.assertEqual(seen, {'tz': 'Europe/London', 'sacco_id': self.sacco.id})
+
+    def test_changes_invalidate_the_cache(self):
+        self.assertEqual(get_request_context(self._request()).sacco_id, self.sacco.id)
+        self.member.delete()
+        self.assertIsNone(get_request_context(self._request()).sacco_id)
+
+        self.user.preferences.timezone = 'Asia/Tokyo'
+        self.user.preferences.save()
+        self.assertEqual(get_request_context(self._request()).timezone, 'Asia/Tokyo')
+
+
+class QueryStatsTests(TestCase):
+    """Tests for per-request query instrumentation and view query budgets"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(
+            username='querystats', email='querystats@example.com', password='pass123'
+        )
+        for index in range(3):
+            Task.objects.create(title=f'Task {index}', created_by=self.user)
+
+    def _run(self, view, budget=None):
+        if budget is not None:
+            view = query_budget(budget)(view)
+        middleware = QueryStatsMiddleware(view)
+        request = self.factory.get('/api/tasks/')
+        middleware.process_view(request, view, (), {})
+        return middleware(request)
+
+    @staticmethod
+    def n_plus_one_view(request):
+        titles = [Task.objects.get(pk=pk).title for pk in Task.objects.values_list('pk', flat=True)]
+        return HttpResponse(', '.join(titles))
+
+    @override_settings(QUERY_STATS_HEADERS=True, QUERY_STATS_CAPTURE_ORIGINS=True)
+    def test_headers_report_counts_and_duplicates(self):
+        response = self._run(self.n_plus_one_view)
+        self.assertEqual(response['X-Query-Count'], '4')
+        self.assertEqual(response['X-Duplicate-Queries'], '2')
+
+        with QueryStats(capture_origins=True) as stats:
+            self.n_plus_one_view(None)
+        self.assertEqual(stats.top_duplicates()[0]['count'], 3)
+        self.assertIn('common/tests.py', stats.hotspots()[0]['origin'])
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_budget_fails_with_the_repeated_statement(self):
+        self._run(self.n_plus_one_view, budget=4)
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'ran 4 queries (budget 3)'):
+            self._run(self.n_plus_one_view, budget=3)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_budget_is_logged_outside_tests(self):
+        with self.assertLogs('common.query_stats', level='WARNING'):
+            response = self._run(self.n_plus_one_view, budget=1)
+        self.assertEqual(response.status_code, 200)
+
+    def test_budget_resolves_viewset_actions_before_the_class(self):
+        class Budgeted(viewsets.ViewSet):
+            @query_budget(2)
+            def list(self, request):
+                return Response()
+
+            def create(self, request):
+                return Response()
+
+        Budgeted.query_budget = 10
+        view = Budgeted.as_view({'get': 'list', 'post': 'create'})
+        self.assertEqual(resolve_query_budget(view, 'GET'), 2)
+        self.assertEqual(resolve_query_budget(view, 'POST'), 10)
+
+    def test_budget_on_an_api_view_function(self):
+        @query_budget(3)
+        @api_view(['GET'])
+        def budgeted(request):
+            return Response()
+
+        self.assertEqual(resolve_query_budget(budgeted, 'GET'), 3)
@@ -59,6 +59,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'common.middleware.QueryStatsMiddleware',
     'common.middleware.UserTimezoneMiddleware',
     'saccos.middleware.SaccoTenantMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -144,7 +145,7 @@ DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="hello@tamiti.com")
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'common.pagination.DefaultPagination',
@@ -190,6 +191,18 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Serve JWT-authenticated users from the cache (users.authentication). Invalidation
+# is per cache, so only enable this when CACHES is shared by every worker
+# (e.g. Redis/Memcached); with the default per-process cache a deactivated user
+# could stay authenticated on other workers until the entry expires.
+AUTH_USER_CACHE_ENABLED: bool = config("AUTH_USER_CACHE_ENABLED", default=False, cast=bool)
+
+# Per-request query instrumentation (common.query_stats); on by default only with
+# DEBUG (settings modules that turn DEBUG on re-read it), headers follow DEBUG
+QUERY_STATS_ENABLED: bool = config("QUERY_STATS_ENABLED", default=DEBUG, cast=bool)
+QUERY_STATS_LOG_THRESHOLD: int = config("QUERY_STATS_LOG_THRESHOLD", default=50, cast=int)
+QUERY_BUDGET_STRICT: bool = config("QUERY_BUDGET_STRICT", default=False, cast=bool)
+
 # App context enforcement (per-app backend isolation)
 APP_CONTEXT_ENFORCEMENT: bool = config("APP_CONTEXT_ENFORCEMENT", default=False, cast=bool)
 
@@ -1,6 +1,9 @@
+from decouple import config
+
 from .base import *
 
 DEBUG = True
+QUERY_STATS_ENABLED: bool = config("QUERY_STATS_ENABLED", default=DEBUG, cast=bool)
 
 INSTALLED_APPS += ['debug_toolbar']
 MIDDLEWARE.insert(1, 'debug_toolbar.middleware.DebugToolbarMiddleware')
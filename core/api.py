@@ -4,6 +4,8 @@ from django.conf import settings
 from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
+from common.fieldsets import SparseFieldsetMixin
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,6 +61,6 @@ class AppContextLoggingPermission(BasePermission):
         return True
 
 
-class ContextAwareModelViewSet(ModelViewSet):
+class ContextAwareModelViewSet(SparseFieldsetMixin, ModelViewSet):
     context = None
     permission_classes = [IsAuthenticated, AppContextLoggingPermission]
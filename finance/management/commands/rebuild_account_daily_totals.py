@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from finance.models import AccountDailyTotal
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-account daily income/expense rollup from transactions "
+        "(e.g. after bulk edits that bypass Transaction.save)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account-id', type=int, action='append', help='Limit to an account (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        written = AccountDailyTotal.rebuild(
+            account_ids=options.get('account_id'),
+            batch_size=max(options['batch_size'], 1),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} account daily totals."))
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:58
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+def backfill_daily_totals(apps, schema_editor):
+    from django.db.models import Q, Sum
+
+    Transaction = apps.get_model('finance', 'Transaction')
+    AccountDailyTotal = apps.get_model('finance', 'AccountDailyTotal')
+
+    rows = Transaction.objects.filter(account__isnull=False).values('account_id', 'date').annotate(
+        income_total=Sum('amount', filter=Q(type='income')),
+        expense_total=Sum('amount', filter=Q(type='expense')),
+    ).order_by()
+    AccountDailyTotal.objects.bulk_create(
+        (
+            AccountDailyTotal(
+                account_id=row['account_id'],
+                date=row['date'],
+                income=row['income_total'] or 0,
+                expense=row['expense_total'] or 0,
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0018_alter_receipt_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDailyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False)),
+                ('date', models.DateField()),
+                ('income', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expense', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_totals', to='finance.account')),
+            ],
+            options={
+                'ordering': ['account', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('account', 'date'), name='uniq_account_daily_total')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_totals, migrations.RunPython.noop),
+    ]
@@ -347,6 +347,9 @@ class Transaction(BaseModel):
 
     def save(self, *args, **kwargs):
         creating = self._state.adding
+        previous = None
+        if not creating:
+            previous = Transaction.objects.filter(pk=self.pk).values_list('account_id', 'date').first()
         super().save(*args, **kwargs)
         if creating and self.account:
             # For company transactions, apply net cash effect including charges
@@ -360,12 +363,22 @@ class Transaction(BaseModel):
 
             self.account.apply_transaction(self.type, total_amount)
 
+        if creating:
+            AccountDailyTotal.apply(self.account_id, self.date, self.type, self.amount)
+        else:
+            # Edits may move the amount between days or accounts; recount both days
+            AccountDailyTotal.refresh(self.account_id, self.date)
+            if previous and previous != (self.account_id, self.date):
+                AccountDailyTotal.refresh(*previous)
+
     def delete(self, *args, **kwargs):
         account = self.account
         tx_type = self.type
         amount = self.amount
         charge = self.transaction_charge
+        account_id, tx_date = self.account_id, self.date
         super().delete(*args, **kwargs)
+        AccountDailyTotal.refresh(account_id, tx_date)
 
         if account:
             total_amount = amount
@@ -381,6 +394,91 @@ class Transaction(BaseModel):
             account.save(update_fields=['balance'])
 
 
+class AccountDailyTotal(BaseModel):
+    """
+    Gross income and expense posted to an account per day.
+    Kept in step by Transaction.save/delete so balances as of a date sum days, not transactions.
+    """
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='daily_totals')
+    date = models.DateField()
+    income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expense = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['account', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'date'], name='uniq_account_daily_total'),
+        ]
+
+    def __str__(self):
+        return f"{self.account} {self.date}: +{self.income} / -{self.expense}"
+
+    @classmethod
+    def apply(cls, account_id, date, tx_type, amount):
+        """Add one new transaction's amount to its day."""
+        if not account_id:
+            return
+        field = 'income' if tx_type == TransactionType.INCOME else 'expense'
+        if not cls.objects.filter(account_id=account_id, date=date).update(**{field: F(field) + amount}):
+            cls.refresh(account_id, date)
+
+    @classmethod
+    def refresh(cls, account_id, date):
+        """Recount one account-day from its transactions."""
+        if not account_id:
+            return
+        totals = Transaction.objects.filter(account_id=account_id, date=date).aggregate(
+            income=Sum('amount', filter=Q(type=TransactionType.INCOME)),
+            expense=Sum('amount', filter=Q(type=TransactionType.EXPENSE)),
+        )
+        if totals['income'] is None and totals['expense'] is None:
+            cls.objects.filter(account_id=account_id, date=date).delete()
+            return
+        cls.objects.update_or_create(
+            account_id=account_id,
+            date=date,
+            defaults={
+                'income': totals['income'] or Decimal('0'),
+                'expense': totals['expense'] or Decimal('0'),
+            },
+        )
+
+    @classmethod
+    def rebuild(cls, account_ids=None, batch_size=1000):
+        """Recreate the rollup from transactions with one grouped query; returns rows written."""
+        transactions = Transaction.objects.filter(account__isnull=False)
+        existing = cls.objects.all()
+        if account_ids is not None:
+            transactions = transactions.filter(account_id__in=account_ids)
+            existing = existing.filter(account_id__in=account_ids)
+        rows = transactions.values('account_id', 'date').annotate(
+            income_total=Sum('amount', filter=Q(type=TransactionType.INCOME)),
+            expense_total=Sum('amount', filter=Q(type=TransactionType.EXPENSE)),
+        ).order_by()
+        existing.delete()
+        created = cls.objects.bulk_create(
+            (
+                cls(
+                    account_id=row['account_id'],
+                    date=row['date'],
+                    income=row['income_total'] or Decimal('0'),
+                    expense=row['expense_total'] or Decimal('0'),
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=batch_size,
+        )
+        return len(created)
+
+    @classmethod
+    def balance_before(cls, account, date):
+        """Income minus expense posted to ``account`` before ``date``."""
+        totals = cls.objects.filter(account=account, date__lt=date).aggregate(
+            income=Sum('income'), expense=Sum('expense')
+        )
+        return (totals['income'] or Decimal('0')) - (totals['expense'] or Decimal('0'))
+
+
 class Quotation(BaseModel):
     party = models.ForeignKey(Party, on_delete=models.CASCADE)
     quote_number = models.CharField(max_length=50, blank=True)
@@ -17,6 +17,8 @@ from decimal import Decimal
 from datetime import datetime, timedelta
 from django.db.models import Q
 from core.api import AppContextLoggingPermission
+from common.fieldsets import SparseFieldsetMixin
+from common.pagination import KeysetPagination
 from django.core.exceptions import ValidationError
 
 
@@ -24,7 +26,7 @@ class StudioScopedMixin:
     context = "studio"
 
 
-class BaseModelViewSet(StudioScopedMixin, viewsets.ModelViewSet):
+class BaseModelViewSet(StudioScopedMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, AppContextLoggingPermission]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     ordering_fields = '__all__'
@@ -404,6 +406,8 @@ class GoalMilestoneViewSet(BaseModelViewSet):
 
 class TransactionViewSet(BaseModelViewSet):
     serializer_class = TransactionSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date', '-created_at', '-id')
 
     def get_queryset(self):
         """
@@ -687,6 +691,7 @@ class DebtsViewSet(viewsets.ViewSet):
 
 class FinanceSummaryView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 6
 
     def get(self, request):
         # Only include transactions for studio-domain accounts
@@ -771,6 +776,8 @@ class PersonalTransactionViewSet(BaseModelViewSet):
     filterset_fields = ['type', 'account', 'income_source', 'expense_category', 'date', 'is_recurring', 'linked_invoice', 'linked_goal', 'linked_budget']
     ordering = ['-date']
     parser_classes = (MultiPartParser, FormParser, JSONParser)
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date', '-created_at', '-id')
     
     def get_queryset(self):
         return PersonalTransaction.objects.filter(
@@ -1081,6 +1088,7 @@ class PersonalTransactionRecurringViewSet(BaseModelViewSet):
 class PersonalFinanceDashboardView(APIView):
     """Dashboard view for personal finance overview"""
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 8
 
     def get(self, request):
         user = request.user
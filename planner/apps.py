@@ -5,3 +5,5 @@ class PlannerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'planner'
 
+    def ready(self):
+        import planner.signals
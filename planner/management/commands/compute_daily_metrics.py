@@ -6,6 +6,7 @@ from datetime import date, timedelta
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count
 
 from users.models import User
 from planner.services import ProductivityAnalyzer
@@ -31,6 +32,18 @@ class Command(BaseCommand):
             action='store_true',
             help='Also generate productivity insights (requires more data)',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Number of users to load and process per batch',
+        )
+        parser.add_argument(
+            '--backfill-days',
+            type=int,
+            default=0,
+            help='Also rebuild hourly histograms for this many days before the date',
+        )
 
     def handle(self, *args, **options):
         # Determine target date
@@ -50,57 +63,83 @@ class Command(BaseCommand):
 
         # Get users to process
         if options['user_id']:
-            try:
-                users = [User.objects.get(id=options['user_id'])]
-            except User.DoesNotExist:
+            if not User.objects.filter(id=options['user_id']).exists():
                 self.stdout.write(
                     self.style.ERROR(f"User with ID {options['user_id']} not found.")
                 )
                 return
+            user_ids = [options['user_id']]
         else:
             # Process all active users who have had some activity
-            users = User.objects.filter(
-                is_active=True,
-                time_blocks__start__date=target_date
-            ).distinct()
+            user_ids = list(
+                User.objects.filter(
+                    is_active=True,
+                    time_blocks__start__date=target_date
+                ).values_list('id', flat=True).distinct().order_by('id')
+            )
+
+        # Hourly histograms for every user are rebuilt by one grouped query
+        histogram_start = target_date - timedelta(days=max(options['backfill_days'], 0))
+        histogram_count = ProductivityAnalyzer.rebuild_histograms(
+            histogram_start, target_date,
+            user_ids=[options['user_id']] if options['user_id'] else None,
+        )
+        self.stdout.write(f"✓ Rebuilt {histogram_count} hourly histograms")
 
         processed_count = 0
         insights_count = 0
+        chunk_size = max(options['chunk_size'], 1)
 
-        for user in users:
-            try:
-                with transaction.atomic():
-                    # Compute daily review metrics
-                    analyzer = ProductivityAnalyzer(user)
-                    review = analyzer.compute_daily_review(target_date)
-                    
+        for offset in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[offset:offset + chunk_size]
+            users = User.objects.in_bulk(chunk)
+            review_counts = dict(
+                DailyReview.objects.filter(owner_user_id__in=chunk)
+                .values('owner_user_id')
+                .annotate(total=Count('id'))
+                .values_list('owner_user_id', 'total')
+            )
+
+            for user_id in chunk:
+                user = users[user_id]
+                try:
+                    with transaction.atomic():
+                        # Compute daily review metrics
+                        analyzer = ProductivityAnalyzer(user)
+                        review, created = DailyReview.objects.get_or_create(
+                            owner_user=user,
+                            date=target_date,
+                            defaults={'summary': ''}
+                        )
+                        review.calculate_metrics()
+
+                        self.stdout.write(
+                            f"✓ Computed metrics for {user.email}: "
+                            f"{review.productivity_score}% productivity, "
+                            f"{review.completion_rate}% completion rate"
+                        )
+                        processed_count += 1
+
+                        # Generate insights if requested and user has enough data
+                        if options['generate_insights']:
+                            review_count = review_counts.get(user_id, 0) + int(created)
+                            if review_count >= 7:  # Need at least 7 days of data
+                                insights = analyzer.generate_productivity_insights()
+                                insights_count += len(insights)
+
+                                self.stdout.write(
+                                    f"  ✓ Generated {len(insights)} insights for {user.email}"
+                                )
+                            else:
+                                self.stdout.write(
+                                    f"  - Skipped insights for {user.email} "
+                                    f"(only {review_count} days of data)"
+                                )
+
+                except Exception as e:
                     self.stdout.write(
-                        f"✓ Computed metrics for {user.email}: "
-                        f"{review.productivity_score}% productivity, "
-                        f"{review.completion_rate}% completion rate"
+                        self.style.ERROR(f"Error processing {user.email}: {str(e)}")
                     )
-                    processed_count += 1
-
-                    # Generate insights if requested and user has enough data
-                    if options['generate_insights']:
-                        review_count = DailyReview.objects.filter(owner_user=user).count()
-                        if review_count >= 7:  # Need at least 7 days of data
-                            insights = analyzer.generate_productivity_insights()
-                            insights_count += len(insights)
-                            
-                            self.stdout.write(
-                                f"  ✓ Generated {len(insights)} insights for {user.email}"
-                            )
-                        else:
-                            self.stdout.write(
-                                f"  - Skipped insights for {user.email} "
-                                f"(only {review_count} days of data)"
-                            )
-
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f"Error processing {user.email}: {str(e)}")
-                )
 
         # Summary
         self.stdout.write(
@@ -0,0 +1,85 @@
+"""
+Management command to generate smart schedules for every member of a department.
+Run this as a morning cron job so team members open a ready-made plan.
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import Department
+from planner.services import TeamScheduler
+
+
+class Command(BaseCommand):
+    help = 'Generate optimized schedules for all members of one or more departments in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--department-id',
+            type=int,
+            action='append',
+            help='Department to plan for (repeatable). Defaults to all departments.',
+        )
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='Date to plan for (YYYY-MM-DD). Defaults to today.',
+        )
+        parser.add_argument(
+            '--scope',
+            choices=['day', 'week'],
+            default='day',
+            help='Plan a single day or the whole week containing the date',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of worker processes (defaults to the CPU count)',
+        )
+        parser.add_argument(
+            '--commit',
+            action='store_true',
+            help='Write the schedules as committed time blocks (replacing earlier auto blocks)',
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                target_date = date.fromisoformat(options['date'])
+            except ValueError:
+                self.stdout.write(
+                    self.style.ERROR(f"Invalid date format: {options['date']}. Use YYYY-MM-DD.")
+                )
+                return
+        else:
+            target_date = timezone.localdate()
+
+        departments = Department.objects.order_by('id')
+        if options['department_id']:
+            departments = departments.filter(id__in=options['department_id'])
+
+        scope = options['scope']
+        self.stdout.write(f"Planning {scope} schedules for {target_date}")
+
+        planned_count = 0
+        block_count = 0
+        for department in departments:
+            scheduler = TeamScheduler(department, workers=options['workers'])
+            try:
+                schedules = scheduler.generate_schedules(scope, target_date)
+                if options['commit'] and schedules:
+                    block_count += scheduler.commit_schedules(schedules, scope, target_date)
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f"Error planning {department.name}: {str(e)}")
+                )
+                continue
+
+            planned_count += len(schedules)
+            self.stdout.write(f"✓ {department.name}: planned {len(schedules)} members")
+
+        summary = f"\nCompleted! Planned {planned_count} members."
+        if options['commit']:
+            summary += f" Created {block_count} time blocks."
+        self.stdout.write(self.style.SUCCESS(summary))
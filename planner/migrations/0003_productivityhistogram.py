@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:30
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0002_alter_availabilitytemplate_uuid_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductivityHistogram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False)),
+                ('date', models.DateField()),
+                ('hour_counts', models.JSONField(default=list, help_text='24 counts, index = local hour of block start')),
+                ('completed_blocks', models.PositiveIntegerField(default=0)),
+                ('owner_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='productivity_histograms', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('owner_user', 'date'), name='uniq_productivity_histogram_per_day')],
+            },
+        ),
+    ]
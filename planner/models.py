@@ -95,6 +95,23 @@ class TimeBlock(BaseModel):
         return f"TimeBlock({who}) {self.title} [{self.start.strftime('%H:%M')}-{self.end.strftime('%H:%M')}]"
 
 
+class ProductivityHistogram(BaseModel):
+    """Per-user, per-day count of completed focus blocks by local start hour"""
+    owner_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='productivity_histograms')
+    date = models.DateField()
+    hour_counts = models.JSONField(default=list, help_text="24 counts, index = local hour of block start")
+    completed_blocks = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['owner_user', 'date'], name='uniq_productivity_histogram_per_day')
+        ]
+
+    def __str__(self):
+        return f"ProductivityHistogram({self.owner_user}) {self.date} - {self.completed_blocks} blocks"
+
+
 class WorkGoal(BaseModel):
     """Work goals separate from Finance goals for productivity tracking"""
     name = models.CharField(max_length=255)
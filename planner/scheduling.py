@@ -0,0 +1,177 @@
+"""
+Integer-minute interval core for the smart scheduler.
+
+Windows and busy periods are half-open ``(start, end)`` pairs of minutes since the
+Unix epoch, kept sorted so that subtraction and packing are single linear sweeps.
+Nothing here touches the ORM, so the functions can run in worker processes.
+"""
+from datetime import date, datetime, time, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Interval = Tuple[int, int]
+
+DEFAULT_DAY_SLOTS = [(time(9, 0), time(17, 0))]
+# Leftover slivers under this many minutes are not worth scheduling into
+MIN_FREE_WINDOW_MINUTES = 15
+
+
+def to_minute(value: datetime, ceil: bool = False) -> int:
+    """Convert an aware datetime to minutes since the epoch (floor by default)."""
+    seconds = value.timestamp()
+    minute = int(seconds // 60)
+    if ceil and seconds % 60:
+        minute += 1
+    return minute
+
+
+def from_minute(minute: int, tz) -> datetime:
+    """Convert epoch minutes back to an aware datetime in ``tz``."""
+    return datetime.fromtimestamp(minute * 60, tz=dt_timezone.utc).astimezone(tz)
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort intervals and merge the ones that overlap or touch."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(windows: List[Interval], busy: List[Interval], min_length: int = 0) -> List[Interval]:
+    """
+    Remove ``busy`` periods from ``windows`` with a single sweep.
+
+    Both inputs must be sorted by start; ``busy`` must be merged. Free pieces shorter
+    than ``min_length`` minutes are dropped. Runs in O(len(windows) + len(busy)).
+    """
+    free: List[Interval] = []
+    index = 0
+    for window_start, window_end in windows:
+        # Busy periods ending before this window can never overlap a later one
+        while index < len(busy) and busy[index][1] <= window_start:
+            index += 1
+        cursor = window_start
+        scan = index
+        while scan < len(busy) and busy[scan][0] < window_end:
+            busy_start, busy_end = busy[scan]
+            if busy_start > cursor:
+                free.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            scan += 1
+        if cursor < window_end:
+            free.append((cursor, window_end))
+    if min_length:
+        free = [(start, end) for start, end in free if end - start >= min_length]
+    return free
+
+
+def pack_tasks(
+    tasks: List[Tuple[Optional[int], str, int]],
+    windows: List[Interval],
+    focus_minutes: int,
+    break_minutes: int,
+    min_block_minutes: int = 10,
+) -> List[Tuple[Optional[int], str, int, int, bool]]:
+    """
+    Greedily pack ``(task_id, title, minutes)`` tasks into ``windows`` in order.
+
+    Work is split into focus-sized blocks separated by breaks while more work
+    remains and the break fits the current window. Returns
+    ``(task_id, title, start, end, is_break)`` tuples; one pass over tasks and windows.
+    """
+    blocks = []
+    if not windows:
+        return blocks
+
+    window_index = 0
+    window_end = windows[0][1]
+    cursor = windows[0][0]
+
+    for task_id, title, task_minutes in tasks:
+        if window_index >= len(windows):
+            break
+        remaining = task_minutes
+        while remaining > 0 and window_index < len(windows):
+            while cursor >= window_end:
+                window_index += 1
+                if window_index >= len(windows):
+                    break
+                cursor, window_end = windows[window_index]
+            if window_index >= len(windows):
+                break
+
+            block_size = min(remaining, window_end - cursor, focus_minutes)
+            if block_size < min_block_minutes:
+                cursor = window_end
+                continue
+
+            blocks.append((task_id, title, cursor, cursor + block_size, False))
+            remaining -= block_size
+            cursor += block_size
+
+            if remaining > 0 and cursor + break_minutes <= window_end:
+                blocks.append((None, 'Break', cursor, cursor + break_minutes, True))
+                cursor += break_minutes
+    return blocks
+
+
+def day_windows(date_obj: date, slots, tz) -> List[Interval]:
+    """Turn ``(start_time, end_time)`` template slots for a day into merged intervals."""
+    return merge_intervals(
+        (to_minute(datetime.combine(date_obj, start, tz), ceil=True),
+         to_minute(datetime.combine(date_obj, end, tz)))
+        for start, end in slots
+    )
+
+
+def select_day_slots(weekday: int, user_templates: Dict, team_templates: Dict):
+    """User templates win over team templates; default to 9-5 when neither exists."""
+    return user_templates.get(weekday) or team_templates.get(weekday) or DEFAULT_DAY_SLOTS
+
+
+def order_for_peak_hours(windows: List[Interval], peak_hours: Iterable[int], tz) -> List[Interval]:
+    """Return windows touching a peak hour first, keeping the order within each group."""
+    peak = set(peak_hours)
+    peak_windows = []
+    regular_windows = []
+    for start, end in windows:
+        start_hour = from_minute(start, tz).hour
+        end_hour = from_minute(end, tz).hour
+        if any(hour in peak for hour in range(start_hour, end_hour + 1)):
+            peak_windows.append((start, end))
+        else:
+            regular_windows.append((start, end))
+    return peak_windows + regular_windows
+
+
+def free_day_windows(windows: List[Interval], busy: List[Interval]) -> List[Interval]:
+    """Subtract busy periods from one day's windows."""
+    if not windows:
+        return []
+    day_start, day_end = windows[0][0], windows[-1][1]
+    if not any(start < day_end and end > day_start for start, end in busy):
+        return windows
+    return subtract_intervals(windows, busy, min_length=MIN_FREE_WINDOW_MINUTES)
+
+
+def build_schedule(plan: Dict) -> Dict:
+    """
+    Compute one schedule from plain data; safe to run in a worker process.
+
+    ``plan`` holds ``days`` (a list of per-day interval lists), ``busy`` (merged
+    intervals), ``peak_hours``, ``tz``, ``tasks`` (``(task_id, title, minutes)`` in
+    priority order), ``focus_minutes`` and ``break_minutes``. Returns the free
+    ``windows`` and packed ``blocks`` in epoch minutes.
+    """
+    windows = []
+    for day in plan['days']:
+        free = free_day_windows(day, plan['busy'])
+        windows.extend(order_for_peak_hours(free, plan['peak_hours'], plan['tz']))
+    blocks = pack_tasks(plan['tasks'], windows, plan['focus_minutes'], plan['break_minutes'])
+    return {'key': plan.get('key'), 'windows': windows, 'blocks': blocks}
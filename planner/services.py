@@ -2,6 +2,9 @@
 Smart scheduling and productivity services for the planner app.
 Algorithmic approaches for intelligent task scheduling and rescheduling.
 """
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, date, time
 from typing import List, Dict, Tuple, Optional
 from decimal import Decimal
@@ -11,11 +14,18 @@ from django.db import models, transaction
 from django.utils import timezone
 from django.core.cache import cache
 from django.db.models import Q, Avg, Count, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncDate
 
+from common.enums import BlockStatus
 from tasks.models import Task
+from users.models import User
+from .scheduling import (
+    build_schedule, day_windows, free_day_windows, from_minute, merge_intervals,
+    order_for_peak_hours, pack_tasks, select_day_slots, to_minute,
+)
 from .models import (
     TimeBlock, AvailabilityTemplate, CalendarEvent, BreakPolicy,
-    DailyReview, WorkGoal, ProductivityInsight
+    DailyReview, WorkGoal, ProductivityInsight, ProductivityHistogram
 )
 
 
@@ -39,11 +49,14 @@ class SmartScheduler:
         # Enhanced task selection with priority optimization
         tasks = self._get_optimized_task_list(target_date, scope, insights)
         
+        # Templates, busy events and break policy for the whole scope in one pass
+        context = self._load_scheduling_context(self._get_scope_dates(target_date, scope))
+
         # Smart time window calculation
-        windows = self._get_optimized_time_windows(target_date, scope, insights)
+        windows = self._get_optimized_time_windows(target_date, scope, insights, context)
         
         # Advanced packing algorithm
-        schedule = self._advanced_pack_algorithm(tasks, windows, insights)
+        schedule = self._advanced_pack_algorithm(tasks, windows, insights, context)
         
         # Cache the result
         cache.set(cache_key, schedule, self.cache_timeout)
@@ -51,33 +64,23 @@ class SmartScheduler:
     
     def _get_productivity_insights(self) -> Dict:
         """Get user's productivity patterns for optimization"""
-        insights = {}
-        
-        # Peak hours insight
-        peak_hours = ProductivityInsight.objects.filter(
+        records = ProductivityInsight.objects.filter(
             owner_user=self.user,
-            insight_type='peak_hours',
+            insight_type__in=['peak_hours', 'task_duration'],
             is_active=True
-        ).first()
-        
-        if peak_hours:
-            insights['peak_hours'] = peak_hours.data.get('hours', [9, 10, 11, 14, 15])
-        else:
-            insights['peak_hours'] = [9, 10, 11, 14, 15]  # Default peak hours
-        
-        # Optimal task duration
-        task_duration = ProductivityInsight.objects.filter(
-            owner_user=self.user,
-            insight_type='task_duration',
-            is_active=True
-        ).first()
-        
-        if task_duration:
-            insights['optimal_duration'] = task_duration.data.get('minutes', 45)
-        else:
-            insights['optimal_duration'] = 45  # Default 45 minutes
-        
-        return insights
+        ).values_list('insight_type', 'data')
+        return self.build_insights(dict(records))
+
+    @staticmethod
+    def build_insights(data_by_type: Dict) -> Dict:
+        """Turn stored insight data (keyed by insight type) into scheduling hints"""
+        peak_hours = data_by_type.get('peak_hours')
+        task_duration = data_by_type.get('task_duration')
+        return {
+            # Default peak hours and a 45 minute default duration
+            'peak_hours': peak_hours.get('hours', [9, 10, 11, 14, 15]) if peak_hours else [9, 10, 11, 14, 15],
+            'optimal_duration': task_duration.get('minutes', 45) if task_duration else 45,
+        }
     
     def _get_optimized_task_list(self, target_date: date, scope: str, insights: Dict) -> List[Task]:
         """Get tasks optimized for scheduling with smart filtering"""
@@ -163,188 +166,130 @@ class SmartScheduler:
         tasks.sort(key=calculate_priority_score, reverse=True)
         return tasks
     
-    def _get_optimized_time_windows(self, target_date: date, scope: str, insights: Dict) -> List[Tuple[datetime, datetime]]:
-        """Get time windows optimized for user's peak productivity"""
+    @staticmethod
+    def _get_scope_dates(target_date: date, scope: str) -> List[date]:
         if scope == 'week':
             start_date = target_date - timedelta(days=target_date.weekday())
-            dates = [start_date + timedelta(days=i) for i in range(7)]
-        else:
-            dates = [target_date]
-        
+            return [start_date + timedelta(days=i) for i in range(7)]
+        return [target_date]
+
+    def _get_department(self):
+        if not hasattr(self, '_department'):
+            self._department = getattr(self.user, 'staff_profile', None) and self.user.staff_profile.department
+        return self._department
+
+    def _load_scheduling_context(self, dates: List[date]) -> Dict:
+        """
+        Load templates, busy events and break policy for ``dates`` in one pass.
+
+        Three queries regardless of scope: availability templates (user and team),
+        busy calendar events over the whole range, and break policies.
+        """
+        dept = self._get_department()
+        owner_q = Q(owner_user=self.user) | (Q(owner_team=dept) if dept else Q(pk__isnull=True))
+        tz = timezone.get_current_timezone()
+
+        user_templates = defaultdict(list)
+        team_templates = defaultdict(list)
+        templates = AvailabilityTemplate.objects.filter(
+            owner_q, day_of_week__in={d.weekday() for d in dates}
+        ).values_list('owner_user_id', 'day_of_week', 'start_time', 'end_time')
+        for owner_user_id, day_of_week, start_time, end_time in templates:
+            target = user_templates if owner_user_id == self.user.id else team_templates
+            target[day_of_week].append((start_time, end_time))
+
+        range_start = datetime.combine(min(dates), time.min, tz)
+        range_end = datetime.combine(max(dates) + timedelta(days=1), time.min, tz)
+        events = CalendarEvent.objects.filter(
+            owner_q, is_busy=True, start__lt=range_end, end__gt=range_start
+        ).values_list('start', 'end')
+        busy = merge_intervals(
+            (to_minute(start), to_minute(end, ceil=True)) for start, end in events
+        )
+
+        # The user's own break policy wins over the team policy
+        user_policy = team_policy = None
+        policies = BreakPolicy.objects.filter(owner_q, active=True).order_by('id').values_list(
+            'owner_user_id', 'focus_minutes', 'break_minutes'
+        )
+        for owner_user_id, focus, brk in policies:
+            if owner_user_id == self.user.id:
+                user_policy = user_policy or (focus, brk)
+            else:
+                team_policy = team_policy or (focus, brk)
+        focus_minutes, break_minutes = user_policy or team_policy or (25, 5)
+
+        return {
+            'tz': tz,
+            'user_templates': user_templates,
+            'team_templates': team_templates,
+            'busy': busy,
+            'focus_minutes': focus_minutes,
+            'break_minutes': break_minutes,
+        }
+
+    def _get_optimized_time_windows(self, target_date: date, scope: str, insights: Dict,
+                                    context: Optional[Dict] = None) -> List[Tuple[int, int]]:
+        """Get free windows (epoch minutes), peak-hour windows first within each day"""
+        dates = self._get_scope_dates(target_date, scope)
+        if context is None:
+            context = self._load_scheduling_context(dates)
+
         all_windows = []
         for date_obj in dates:
-            daily_windows = self._get_daily_windows(date_obj, insights)
-            all_windows.extend(daily_windows)
-        
+            all_windows.extend(self._get_daily_windows(date_obj, insights, context))
         return all_windows
-    
-    def _get_daily_windows(self, date_obj: date, insights: Dict) -> List[Tuple[datetime, datetime]]:
-        """Get optimized daily time windows"""
-        weekday = date_obj.weekday()
-        
-        # Get availability templates
-        templates = AvailabilityTemplate.objects.filter(
-            owner_user=self.user, day_of_week=weekday
-        )
-        
-        if not templates.exists():
-            dept = getattr(self.user, 'staff_profile', None) and self.user.staff_profile.department
-            if dept:
-                templates = AvailabilityTemplate.objects.filter(
-                    owner_team=dept, day_of_week=weekday
-                )
-        
-        # Default availability if none set
-        if not templates.exists():
-            tz = timezone.get_current_timezone()
-            start_dt = datetime.combine(date_obj, time(9, 0), tz)
-            end_dt = datetime.combine(date_obj, time(17, 0), tz)
-            windows = [(start_dt, end_dt)]
-        else:
-            tz = timezone.get_current_timezone()
-            windows = []
-            for template in templates:
-                start_dt = datetime.combine(date_obj, template.start_time, tz)
-                end_dt = datetime.combine(date_obj, template.end_time, tz)
-                windows.append((start_dt, end_dt))
-        
-        # Subtract calendar events
-        windows = self._subtract_calendar_events(windows)
-        
-        # Optimize windows for peak hours
-        return self._optimize_for_peak_hours(windows, insights['peak_hours'])
-    
-    def _subtract_calendar_events(self, windows: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+
+    def _get_daily_windows(self, date_obj: date, insights: Dict, context: Dict) -> List[Tuple[int, int]]:
+        """Get optimized daily time windows from the preloaded context"""
+        slots = select_day_slots(date_obj.weekday(), context['user_templates'], context['team_templates'])
+        windows = day_windows(date_obj, slots, context['tz'])
+        windows = self._subtract_calendar_events(windows, context['busy'])
+        return self._optimize_for_peak_hours(windows, insights['peak_hours'], context['tz'])
+
+    def _subtract_calendar_events(self, windows: List[Tuple[int, int]], busy: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
         """Remove busy calendar events from available windows"""
-        if not windows:
-            return []
-        
-        start = min(w[0] for w in windows)
-        end = max(w[1] for w in windows)
-        
-        dept = getattr(self.user, 'staff_profile', None) and self.user.staff_profile.department
-        q = Q(owner_user=self.user) | (Q(owner_team=dept) if dept else Q(pk__isnull=True))
-        
-        events = CalendarEvent.objects.filter(
-            q, is_busy=True, start__lt=end, end__gt=start
-        )
-        
-        free_windows = windows[:]
-        for event in events:
-            updated_windows = []
-            for window_start, window_end in free_windows:
-                if event.end <= window_start or event.start >= window_end:
-                    # No overlap
-                    updated_windows.append((window_start, window_end))
-                else:
-                    # Split window around event
-                    if window_start < event.start:
-                        updated_windows.append((window_start, event.start))
-                    if event.end < window_end:
-                        updated_windows.append((event.end, window_end))
-            
-            # Filter out windows too small (< 15 minutes)
-            free_windows = [
-                (s, e) for s, e in updated_windows 
-                if (e - s).total_seconds() >= 900
-            ]
-        
-        return free_windows
-    
-    def _optimize_for_peak_hours(self, windows: List[Tuple[datetime, datetime]], peak_hours: List[int]) -> List[Tuple[datetime, datetime]]:
+        return free_day_windows(windows, busy)
+
+    def _optimize_for_peak_hours(self, windows: List[Tuple[int, int]], peak_hours: List[int], tz) -> List[Tuple[int, int]]:
         """Reorder windows to prioritize peak productivity hours"""
-        peak_windows = []
-        regular_windows = []
-        
-        for start, end in windows:
-            window_hours = set(range(start.hour, end.hour + 1))
-            if any(hour in peak_hours for hour in window_hours):
-                peak_windows.append((start, end))
-            else:
-                regular_windows.append((start, end))
-        
-        # Return peak hours first
-        return peak_windows + regular_windows
-    
-    def _advanced_pack_algorithm(self, tasks: List[Task], windows: List[Tuple[datetime, datetime]], insights: Dict) -> Dict:
+        return order_for_peak_hours(windows, peak_hours, tz)
+
+    def _advanced_pack_algorithm(self, tasks: List[Task], windows: List[Tuple[int, int]], insights: Dict,
+                                 context: Dict) -> Dict:
         """Advanced task packing with break optimization"""
+        if not windows:
+            return self._format_schedule([], [], context['tz'])
+
+        packed = pack_tasks(
+            [(task.id, task.title, self._get_task_duration(task, insights)) for task in tasks],
+            windows,
+            context['focus_minutes'],
+            context['break_minutes'],
+        )
+        return self._format_schedule(windows, packed, context['tz'])
+
+    def _format_schedule(self, windows: List[Tuple[int, int]], packed: List[Tuple], tz) -> Dict:
+        """Build the API schedule payload from epoch-minute windows and packed blocks"""
         if not windows:
             return {'blocks': [], 'capacity_usage': 0, 'window_minutes': 0, 'planned_minutes': 0}
-        
-        # Get break policy
-        break_policy = BreakPolicy.objects.filter(owner_user=self.user, active=True).first()
-        if not break_policy:
-            dept = getattr(self.user, 'staff_profile', None) and self.user.staff_profile.department
-            if dept:
-                break_policy = BreakPolicy.objects.filter(owner_team=dept, active=True).first()
-        
-        focus_minutes = break_policy.focus_minutes if break_policy else 25
-        break_minutes = break_policy.break_minutes if break_policy else 5
-        
-        blocks = []
-        window_cursor = 0
-        current_window_start, current_window_end = windows[window_cursor]
-        cursor = current_window_start
-        
-        for task in tasks:
-            if window_cursor >= len(windows):
-                break
-            
-            task_minutes = self._get_task_duration(task, insights)
-            remaining_minutes = task_minutes
-            
-            while remaining_minutes > 0 and window_cursor < len(windows):
-                # Advance to next available window if needed
-                while cursor >= current_window_end:
-                    window_cursor += 1
-                    if window_cursor >= len(windows):
-                        break
-                    current_window_start, current_window_end = windows[window_cursor]
-                    cursor = current_window_start
-                
-                if window_cursor >= len(windows):
-                    break
-                
-                # Calculate optimal block size
-                available_time = (current_window_end - cursor).total_seconds() / 60
-                block_size = min(remaining_minutes, available_time, focus_minutes)
-                
-                if block_size < 10:  # Skip if less than 10 minutes available
-                    cursor = current_window_end
-                    continue
-                
-                # Create task block
-                block_end = cursor + timedelta(minutes=block_size)
-                blocks.append({
-                    'task_id': task.id,
-                    'title': task.title,
-                    'start': cursor,
-                    'end': block_end,
-                    'is_break': False,
-                })
-                
-                remaining_minutes -= block_size
-                cursor = block_end
-                
-                # Add break if there's more work and space
-                if remaining_minutes > 0 and cursor + timedelta(minutes=break_minutes) <= current_window_end:
-                    break_end = cursor + timedelta(minutes=break_minutes)
-                    blocks.append({
-                        'task_id': None,
-                        'title': 'Break',
-                        'start': cursor,
-                        'end': break_end,
-                        'is_break': True,
-                    })
-                    cursor = break_end
-        
+
         # Calculate metrics
-        total_window_minutes = sum((end - start).total_seconds() / 60 for start, end in windows)
-        planned_minutes = sum((b['end'] - b['start']).total_seconds() / 60 for b in blocks if not b['is_break'])
+        total_window_minutes = sum(end - start for start, end in windows)
+        planned_minutes = sum(end - start for _, _, start, end, is_break in packed if not is_break)
         capacity_usage = (planned_minutes / total_window_minutes) if total_window_minutes > 0 else 0
-        
+
         return {
-            'blocks': [self._serialize_block(b) for b in blocks],
+            'blocks': [
+                self._serialize_block({
+                    'task_id': task_id,
+                    'title': title,
+                    'start': from_minute(start, tz),
+                    'end': from_minute(end, tz),
+                    'is_break': is_break,
+                })
+                for task_id, title, start, end, is_break in packed
+            ],
             'capacity_usage': capacity_usage,
             'window_minutes': int(total_window_minutes),
             'planned_minutes': int(planned_minutes),
@@ -371,12 +316,273 @@ class SmartScheduler:
         }
 
 
+class TeamScheduler:
+    """
+    Batch schedule generation for every member of a department.
+
+    Templates, busy events, break policies, insights and candidate tasks are
+    loaded for the whole team in a handful of queries; the per-member interval
+    work runs in worker processes. Results match ``SmartScheduler`` and are
+    written to its cache so members' own preview requests are served from it.
+    """
+
+    def __init__(self, department, workers: Optional[int] = None):
+        self.department = department
+        self.workers = workers
+
+    def get_members(self) -> List[User]:
+        return list(
+            User.objects.filter(staff_profile__department=self.department, is_active=True)
+            .select_related('staff_profile__department')
+            .order_by('id')
+        )
+
+    def generate_schedules(self, scope: str, target_date: date, members: Optional[List[User]] = None) -> Dict[int, Dict]:
+        """Return ``{user_id: schedule}`` for the department members"""
+        members = self.get_members() if members is None else members
+        if not members:
+            return {}
+
+        schedulers = {member.id: SmartScheduler(member) for member in members}
+        dates = SmartScheduler._get_scope_dates(target_date, scope)
+        tz = timezone.get_current_timezone()
+        contexts = self._load_team_context(members, dates, tz)
+        insights = self._load_insights(members)
+        tasks = self._load_tasks(members, dates)
+
+        plans = []
+        for member in members:
+            context = contexts[member.id]
+            scheduler = schedulers[member.id]
+            member_insights = insights[member.id]
+            member_tasks = scheduler._prioritize_tasks(tasks[member.id], member_insights)
+            plans.append({
+                'key': member.id,
+                'days': [
+                    day_windows(day, select_day_slots(day.weekday(), context['user_templates'], context['team_templates']), tz)
+                    for day in dates
+                ],
+                'busy': context['busy'],
+                'peak_hours': member_insights['peak_hours'],
+                'tz': tz,
+                'tasks': [
+                    (task.id, task.title, scheduler._get_task_duration(task, member_insights))
+                    for task in member_tasks
+                ],
+                'focus_minutes': context['focus_minutes'],
+                'break_minutes': context['break_minutes'],
+            })
+
+        schedules = {}
+        for result in self._run(plans):
+            scheduler = schedulers[result['key']]
+            schedule = scheduler._format_schedule(result['windows'], result['blocks'], tz)
+            cache.set(f"schedule_{result['key']}_{scope}_{target_date}", schedule, scheduler.cache_timeout)
+            schedules[result['key']] = schedule
+        return schedules
+
+    def commit_schedules(self, schedules: Dict[int, Dict], scope: str, target_date: date) -> int:
+        """
+        Replace members' auto-generated, not yet started blocks in scope with ``schedules``.
+
+        Returns the number of ``TimeBlock`` rows created.
+        """
+        dates = SmartScheduler._get_scope_dates(target_date, scope)
+        tz = timezone.get_current_timezone()
+        range_start = datetime.combine(dates[0], time.min, tz)
+        range_end = datetime.combine(dates[-1] + timedelta(days=1), time.min, tz)
+
+        blocks = [
+            TimeBlock(
+                owner_user_id=user_id,
+                task_id=block['task_id'],
+                title=block['title'],
+                start=datetime.fromisoformat(block['start']),
+                end=datetime.fromisoformat(block['end']),
+                status='committed',
+                is_break=block['is_break'],
+                source='auto',
+            )
+            for user_id, schedule in schedules.items()
+            for block in schedule['blocks']
+        ]
+        with transaction.atomic():
+            TimeBlock.objects.filter(
+                owner_user_id__in=list(schedules),
+                source='auto',
+                status__in=['planned', 'committed'],
+                start__gte=range_start,
+                start__lt=range_end,
+            ).delete()
+            TimeBlock.objects.bulk_create(blocks, batch_size=500)
+        return len(blocks)
+
+    def _run(self, plans: List[Dict]) -> List[Dict]:
+        """Build schedules in worker processes (inline for a single worker or member)"""
+        workers = self.workers or os.cpu_count() or 1
+        if workers <= 1 or len(plans) < 2:
+            return [build_schedule(plan) for plan in plans]
+        # Spawned workers only import planner.scheduling, never Django or the DB connection
+        pool_context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(plans)), mp_context=pool_context) as pool:
+            return list(pool.map(build_schedule, plans, chunksize=max(1, len(plans) // (workers * 4))))
+
+    def _load_team_context(self, members: List[User], dates: List[date], tz) -> Dict[int, Dict]:
+        """Load templates, busy events and break policies for all members in three queries"""
+        member_ids = {member.id for member in members}
+        dept_id = self.department.id
+        owner_q = Q(owner_team_id=dept_id) | Q(owner_user_id__in=member_ids)
+
+        team_templates = defaultdict(list)
+        user_templates = defaultdict(lambda: defaultdict(list))
+        templates = AvailabilityTemplate.objects.filter(
+            owner_q, day_of_week__in={d.weekday() for d in dates}
+        ).values_list('owner_user_id', 'owner_team_id', 'day_of_week', 'start_time', 'end_time')
+        for owner_user_id, owner_team_id, day_of_week, start_time, end_time in templates:
+            if owner_user_id in member_ids:
+                user_templates[owner_user_id][day_of_week].append((start_time, end_time))
+            if owner_team_id == dept_id:
+                team_templates[day_of_week].append((start_time, end_time))
+
+        range_start = datetime.combine(min(dates), time.min, tz)
+        range_end = datetime.combine(max(dates) + timedelta(days=1), time.min, tz)
+        team_busy = []
+        user_busy = defaultdict(list)
+        events = CalendarEvent.objects.filter(
+            owner_q, is_busy=True, start__lt=range_end, end__gt=range_start
+        ).values_list('owner_user_id', 'owner_team_id', 'start', 'end')
+        for owner_user_id, owner_team_id, start, end in events:
+            interval = (to_minute(start), to_minute(end, ceil=True))
+            if owner_team_id == dept_id:
+                team_busy.append(interval)
+            elif owner_user_id in member_ids:
+                user_busy[owner_user_id].append(interval)
+
+        team_policy = None
+        user_policies = {}
+        policies = BreakPolicy.objects.filter(owner_q, active=True).order_by('id').values_list(
+            'owner_user_id', 'owner_team_id', 'focus_minutes', 'break_minutes'
+        )
+        for owner_user_id, owner_team_id, focus, brk in policies:
+            if owner_user_id in member_ids:
+                user_policies.setdefault(owner_user_id, (focus, brk))
+            if owner_team_id == dept_id and team_policy is None:
+                team_policy = (focus, brk)
+
+        contexts = {}
+        for member_id in member_ids:
+            focus_minutes, break_minutes = user_policies.get(member_id) or team_policy or (25, 5)
+            contexts[member_id] = {
+                'user_templates': user_templates[member_id],
+                'team_templates': team_templates,
+                'busy': merge_intervals(team_busy + user_busy[member_id]),
+                'focus_minutes': focus_minutes,
+                'break_minutes': break_minutes,
+            }
+        return contexts
+
+    def _load_insights(self, members: List[User]) -> Dict[int, Dict]:
+        data = defaultdict(dict)
+        records = ProductivityInsight.objects.filter(
+            owner_user__in=members,
+            insight_type__in=['peak_hours', 'task_duration'],
+            is_active=True
+        ).values_list('owner_user_id', 'insight_type', 'data')
+        for owner_user_id, insight_type, insight_data in records:
+            data[owner_user_id][insight_type] = insight_data
+        return {member.id: SmartScheduler.build_insights(data[member.id]) for member in members}
+
+    def _load_tasks(self, members: List[User], dates: List[date]) -> Dict[int, List[Task]]:
+        """Load schedulable tasks for the whole team once and hand each member their share"""
+        member_ids = {member.id for member in members}
+        start_date, end_date = dates[0], dates[-1] + timedelta(days=1)
+        candidates = Task.objects.filter(
+            is_completed=False
+        ).filter(
+            Q(created_by_id__in=member_ids) | Q(assigned_to_id__in=member_ids) |
+            Q(project__created_by_id__in=member_ids) | Q(assigned_team=self.department)
+        ).filter(
+            Q(snoozed_until__isnull=True) | Q(snoozed_until__lte=timezone.make_aware(
+                datetime.combine(end_date, time.max)
+            )),
+            Q(backlog_date__isnull=True) | Q(backlog_date__lte=start_date),
+            ~Q(dependencies__is_completed=False)
+        ).select_related('project').distinct()
+
+        tasks = defaultdict(list)
+        for task in candidates:
+            if task.assigned_team_id == self.department.id:
+                owners = member_ids
+            else:
+                owners = {task.created_by_id, task.assigned_to_id}
+                if task.project_id:
+                    owners.add(task.project.created_by_id)
+                owners &= member_ids
+            for owner_id in owners:
+                tasks[owner_id].append(task)
+        return tasks
+
+
 class ProductivityAnalyzer:
     """Service for computing productivity insights and analytics"""
-    
+
+    # 'completed' predates BlockStatus and is still present on older rows
+    COMPLETED_STATUSES = ('completed', BlockStatus.DONE)
+    INSIGHT_WINDOW_DAYS = 30
+
     def __init__(self, user):
         self.user = user
-    
+
+    @classmethod
+    def rebuild_histograms(cls, start_date: date, end_date: Optional[date] = None, user_ids=None) -> int:
+        """
+        Rebuild hourly histograms for every day in ``start_date..end_date``.
+
+        Completed focus blocks are grouped by user, local day and local hour in a
+        single query; the days' existing rows are replaced. Returns rows written.
+        """
+        end_date = end_date or start_date
+        tz = timezone.get_current_timezone()
+        blocks = TimeBlock.objects.filter(
+            status__in=cls.COMPLETED_STATUSES,
+            is_break=False,
+            start__gte=datetime.combine(start_date, time.min, tz),
+            start__lt=datetime.combine(end_date + timedelta(days=1), time.min, tz),
+        )
+        existing = ProductivityHistogram.objects.filter(date__range=(start_date, end_date))
+        if user_ids is not None:
+            blocks = blocks.filter(owner_user_id__in=user_ids)
+            existing = existing.filter(owner_user_id__in=user_ids)
+
+        rows = (
+            blocks.annotate(day=TruncDate('start', tzinfo=tz), hour=ExtractHour('start', tzinfo=tz))
+            .values('owner_user_id', 'day', 'hour')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        histograms = {}
+        for row in rows:
+            counts = histograms.setdefault((row['owner_user_id'], row['day']), [0] * 24)
+            counts[row['hour']] += row['count']
+
+        with transaction.atomic():
+            existing.delete()
+            ProductivityHistogram.objects.bulk_create(
+                [
+                    ProductivityHistogram(
+                        owner_user_id=user_id, date=day,
+                        hour_counts=counts, completed_blocks=sum(counts),
+                    )
+                    for (user_id, day), counts in histograms.items()
+                ],
+                batch_size=500,
+            )
+        return len(histograms)
+
+    def refresh_histogram(self, target_date: date) -> int:
+        """Rebuild this user's histogram for a single day"""
+        return self.rebuild_histograms(target_date, user_ids=[self.user.id])
+
     def compute_daily_review(self, target_date: date) -> DailyReview:
         """Compute or update daily review with metrics"""
         review, created = DailyReview.objects.get_or_create(
@@ -413,31 +619,29 @@ class ProductivityAnalyzer:
     
     def _analyze_peak_hours(self) -> ProductivityInsight:
         """Analyze when user is most productive"""
-        # Get completed time blocks from last 30 days
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        
-        completed_blocks = TimeBlock.objects.filter(
+        # Sum the daily hourly histograms from the last 30 days
+        since = timezone.localdate() - timedelta(days=self.INSIGHT_WINDOW_DAYS)
+        histograms = ProductivityHistogram.objects.filter(
             owner_user=self.user,
-            status='completed',
-            is_break=False,
-            start__gte=thirty_days_ago
-        )
-        
-        # Count completions by hour
-        hour_productivity = defaultdict(int)
-        for block in completed_blocks:
-            hour = block.start.hour
-            hour_productivity[hour] += 1
-        
+            date__gte=since
+        ).values_list('hour_counts', flat=True)
+
+        totals = [0] * 24
+        for hour_counts in histograms:
+            for hour, count in enumerate(hour_counts):
+                totals[hour] += count
+        hour_productivity = {hour: count for hour, count in enumerate(totals) if count}
+        sample_size = sum(totals)
+
         # Find peak hours (top 40% of productive hours)
         if hour_productivity:
-            sorted_hours = sorted(hour_productivity.items(), key=lambda x: x[1], reverse=True)
+            sorted_hours = sorted(hour_productivity.items(), key=lambda x: (-x[1], x[0]))
             peak_count = max(1, len(sorted_hours) * 2 // 5)  # Top 40%
             peak_hours = [hour for hour, _ in sorted_hours[:peak_count]]
         else:
             peak_hours = [9, 10, 11, 14, 15]  # Default
         
-        confidence = min(100, len(completed_blocks) * 2)  # 2% per completed block
+        confidence = min(100, sample_size * 2)  # 2% per completed block
         
         insight, created = ProductivityInsight.objects.update_or_create(
             owner_user=self.user,
@@ -445,7 +649,7 @@ class ProductivityAnalyzer:
             defaults={
                 'data': {'hours': peak_hours},
                 'confidence_score': confidence,
-                'sample_size': len(completed_blocks),
+                'sample_size': sample_size,
                 'valid_from': timezone.now().date(),
                 'is_active': True
             }
@@ -465,24 +669,18 @@ class ProductivityAnalyzer:
             estimated_minutes__isnull=False
         )
         
-        # Calculate average duration of successfully completed tasks
-        if completed_tasks.exists():
-            avg_duration = completed_tasks.aggregate(
-                avg=Avg('estimated_minutes')
-            )['avg']
-            optimal_duration = int(avg_duration) if avg_duration else 45
-        else:
-            optimal_duration = 45
-        
-        confidence = min(100, completed_tasks.count() * 5)  # 5% per completed task
-        
+        stats = completed_tasks.aggregate(avg=Avg('estimated_minutes'), count=Count('id'))
+        optimal_duration = int(stats['avg']) if stats['avg'] else 45
+
+        confidence = min(100, stats['count'] * 5)  # 5% per completed task
+
         insight, created = ProductivityInsight.objects.update_or_create(
             owner_user=self.user,
             insight_type='task_duration',
             defaults={
                 'data': {'minutes': optimal_duration},
                 'confidence_score': confidence,
-                'sample_size': completed_tasks.count(),
+                'sample_size': stats['count'],
                 'valid_from': timezone.now().date(),
                 'is_active': True
             }
@@ -495,38 +693,34 @@ class ProductivityAnalyzer:
         # Get daily reviews from last 30 days
         thirty_days_ago = timezone.now().date() - timedelta(days=30)
         
-        reviews = DailyReview.objects.filter(
+        reviews = list(DailyReview.objects.filter(
             owner_user=self.user,
             date__gte=thirty_days_ago,
             focus_time_minutes__gt=0,
             break_time_minutes__gt=0
-        )
-        
-        if reviews.exists():
-            # Find correlation between break ratio and productivity score
-            optimal_ratio = 0.2  # Default 20%
-            best_score = 0
-            
-            for review in reviews:
-                break_ratio = review.break_time_minutes / review.focus_time_minutes
-                if review.productivity_score > best_score:
-                    best_score = review.productivity_score
-                    optimal_ratio = break_ratio
-            
-            # Clamp to reasonable range
+        ).values_list('break_time_minutes', 'focus_time_minutes', 'productivity_score'))
+
+        # Find correlation between break ratio and productivity score
+        optimal_ratio = 0.2  # Default 20%
+        best_score = 0
+        for break_minutes, focus_minutes, score in reviews:
+            if score > best_score:
+                best_score = score
+                optimal_ratio = break_minutes / focus_minutes
+
+        # Clamp to reasonable range
+        if reviews:
             optimal_ratio = max(0.1, min(0.4, optimal_ratio))
-        else:
-            optimal_ratio = 0.2
-        
-        confidence = min(100, reviews.count() * 3)  # 3% per review
-        
+
+        confidence = min(100, len(reviews) * 3)  # 3% per review
+
         insight, created = ProductivityInsight.objects.update_or_create(
             owner_user=self.user,
             insight_type='break_pattern',
             defaults={
                 'data': {'optimal_break_ratio': optimal_ratio},
                 'confidence_score': confidence,
-                'sample_size': reviews.count(),
+                'sample_size': len(reviews),
                 'valid_from': timezone.now().date(),
                 'is_active': True
             }
@@ -539,31 +733,29 @@ class ProductivityAnalyzer:
         # Get daily reviews from last 8 weeks
         eight_weeks_ago = timezone.now().date() - timedelta(weeks=8)
         
-        reviews = DailyReview.objects.filter(
-            owner_user=self.user,
-            date__gte=eight_weeks_ago
+        # Average productivity by day of week (0=Monday), grouped in the database
+        rows = (
+            DailyReview.objects.filter(owner_user=self.user, date__gte=eight_weeks_ago)
+            .annotate(weekday=ExtractIsoWeekDay('date') - 1)
+            .values('weekday')
+            .annotate(average=Avg('productivity_score'), reviews=Count('id'))
+            .order_by('weekday')
         )
-        
-        # Calculate average productivity by day of week
-        weekday_scores = defaultdict(list)
-        for review in reviews:
-            weekday = review.date.weekday()  # 0=Monday
-            weekday_scores[weekday].append(float(review.productivity_score))
-        
-        # Calculate averages
         weekday_averages = {}
-        for weekday, scores in weekday_scores.items():
-            weekday_averages[weekday] = sum(scores) / len(scores) if scores else 0
-        
-        confidence = min(100, reviews.count())  # 1% per review
-        
+        review_count = 0
+        for row in rows:
+            weekday_averages[row['weekday']] = float(row['average'] or 0)
+            review_count += row['reviews']
+
+        confidence = min(100, review_count)  # 1% per review
+
         insight, created = ProductivityInsight.objects.update_or_create(
             owner_user=self.user,
             insight_type='weekly_trend',
             defaults={
                 'data': {'weekday_averages': weekday_averages},
                 'confidence_score': confidence,
-                'sample_size': reviews.count(),
+                'sample_size': review_count,
                 'valid_from': timezone.now().date(),
                 'is_active': True
             }
@@ -0,0 +1,65 @@
+# planner/signals.py
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import TimeBlock
+
+HISTOGRAM_FIELDS = {'status', 'start', 'is_break', 'owner_user'}
+SNAPSHOT_FIELDS = ('status', 'start', 'owner_user_id')
+
+
+def _is_completed(block):
+    from .services import ProductivityAnalyzer
+
+    return block.status in ProductivityAnalyzer.COMPLETED_STATUSES
+
+
+def _refresh_histogram(owner_user_id, start):
+    from .services import ProductivityAnalyzer
+
+    ProductivityAnalyzer.rebuild_histograms(timezone.localdate(start), user_ids=[owner_user_id])
+
+
+@receiver(post_init, sender=TimeBlock)
+def remember_histogram_position(sender, instance, **kwargs):
+    # Deferred fields are unknown here; reading them would cost a query per instance
+    if any(name not in instance.__dict__ for name in SNAPSHOT_FIELDS):
+        instance._histogram_was = None
+    elif instance.pk is None:
+        instance._histogram_was = (None, None, False)
+    else:
+        instance._histogram_was = (instance.owner_user_id, instance.start, _is_completed(instance))
+
+
+@receiver(post_save, sender=TimeBlock)
+def update_productivity_histogram(sender, instance, created, update_fields=None, **kwargs):
+    previous = instance._histogram_was
+    completed = _is_completed(instance)
+    instance._histogram_was = (instance.owner_user_id, instance.start, completed)
+
+    if update_fields is not None and not HISTOGRAM_FIELDS.intersection(update_fields):
+        return
+    if previous is None:
+        # Nothing known about the saved row: rebuild where the block is now
+        if instance.owner_user_id:
+            _refresh_histogram(instance.owner_user_id, instance.start)
+        return
+
+    was_owner, was_start, was_completed = previous
+    if not (completed or was_completed):
+        return
+    if instance.owner_user_id:
+        _refresh_histogram(instance.owner_user_id, instance.start)
+    moved = was_owner != instance.owner_user_id or (
+        was_start is not None and timezone.localdate(was_start) != timezone.localdate(instance.start)
+    )
+    if was_owner and was_completed and moved:
+        _refresh_histogram(was_owner, was_start)
+
+
+@receiver(post_delete, sender=TimeBlock)
+def remove_from_productivity_histogram(sender, instance, **kwargs):
+    if instance.owner_user_id and _is_completed(instance):
+        _refresh_histogram(instance.owner_user_id, instance.start)
@@ -5,3 +5,6 @@ class SaccosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'saccos'
     verbose_name = 'SACCO Management'
+
+    def ready(self):
+        import saccos.signals
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from saccos.models import SaccoOrganization
+from saccos.services.analytics_service import AnalyticsService
+
+
+class Command(BaseCommand):
+    help = "Recompute and cache dashboard metrics for every SACCO (schedule more often than the staleness bound)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sacco-id', type=int, default=None)
+
+    def handle(self, *args, **options):
+        saccos = SaccoOrganization.objects.filter(is_active=True).order_by('id')
+        if options.get('sacco_id'):
+            saccos = saccos.filter(id=options['sacco_id'])
+
+        refreshed = 0
+        for sacco in saccos:
+            try:
+                AnalyticsService.refresh_dashboard_metrics(sacco)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"Error refreshing {sacco.name}: {str(e)}"))
+                continue
+            refreshed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Refreshed dashboard metrics for {refreshed} SACCOs."))
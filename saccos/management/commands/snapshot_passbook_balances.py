@@ -0,0 +1,41 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from saccos.services.passbook_service import PassbookService
+
+
+class Command(BaseCommand):
+    help = "Store passbook section balances as of a date (defaults to the last month end) for as-of lookups."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=str, default=None, help='Snapshot date (YYYY-MM-DD)')
+        parser.add_argument('--sacco-id', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=500, help='Passbooks per query batch')
+
+    def handle(self, *args, **options):
+        if options.get('date'):
+            try:
+                as_of_date = date.fromisoformat(options['date'])
+            except ValueError:
+                self.stdout.write(self.style.ERROR(f"Invalid date format: {options['date']}. Use YYYY-MM-DD."))
+                return
+        else:
+            as_of_date = timezone.now().date().replace(day=1) - timedelta(days=1)
+
+        sacco = None
+        if options.get('sacco_id'):
+            from saccos.models import SaccoOrganization
+
+            sacco = SaccoOrganization.objects.filter(id=options['sacco_id']).first()
+            if not sacco:
+                self.stdout.write(self.style.ERROR(f"SACCO with ID {options['sacco_id']} not found."))
+                return
+
+        written = PassbookService.create_balance_snapshots(
+            as_of_date,
+            sacco=sacco,
+            batch_size=max(options['batch_size'], 1),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Stored {written} balance snapshots as of {as_of_date}."))
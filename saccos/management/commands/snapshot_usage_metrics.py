@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from saccos.services.subscription_service import SubscriptionService
+
+
+class Command(BaseCommand):
+    help = "Write UsageMetrics snapshots for a month across all SACCOs (defaults to the current month)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', type=str, default=None, help='Month to snapshot (YYYY-MM)')
+        parser.add_argument('--sacco-id', type=int, action='append', help='Limit to a SACCO (repeatable)')
+        parser.add_argument('--recount', action='store_true', help='Rebuild usage counters from scratch first')
+
+    def handle(self, *args, **options):
+        if options.get('month'):
+            try:
+                period_start = date.fromisoformat(f"{options['month']}-01")
+            except ValueError:
+                self.stdout.write(self.style.ERROR(f"Invalid month format: {options['month']}. Use YYYY-MM."))
+                return
+        else:
+            period_start = timezone.now().date().replace(day=1)
+        period_end = (period_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+        saccos = options.get('sacco_id')
+        if options['recount']:
+            recounted = SubscriptionService.recount_usage_counters(saccos)
+            self.stdout.write(f"✓ Recounted usage for {recounted} SACCOs")
+
+        snapshots = SubscriptionService.record_usage_metrics_bulk(period_start, period_end, saccos=saccos)
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored usage metrics for {len(snapshots)} SACCOs ({period_start} to {period_end})."
+        ))
@@ -1,23 +1,19 @@
+from common.request_context import get_request_context
+
+
 class SaccoTenantMiddleware:
     """
     Automatically inject SACCO context into requests
     Phase 1: Foundation
+    
+    ``request.tenant`` (sacco, sacco_id, membership) resolves lazily from a
+    short-lived per-user cache, so requests that never use it cost no queries.
     """
     def __init__(self, get_response):
         self.get_response = get_response
     
     def __call__(self, request):
-        # Set SACCO context if user is authenticated
-        if request.user.is_authenticated:
-            try:
-                if hasattr(request.user, 'sacco_membership'):
-                    request.sacco = request.user.sacco_membership.sacco
-                else:
-                    request.sacco = None
-            except Exception:
-                request.sacco = None
-        else:
-            request.sacco = None
+        get_request_context(request)
         
         response = self.get_response(request)
         return response
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:35
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('saccos', '0016_withdrawals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PassbookBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False)),
+                ('as_of_date', models.DateField(help_text='Balance includes all entries up to and including this date')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=15)),
+            ],
+            options={
+                'ordering': ['-as_of_date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='passbookbalancesnapshot',
+            name='passbook',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='saccos.memberpassbook'),
+        ),
+        migrations.AddField(
+            model_name='passbookbalancesnapshot',
+            name='section',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='saccos.passbooksection'),
+        ),
+        migrations.AddConstraint(
+            model_name='passbookbalancesnapshot',
+            constraint=models.UniqueConstraint(fields=('passbook', 'section', 'as_of_date'), name='uniq_passbook_balance_snapshot'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:51
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('saccos', '0017_passbookbalancesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaccoUsageCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False)),
+                ('active_members', models.IntegerField(default=0)),
+                ('meetings_year', models.PositiveIntegerField(default=0)),
+                ('meetings_count', models.IntegerField(default=0, help_text='Meetings held in meetings_year')),
+                ('loans_count', models.IntegerField(default=0)),
+                ('storage_bytes', models.BigIntegerField(default=0)),
+                ('sacco', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='usage_counter', to='saccos.saccoorganization')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -480,6 +480,9 @@ class PassbookEntry(BaseModel):
         ]
         verbose_name_plural = 'Passbook Entries'
     
+    # Fields whose change moves money in the section's running balance
+    BALANCE_FIELDS = ('passbook', 'section', 'transaction_date', 'transaction_type', 'amount')
+    
     def __str__(self):
         return f"{self.passbook.member.user.get_full_name()} - {self.section.name}: {self.amount}"
     
@@ -495,30 +498,54 @@ class PassbookEntry(BaseModel):
                 self.balance_after = previous_balance + self.amount
             else:  # debit
                 self.balance_after = previous_balance - self.amount
-        
+
+        # An edit can move the entry's money between sections or dates
+        previous = None
+        update_fields = kwargs.get('update_fields')
+        if self.pk and not self._state.adding and (
+            update_fields is None or not set(update_fields).isdisjoint(self.BALANCE_FIELDS)
+        ):
+            attnames = [self._meta.get_field(name).attname for name in self.BALANCE_FIELDS]
+            previous = PassbookEntry.objects.filter(pk=self.pk).values(*attnames).first()
+
         super().save(*args, **kwargs)
-        
+
+        if previous and any(value != getattr(self, attname) for attname, value in previous.items()):
+            old_key = (previous['passbook_id'], previous['section_id'])
+            if old_key == (self.passbook_id, self.section_id):
+                self._refresh_balances(*old_key, min(previous['transaction_date'], self.transaction_date))
+            else:
+                self._refresh_balances(*old_key, previous['transaction_date'])
+                self._refresh_balances(self.passbook_id, self.section_id, self.transaction_date)
+
         # Update meeting totals if this entry is linked to a meeting
         if self.meeting:
             self.meeting.calculate_totals()
     
+    @staticmethod
+    def _refresh_balances(passbook_id, section_id, from_date):
+        """Recompute running balances and drop snapshots made stale from from_date"""
+        from saccos.services.passbook_service import PassbookService
+        PassbookService.recalculate_section_running_balances_for_ids(
+            passbook_id=passbook_id,
+            section_id=section_id,
+            apply_changes=True,
+        )
+        PassbookService.invalidate_balance_snapshots(passbook_id, section_id, from_date)
+
     def delete(self, *args, **kwargs):
         # Store meeting reference before deletion
         meeting = self.meeting
         passbook_id = self.passbook_id
         section_id = self.section_id
+        transaction_date = self.transaction_date
         super().delete(*args, **kwargs)
         
         # Update meeting totals after deletion
         if meeting:
             meeting.calculate_totals()
 
-        from saccos.services.passbook_service import PassbookService
-        PassbookService.recalculate_section_running_balances_for_ids(
-            passbook_id=passbook_id,
-            section_id=section_id,
-            apply_changes=True,
-        )
+        self._refresh_balances(passbook_id, section_id, transaction_date)
     
     def get_previous_balance(self):
         """Get the balance before this entry"""
@@ -531,6 +558,37 @@ class PassbookEntry(BaseModel):
         return last_entry.balance_after if last_entry else Decimal('0')
 
 
+class PassbookBalanceSnapshot(BaseModel):
+    """
+    Section balance of a passbook at the end of a day (usually a month end)
+    As-of balances start from the nearest snapshot and add only later entries
+    """
+    passbook = models.ForeignKey(
+        MemberPassbook,
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots'
+    )
+    section = models.ForeignKey(
+        PassbookSection,
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots'
+    )
+    as_of_date = models.DateField(help_text="Balance includes all entries up to and including this date")
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+    
+    class Meta:
+        ordering = ['-as_of_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['passbook', 'section', 'as_of_date'],
+                name='uniq_passbook_balance_snapshot'
+            )
+        ]
+    
+    def __str__(self):
+        return f"{self.passbook.passbook_number} - {self.section.name} @ {self.as_of_date}: {self.balance}"
+
+
 class DeductionRule(BaseModel):
     """
     Configurable deduction rules for cash round recipients
@@ -895,68 +953,76 @@ class WeeklyMeeting(BaseModel):
     def __str__(self):
         return f"{self.sacco.name} - Week {self.week_number} ({self.meeting_date})"
     
+    TOTAL_FIELDS = [
+        'members_present', 'members_absent', 'total_collected',
+        'total_deductions', 'amount_to_recipient', 'amount_to_bank',
+    ]
+
     def calculate_totals(self):
         """
         Recalculate all meeting totals
         
         CRITICAL: After finalization, passbook entries are the source of truth
         Before finalization, we calculate from contributions
+        
+        Totals come from one conditional aggregate over contributions (plus one
+        over passbook entries once completed). Only the total fields are written,
+        and nothing is written when they match the stored row.
         """
         from decimal import Decimal
-        
-        # Basic collection stats
-        self.members_present = self.contributions.filter(was_present=True).count()
-        self.members_absent = self.contributions.filter(was_present=False).count()
+        from django.db.models import Count, Q, Sum
         
         # Total collected from present members PLUS SACCO-covered defaulters
         # (funding_source='sacco' ensures the recipient still receives full payout)
-        present_contributions = self.contributions.filter(
-            models.Q(was_present=True) | models.Q(funding_source='sacco')
-        )
-        self.total_collected = sum(
-            (c.amount_contributed or Decimal('0')) for c in present_contributions
+        paid = Q(was_present=True) | Q(funding_source='sacco')
+        totals = self.contributions.aggregate(
+            members_present=Count('id', filter=Q(was_present=True)),
+            members_absent=Count('id', filter=Q(was_present=False)),
+            total_collected=Sum('amount_contributed', filter=paid),
+            optional_savings=Sum('optional_savings', filter=paid),
+            recipient_deductions=Sum(
+                'total_deductions',
+                filter=Q(member_id=self.cash_round_recipient_id, is_recipient=True),
+            ),
         )
         
+        values = {
+            'members_present': totals['members_present'],
+            'members_absent': totals['members_absent'],
+            'total_collected': totals['total_collected'] or Decimal('0'),
+            'total_deductions': self.total_deductions,
+        }
+        
         if self.status == 'completed':
             # POST-FINALIZATION: Use passbook entries as single source of truth
             # This includes deductions + optional savings + any extras added after finalization
-            passbook_entries = PassbookEntry.objects.filter(
+            # Deductions are now just informational (already in passbook)
+            values['amount_to_bank'] = PassbookEntry.objects.filter(
                 meeting=self,
                 transaction_type='credit'  # All savings are credits
-            )
-            
-            # Sum all actual entries (deductions + extras + optional savings)
-            self.amount_to_bank = sum(entry.amount for entry in passbook_entries)
-            
-            # Deductions are now just informational (already in passbook)
-            # Keep the value for historical reference but don't use in calculations
-            
+            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
         else:
             # PRE-FINALIZATION: Calculate from contributions (planned amounts)
-            optional_savings = sum(
-                (c.optional_savings or Decimal('0')) for c in present_contributions
-            )
-            
-            # Calculate deductions from recipient (if exists)
             total_deductions = Decimal('0')
-            if self.cash_round_recipient:
-                recipient_contribution = self.contributions.filter(
-                    member=self.cash_round_recipient,
-                    is_recipient=True
-                ).first()
-                
-                if recipient_contribution:
-                    total_deductions = recipient_contribution.total_deductions or Decimal('0')
-            
-            self.total_deductions = total_deductions
+            if self.cash_round_recipient_id:
+                total_deductions = totals['recipient_deductions'] or Decimal('0')
+            values['total_deductions'] = total_deductions
             
             # Amount to bank = deductions from recipient + optional savings from all
-            self.amount_to_bank = total_deductions + optional_savings
+            values['amount_to_bank'] = total_deductions + (totals['optional_savings'] or Decimal('0'))
         
         # Amount to recipient = total collected - deductions
-        self.amount_to_recipient = self.total_collected - self.total_deductions
+        values['amount_to_recipient'] = values['total_collected'] - values['total_deductions']
         
-        self.save()
+        # Compare with the stored row: this instance may be a stale copy (e.g. a
+        # contribution's cached meeting) that another copy has since updated
+        stored = WeeklyMeeting.objects.filter(pk=self.pk).values_list(*self.TOTAL_FIELDS).first()
+        stored = dict(zip(self.TOTAL_FIELDS, stored or ()))
+        changed = [field for field in self.TOTAL_FIELDS if stored.get(field) != values[field]]
+        for field, value in values.items():
+            setattr(self, field, value)
+        if changed:
+            self.save(update_fields=changed + ['updated_at'])
     
     def get_current_recipient(self):
         """Get the member who should receive cash round this week"""
@@ -1254,6 +1320,31 @@ class SaccoLoan(BaseModel):
         
         self.save()
     
+    def apply_payment(self, principal_amount, interest_amount):
+        """
+        Apply a payment to the balances with an atomic F() update
+        
+        Avoids re-summing every payment; callers should hold the row lock
+        (select_for_update) when the split depends on the current balances.
+        """
+        balance_fields = [
+            'amount_paid_principal', 'amount_paid_interest',
+            'balance_principal', 'balance_interest', 'status',
+        ]
+        SaccoLoan.objects.filter(pk=self.pk).update(
+            amount_paid_principal=models.F('amount_paid_principal') + principal_amount,
+            amount_paid_interest=models.F('amount_paid_interest') + interest_amount,
+            balance_principal=models.F('balance_principal') - principal_amount,
+            balance_interest=models.F('balance_interest') - interest_amount,
+            updated_at=timezone.now(),
+        )
+        self.refresh_from_db(fields=balance_fields)
+        
+        # Update status if fully paid
+        if self.balance_principal <= 0 and self.balance_interest <= 0 and self.status != 'paid':
+            self.status = 'paid'
+            self.save(update_fields=['status', 'updated_at'])
+    
     @property
     def total_balance(self):
         """Total remaining balance"""
@@ -1335,10 +1426,15 @@ class LoanPayment(BaseModel):
         if self.principal_amount or self.interest_amount:
             self.total_amount = self.principal_amount + self.interest_amount
         
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
         super().save(*args, **kwargs)
         
-        # Update loan balances
-        self.loan.update_balances()
+        # Update loan balances: new payments apply their delta, edits re-sum all payments
+        if adding:
+            self.loan.apply_payment(self.principal_amount, self.interest_amount)
+        elif update_fields is None or {'principal_amount', 'interest_amount', 'total_amount'} & set(update_fields):
+            self.loan.update_balances()
 
 
 class LoanGuarantor(BaseModel):
@@ -1782,3 +1878,30 @@ class UsageMetrics(BaseModel):
     
     def __str__(self):
         return f"{self.sacco.name} - {self.period_start} to {self.period_end}"
+
+
+class SaccoUsageCounter(BaseModel):
+    """
+    Running usage totals for subscription limit checks
+    Kept current by signals on members, meetings and loans; rebuilt by snapshot_usage_metrics --recount
+    """
+    sacco = models.OneToOneField(
+        SaccoOrganization,
+        on_delete=models.CASCADE,
+        related_name='usage_counter'
+    )
+    
+    active_members = models.IntegerField(default=0)
+    meetings_year = models.PositiveIntegerField(default=0)
+    meetings_count = models.IntegerField(
+        default=0,
+        help_text="Meetings held in meetings_year"
+    )
+    loans_count = models.IntegerField(default=0)
+    storage_bytes = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.sacco.name} usage"
+    
+    def meetings_in_year(self, year):
+        return self.meetings_count if self.meetings_year == year else 0
@@ -1,4 +1,5 @@
 from decimal import Decimal
+from django.core.cache import cache
 from django.utils import timezone
 from django.db.models import Sum, Count, Avg, Q
 from datetime import timedelta
@@ -10,6 +11,52 @@ class AnalyticsService:
     Phase 5: Integration & Reporting
     """
     
+    # Staleness bound (seconds) for cached dashboard metrics
+    DASHBOARD_CACHE_TIMEOUT = 300
+    
+    @staticmethod
+    def dashboard_cache_key(sacco_id):
+        return f"saccos:dashboard:{sacco_id}"
+    
+    @staticmethod
+    def get_cached_dashboard_metrics(sacco, max_age=None, force_refresh=False):
+        """
+        Get dashboard metrics from the cache, recomputing them when missing or stale
+        
+        Args:
+            sacco: SaccoOrganization instance
+            max_age: Oldest acceptable snapshot in seconds (defaults to DASHBOARD_CACHE_TIMEOUT)
+            force_refresh: Ignore any cached snapshot
+            
+        Returns:
+            dict: Dashboard metrics
+        """
+        if max_age is None:
+            max_age = AnalyticsService.DASHBOARD_CACHE_TIMEOUT
+        
+        if not force_refresh:
+            cached = cache.get(AnalyticsService.dashboard_cache_key(sacco.id))
+            if cached and (timezone.now() - cached['computed_at']).total_seconds() <= max_age:
+                return cached['metrics']
+        
+        return AnalyticsService.refresh_dashboard_metrics(sacco)
+    
+    @staticmethod
+    def refresh_dashboard_metrics(sacco):
+        """Recompute dashboard metrics and store them as the SACCO's cached snapshot"""
+        metrics = AnalyticsService.get_dashboard_metrics(sacco)
+        cache.set(
+            AnalyticsService.dashboard_cache_key(sacco.id),
+            {'computed_at': timezone.now(), 'metrics': metrics},
+            AnalyticsService.DASHBOARD_CACHE_TIMEOUT
+        )
+        return metrics
+    
+    @staticmethod
+    def invalidate_dashboard_metrics(sacco_id):
+        """Drop the cached snapshot so the next dashboard request recomputes it"""
+        cache.delete(AnalyticsService.dashboard_cache_key(sacco_id))
+    
     @staticmethod
     def get_dashboard_metrics(sacco):
         """
@@ -21,68 +68,68 @@ class AnalyticsService:
         Returns:
             dict: Dashboard metrics
         """
+        from saccos.models import PassbookEntry, PassbookSection
+        
         today = timezone.now().date()
         this_month_start = today.replace(day=1)
-        last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
         
         # Member metrics
-        total_members = sacco.members.filter(status='active').count()
-        new_members_this_month = sacco.members.filter(
-            date_joined__gte=this_month_start,
-            status='active'
-        ).count()
+        active_members = sacco.members.filter(status='active')
+        member_stats = active_members.aggregate(
+            total=Count('id'),
+            new_this_month=Count('id', filter=Q(date_joined__gte=this_month_start))
+        )
+        total_members = member_stats['total']
         
         # Meeting metrics
-        meetings_this_month = sacco.weekly_meetings.filter(
-            meeting_date__gte=this_month_start,
-            status='completed'
-        ).count()
-        
-        total_collected_this_month = sacco.weekly_meetings.filter(
+        meeting_stats = sacco.weekly_meetings.filter(
             meeting_date__gte=this_month_start,
             status='completed'
-        ).aggregate(total=Sum('total_collected'))['total'] or Decimal('0')
+        ).aggregate(
+            count=Count('id'),
+            total_collected=Sum('total_collected')
+        )
         
         # Loan metrics
-        active_loans = sacco.loans.filter(status__in=['disbursed', 'active'])
-        total_loans_outstanding = sum(loan.total_balance for loan in active_loans)
-        
-        loans_this_month = sacco.loans.filter(
-            disbursement_date__gte=this_month_start
-        ).count()
+        active = Q(status__in=['disbursed', 'active'])
+        loan_stats = sacco.loans.aggregate(
+            active=Count('id', filter=active),
+            outstanding_principal=Sum('balance_principal', filter=active),
+            outstanding_interest=Sum('balance_interest', filter=active),
+            disbursed_this_month=Count('id', filter=Q(disbursement_date__gte=this_month_start)),
+            overdue=Count('id', filter=active & Q(due_date__lt=today))
+        )
         
         # Savings metrics
-        from saccos.models import PassbookSection
-        savings_sections = PassbookSection.objects.filter(
-            sacco=sacco,
-            section_type='savings',
-            is_active=True
+        savings = PassbookEntry.objects.filter(
+            passbook__member__in=active_members,
+            section__in=PassbookSection.objects.filter(
+                sacco=sacco,
+                section_type='savings',
+                is_active=True
+            )
+        ).aggregate(
+            credits=Sum('amount', filter=Q(transaction_type='credit')),
+            debits=Sum('amount', filter=Q(transaction_type='debit'))
         )
-        
-        total_savings = Decimal('0')
-        for member in sacco.members.filter(status='active'):
-            passbook = member.get_passbook()
-            for section in savings_sections:
-                balance = passbook.get_section_balance(section)
-                total_savings += balance
-        
-        # Overdue loans
-        overdue_loans = [loan for loan in active_loans if loan.is_overdue]
+        total_savings = Decimal('0') + (savings['credits'] or 0) - (savings['debits'] or 0)
         
         return {
             'members': {
                 'total': total_members,
-                'new_this_month': new_members_this_month
+                'new_this_month': member_stats['new_this_month']
             },
             'meetings': {
-                'this_month': meetings_this_month,
-                'total_collected': total_collected_this_month
+                'this_month': meeting_stats['count'],
+                'total_collected': meeting_stats['total_collected'] or Decimal('0')
             },
             'loans': {
-                'active': active_loans.count(),
-                'outstanding_amount': total_loans_outstanding,
-                'disbursed_this_month': loans_this_month,
-                'overdue': len(overdue_loans)
+                'active': loan_stats['active'],
+                'outstanding_amount': (
+                    loan_stats['outstanding_principal'] + loan_stats['outstanding_interest']
+                ) if loan_stats['active'] else 0,
+                'disbursed_this_month': loan_stats['disbursed_this_month'],
+                'overdue': loan_stats['overdue']
             },
             'savings': {
                 'total': total_savings,
@@ -103,38 +150,38 @@ class AnalyticsService:
             dict: Trend data
         """
         today = timezone.now().date()
-        trends = []
         
+        # Calculate month boundaries
+        windows = []
         for i in range(months):
-            # Calculate month boundaries
             month_end = today.replace(day=1) - timedelta(days=i*30)
-            month_start = month_end.replace(day=1)
-            
-            # Get metrics for this month
-            meetings = sacco.weekly_meetings.filter(
-                meeting_date__gte=month_start,
-                meeting_date__lte=month_end,
-                status='completed'
+            windows.append((month_end.replace(day=1), month_end))
+        
+        # One conditional aggregate per table covers every month
+        meeting_aggregates = {}
+        loan_aggregates = {}
+        for i, (month_start, month_end) in enumerate(windows):
+            in_month = Q(meeting_date__gte=month_start, meeting_date__lte=month_end)
+            meeting_aggregates[f'count_{i}'] = Count('id', filter=in_month)
+            meeting_aggregates[f'collected_{i}'] = Sum('total_collected', filter=in_month)
+            meeting_aggregates[f'attendance_{i}'] = Avg('members_present', filter=in_month)
+            loan_aggregates[f'loans_{i}'] = Count(
+                'id', filter=Q(disbursement_date__gte=month_start, disbursement_date__lte=month_end)
             )
-            
-            total_collected = meetings.aggregate(
-                total=Sum('total_collected')
-            )['total'] or Decimal('0')
-            
-            loans_disbursed = sacco.loans.filter(
-                disbursement_date__gte=month_start,
-                disbursement_date__lte=month_end
-            ).count()
-            
-            avg_attendance = meetings.aggregate(
-                avg=Avg('members_present')
-            )['avg'] or 0
+        
+        meeting_stats = sacco.weekly_meetings.filter(status='completed').aggregate(**meeting_aggregates) if windows else {}
+        loan_stats = sacco.loans.aggregate(**loan_aggregates) if windows else {}
+        
+        trends = []
+        for i, (month_start, month_end) in enumerate(windows):
+            total_collected = meeting_stats[f'collected_{i}'] or Decimal('0')
+            avg_attendance = meeting_stats[f'attendance_{i}'] or 0
             
             trends.append({
                 'month': month_start.strftime('%Y-%m'),
-                'meetings': meetings.count(),
+                'meetings': meeting_stats[f'count_{i}'],
                 'total_collected': float(total_collected),
-                'loans_disbursed': loans_disbursed,
+                'loans_disbursed': loan_stats[f'loans_{i}'],
                 'avg_attendance': round(avg_attendance, 1)
             })
         
@@ -4,6 +4,8 @@ from django.utils import timezone
 from django.utils.dateparse import parse_date
 from dateutil.relativedelta import relativedelta
 
+from common.sequences import next_sequence_value
+
 
 class LoanService:
     """
@@ -45,19 +47,18 @@ class LoanService:
         from saccos.models import SaccoLoan, LoanGuarantor, SaccoMember
         import re
         
-        # Generate loan number using MAX to avoid UNIQUE constraint issues after deletions
+        # Allocate the loan number from the SACCO's counter (seeded from existing loans)
         prefix = sacco.registration_number or 'LOAN'
-        last_loan = SaccoLoan.objects.filter(
-            sacco=sacco,
-            loan_number__startswith=prefix
-        ).order_by('-id').first()
         
-        if last_loan:
-            # Extract the numeric suffix from the last loan number
-            match = re.search(r'-(\d+)$', last_loan.loan_number)
-            next_num = int(match.group(1)) + 1 if match else 1
-        else:
-            next_num = 1
+        def last_loan_number():
+            last_loan = SaccoLoan.objects.filter(
+                sacco=sacco,
+                loan_number__startswith=prefix
+            ).order_by('-id').first()
+            match = re.search(r'-(\d+)$', last_loan.loan_number) if last_loan else None
+            return int(match.group(1)) if match else 0
+        
+        next_num = next_sequence_value(f'saccos.loan:{sacco.id}:{prefix}', seed=last_loan_number)
         
         loan_number = f"{prefix}-{next_num:05d}"
         
@@ -204,6 +205,70 @@ class LoanService:
                 'warning': 'No loan section found in passbook'
             }
     
+    @staticmethod
+    def split_payment(payment_amount, interest_due, principal_due):
+        """
+        Split a payment: interest first, the remainder goes to principal
+        
+        Returns:
+            tuple: (interest_amount, principal_amount)
+        """
+        if payment_amount <= interest_due:
+            # Payment covers only interest (or part of it)
+            return payment_amount, Decimal('0')
+        # Payment covers all interest + some principal
+        return interest_due, min(payment_amount - interest_due, principal_due)
+    
+    @staticmethod
+    def _get_payment_sections(sacco):
+        """Get the loan and interest passbook sections (either may be None)"""
+        from saccos.models import PassbookSection
+        
+        sections = {
+            section.section_type: section
+            for section in PassbookSection.objects.filter(
+                sacco=sacco,
+                section_type__in=['loan', 'interest']
+            ).order_by('-id')
+        }
+        return sections.get('loan'), sections.get('interest')
+    
+    @staticmethod
+    def _record_payment_entries(payment, loan, passbook, loan_section, interest_section, recorded_by):
+        """Record the principal and interest parts of a payment in the member's passbook"""
+        from saccos.services.passbook_service import PassbookService
+        
+        passbook_entry = None
+        reference_number = payment.reference_number or payment.id
+        
+        # Record in passbook (credit to loan section for principal)
+        if payment.principal_amount > 0 and loan_section:
+            passbook_entry = PassbookService.record_entry(
+                passbook=passbook,
+                section=loan_section,
+                amount=payment.principal_amount,
+                transaction_type='credit',
+                description=f'Loan payment - {loan.loan_number}',
+                recorded_by=recorded_by,
+                transaction_date=payment.payment_date,
+                reference_number=reference_number
+            )
+        
+        # Record interest in interest section if any
+        if payment.interest_amount > 0 and interest_section:
+            PassbookService.record_entry(
+                passbook=passbook,
+                section=interest_section,
+                amount=payment.interest_amount,
+                transaction_type='credit',
+                description=f'Interest payment - {loan.loan_number}',
+                recorded_by=recorded_by,
+                transaction_date=payment.payment_date,
+                reference_number=reference_number
+            )
+        
+        return passbook_entry
+    
     @staticmethod
     @transaction.atomic
     def record_loan_payment(
@@ -222,8 +287,11 @@ class LoanService:
         - Pay interest first
         - Remaining goes to principal
         
+        The loan row is locked while the split is computed, so concurrent
+        payments always see each other's balances.
+        
         Args:
-            loan: SaccoLoan instance
+            loan: SaccoLoan instance (reloaded under the lock)
             payment_amount: Total payment amount
             payment_date: Date of payment
             recorded_by: User recording payment
@@ -234,9 +302,9 @@ class LoanService:
         Returns:
             dict with payment and passbook entry
         """
-        from saccos.models import LoanPayment, PassbookSection
-        from saccos.services.passbook_service import PassbookService
+        from saccos.models import LoanPayment, SaccoLoan
         
+        loan.refresh_from_db(from_queryset=SaccoLoan.objects.select_for_update())
         if loan.status not in ['disbursed', 'active']:
             raise ValueError(f"Cannot record payment for loan with status: {loan.status}")
         
@@ -245,20 +313,11 @@ class LoanService:
             raise ValueError("Payment amount is required")
         payment_amount = Decimal(str(payment_amount))
         
-        # Split payment: interest first, then principal
-        interest_due = loan.balance_interest
-        principal_due = loan.balance_principal
-        
-        if payment_amount <= interest_due:
-            # Payment covers only interest (or part of it)
-            interest_amount = payment_amount
-            principal_amount = Decimal('0')
-        else:
-            # Payment covers all interest + some principal
-            interest_amount = interest_due
-            principal_amount = min(payment_amount - interest_due, principal_due)
+        interest_amount, principal_amount = LoanService.split_payment(
+            payment_amount, loan.balance_interest, loan.balance_principal
+        )
         
-        # Create payment record
+        # Loan balances are applied as F() deltas in LoanPayment.save()
         payment = LoanPayment.objects.create(
             loan=loan,
             payment_date=payment_date,
@@ -271,67 +330,147 @@ class LoanService:
             recorded_by=recorded_by
         )
         
-        # Record in passbook (credit to loan section for principal)
+        loan_section, interest_section = LoanService._get_payment_sections(loan.sacco)
         passbook_entry = None
-        if principal_amount > 0:
-            try:
-                loan_section = PassbookSection.objects.get(
-                    sacco=loan.sacco,
-                    section_type='loan'
-                )
-                
-                passbook = loan.member.get_passbook()
-                
-                passbook_entry = PassbookService.record_entry(
-                    passbook=passbook,
-                    section=loan_section,
-                    amount=principal_amount,
-                    transaction_type='credit',
-                    description=f'Loan payment - {loan.loan_number}',
-                    recorded_by=recorded_by,
-                    transaction_date=payment_date,
-                    reference_number=reference_number or payment.id
-                )
-                
-                payment.passbook_entry = passbook_entry
-                payment.save()
+        if loan_section or interest_section:
+            passbook_entry = LoanService._record_payment_entries(
+                payment, loan, loan.member.get_passbook(), loan_section, interest_section, recorded_by
+            )
+        if passbook_entry:
+            payment.passbook_entry = passbook_entry
+            payment.save(update_fields=['passbook_entry', 'updated_at'])
+        
+        return {
+            'payment': payment,
+            'passbook_entry': passbook_entry,
+            'remaining_balance': loan.total_balance,
+            'is_paid_off': loan.status == 'paid'
+        }
+    
+    @staticmethod
+    @transaction.atomic
+    def record_bulk_loan_payments(sacco, payments, recorded_by, payment_date=None):
+        """
+        Record many loan payments at once (e.g. meeting-day collections)
+        
+        All referenced loans are locked up front in id order, payments are
+        split against the locked balances (several payments may target the
+        same loan) and each loan's balances are updated once. The import is
+        all-or-nothing: any invalid row raises ValueError and nothing is saved.
+        
+        Args:
+            sacco: SaccoOrganization instance
+            payments: List of dicts with 'loan' (id), 'amount' and optional
+                'payment_date', 'payment_method', 'reference_number', 'notes'
+            recorded_by: User recording the payments
+            payment_date: Default payment date (defaults to today)
             
-            except PassbookSection.DoesNotExist:
-                pass
+        Returns:
+            dict with created payments and the updated loans
+        """
+        from saccos.models import LoanPayment, MemberPassbook, SaccoLoan
         
-        # Record interest in interest section if any
-        if interest_amount > 0:
+        default_date = LoanService._coerce_date(payment_date) or timezone.now().date()
+        
+        rows = []
+        for index, item in enumerate(payments, start=1):
+            if not isinstance(item, dict):
+                raise ValueError(f"Row {index}: must be an object")
+            amount = item.get('amount', item.get('total_amount'))
+            if not amount:
+                raise ValueError(f"Row {index}: payment amount is required")
+            try:
+                amount = Decimal(str(amount))
+                if not amount.is_finite():
+                    raise ArithmeticError(amount)
+            except ArithmeticError:
+                raise ValueError(f"Row {index}: invalid payment amount")
+            if amount <= 0:
+                raise ValueError(f"Row {index}: payment amount must be positive")
             try:
-                interest_section = PassbookSection.objects.get(
-                    sacco=loan.sacco,
-                    section_type='interest'
+                loan_id = int(item.get('loan'))
+            except (TypeError, ValueError):
+                raise ValueError(f"Row {index}: loan is required")
+            rows.append((index, loan_id, amount, item))
+        
+        loan_ids = sorted({loan_id for _, loan_id, _, _ in rows})
+        loans = {
+            loan.id: loan
+            for loan in SaccoLoan.objects.select_for_update().filter(
+                sacco=sacco, id__in=loan_ids
+            ).order_by('id')
+        }
+        
+        new_payments = []
+        deltas = {}
+        for index, loan_id, amount, item in rows:
+            loan = loans.get(loan_id)
+            if not loan:
+                raise ValueError(f"Row {index}: loan {loan_id} not found in this SACCO")
+            if loan.status not in ['disbursed', 'active']:
+                raise ValueError(f"Row {index}: cannot record payment for loan with status: {loan.status}")
+            
+            paid_principal, paid_interest = deltas.get(loan_id, (Decimal('0'), Decimal('0')))
+            if loan.balance_principal - paid_principal <= 0 and loan.balance_interest - paid_interest <= 0:
+                raise ValueError(f"Row {index}: loan {loan.loan_number} is already fully paid")
+            interest_amount, principal_amount = LoanService.split_payment(
+                amount,
+                loan.balance_interest - paid_interest,
+                loan.balance_principal - paid_principal
+            )
+            deltas[loan_id] = (paid_principal + principal_amount, paid_interest + interest_amount)
+            
+            new_payments.append(LoanPayment(
+                loan=loan,
+                payment_date=LoanService._coerce_date(item.get('payment_date')) or default_date,
+                total_amount=interest_amount + principal_amount,
+                principal_amount=principal_amount,
+                interest_amount=interest_amount,
+                payment_method=item.get('payment_method', ''),
+                reference_number=item.get('reference_number', ''),
+                notes=item.get('notes', ''),
+                recorded_by=recorded_by
+            ))
+        
+        # bulk_create skips LoanPayment.save(), so balances are applied once per loan below
+        LoanPayment.objects.bulk_create(new_payments)
+        for loan_id, (principal_amount, interest_amount) in deltas.items():
+            loans[loan_id].apply_payment(principal_amount, interest_amount)
+        
+        loan_section, interest_section = LoanService._get_payment_sections(sacco)
+        if loan_section or interest_section:
+            passbooks = {
+                passbook.member_id: passbook
+                for passbook in MemberPassbook.objects.filter(
+                    member_id__in={loan.member_id for loan in loans.values()}
                 )
-                
-                passbook = loan.member.get_passbook()
-                
-                interest_entry = PassbookService.record_entry(
-                    passbook=passbook,
-                    section=interest_section,
-                    amount=interest_amount,
-                    transaction_type='credit',
-                    description=f'Interest payment - {loan.loan_number}',
-                    recorded_by=recorded_by,
-                    transaction_date=payment_date,
-                    reference_number=reference_number or payment.id
+            }
+            linked = []
+            for payment in new_payments:
+                loan = loans[payment.loan_id]
+                passbook = passbooks.get(loan.member_id) or loan.member.get_passbook()
+                payment.passbook_entry = LoanService._record_payment_entries(
+                    payment, loan, passbook, loan_section, interest_section, recorded_by
                 )
-            
-            except PassbookSection.DoesNotExist:
-                pass
-        
-        # Loan balances are auto-updated in LoanPayment.save()
+                if payment.passbook_entry:
+                    linked.append(payment)
+            LoanPayment.objects.bulk_update(linked, ['passbook_entry'])
         
         return {
-            'payment': payment,
-            'passbook_entry': passbook_entry,
-            'remaining_balance': loan.total_balance,
-            'is_paid_off': loan.status == 'paid'
+            'payments': new_payments,
+            'loans': [loans[loan_id] for loan_id in deltas],
         }
     
+    @staticmethod
+    def _coerce_date(value):
+        """Accept a date or an ISO date string (as sent by the API)"""
+        if not value or not isinstance(value, str):
+            return value
+        parsed = parse_date(value)
+        if not parsed:
+            raise ValueError("Invalid payment date format; expected YYYY-MM-DD")
+        return parsed
+    
     @staticmethod
     @transaction.atomic
     def reject_loan(loan, rejected_by, rejection_reason):
@@ -538,19 +677,18 @@ class LoanService:
         # Coerce amount to Decimal (may come as string from API)
         amount = Decimal(str(amount))
 
-        # Generate loan number using MAX to avoid UNIQUE constraint issues after deletions
+        # Allocate the loan number from the SACCO's counter (seeded from existing loans)
         prefix = sacco.registration_number or 'LOAN'
-        last_loan = SaccoLoan.objects.filter(
-            sacco=sacco,
-            loan_number__startswith=prefix
-        ).order_by('-id').first()
         
-        if last_loan:
-            # Extract the numeric suffix from the last loan number
-            match = re.search(r'-(\d+)$', last_loan.loan_number)
-            next_num = int(match.group(1)) + 1 if match else 1
-        else:
-            next_num = 1
+        def last_loan_number():
+            last_loan = SaccoLoan.objects.filter(
+                sacco=sacco,
+                loan_number__startswith=prefix
+            ).order_by('-id').first()
+            match = re.search(r'-(\d+)$', last_loan.loan_number) if last_loan else None
+            return int(match.group(1)) if match else 0
+        
+        next_num = next_sequence_value(f'saccos.loan:{sacco.id}:{prefix}', seed=last_loan_number)
         
         loan_number = f"{prefix}-{next_num:05d}"
 
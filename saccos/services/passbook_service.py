@@ -1,5 +1,8 @@
+from collections import defaultdict
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 from datetime import timedelta
 
@@ -87,6 +90,7 @@ class PassbookService:
         )
         if recalc_result.get('entries_changed'):
             entry.refresh_from_db(fields=['balance_after'])
+        PassbookService.invalidate_balance_snapshots(passbook.id, section.id, transaction_date)
 
         return entry
     
@@ -135,6 +139,139 @@ class PassbookService:
             'entries_changed': len(changed),
         }
     
+    @staticmethod
+    def get_balances_as_of(passbook_ids, section_ids, as_of_date):
+        """
+        Get section balances at the end of a date for many passbooks at once
+        
+        Each (passbook, section) pair starts from its latest snapshot on or
+        before the date and adds only the entries recorded after it.
+        
+        Args:
+            passbook_ids: Iterable (or queryset) of MemberPassbook ids
+            section_ids: Iterable (or queryset) of PassbookSection ids
+            as_of_date: Include entries up to and including this date
+            
+        Returns:
+            dict: {(passbook_id, section_id): Decimal}; pairs without activity are omitted
+        """
+        from saccos.models import PassbookBalanceSnapshot, PassbookEntry
+        
+        snapshots = PassbookBalanceSnapshot.objects.filter(
+            passbook_id__in=passbook_ids,
+            section_id__in=section_ids,
+            as_of_date__lte=as_of_date
+        ).annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F('passbook_id'), F('section_id')],
+                order_by=F('as_of_date').desc()
+            )
+        ).filter(position=1).values_list('passbook_id', 'section_id', 'balance')
+        
+        balances = {(passbook_id, section_id): balance for passbook_id, section_id, balance in snapshots}
+        
+        latest_snapshot_date = PassbookBalanceSnapshot.objects.filter(
+            passbook_id=OuterRef('passbook_id'),
+            section_id=OuterRef('section_id'),
+            as_of_date__lte=as_of_date
+        ).order_by('-as_of_date').values('as_of_date')[:1]
+        
+        deltas = PassbookEntry.objects.filter(
+            passbook_id__in=passbook_ids,
+            section_id__in=section_ids,
+            transaction_date__lte=as_of_date
+        ).alias(
+            snapshot_date=Subquery(latest_snapshot_date)
+        ).filter(
+            Q(snapshot_date__isnull=True) | Q(transaction_date__gt=F('snapshot_date'))
+        ).values('passbook_id', 'section_id').annotate(
+            credits=Sum('amount', filter=Q(transaction_type='credit')),
+            debits=Sum('amount', filter=Q(transaction_type='debit'))
+        ).values_list('passbook_id', 'section_id', 'credits', 'debits').order_by()
+        
+        for passbook_id, section_id, credits, debits in deltas:
+            key = (passbook_id, section_id)
+            balances[key] = balances.get(key, Decimal('0')) + (credits or Decimal('0')) - (debits or Decimal('0'))
+        
+        return balances
+    
+    @staticmethod
+    def get_section_balance_as_of(passbook, section, as_of_date):
+        """
+        Get the balance of a section at the end of a date
+        
+        Args:
+            passbook: MemberPassbook instance
+            section: PassbookSection instance
+            as_of_date: Include entries up to and including this date
+            
+        Returns:
+            Decimal: Balance as of the date
+        """
+        balances = PassbookService.get_balances_as_of([passbook.id], [section.id], as_of_date)
+        return balances.get((passbook.id, section.id), Decimal('0'))
+    
+    @staticmethod
+    def create_balance_snapshots(as_of_date, sacco=None, batch_size=500):
+        """
+        Store section balances at the end of a date (typically a month end)
+        
+        Balances are built from the previous snapshots, so each run only scans
+        the entries recorded since then. Existing snapshots for the date are replaced.
+        
+        Args:
+            as_of_date: Snapshot date
+            sacco: Optional SaccoOrganization to limit the run to
+            batch_size: Passbooks processed per query batch
+            
+        Returns:
+            int: Number of snapshots written
+        """
+        from saccos.models import MemberPassbook, PassbookBalanceSnapshot, PassbookSection
+        
+        passbooks = MemberPassbook.objects.order_by('id')
+        sections = PassbookSection.objects.all()
+        if sacco:
+            passbooks = passbooks.filter(sacco=sacco)
+            sections = sections.filter(sacco=sacco)
+        passbook_ids = list(passbooks.values_list('id', flat=True))
+        section_ids = list(sections.values_list('id', flat=True))
+        
+        written = 0
+        for offset in range(0, len(passbook_ids), batch_size):
+            balances = PassbookService.get_balances_as_of(
+                passbook_ids[offset:offset + batch_size], section_ids, as_of_date
+            )
+            PassbookBalanceSnapshot.objects.bulk_create(
+                [
+                    PassbookBalanceSnapshot(
+                        passbook_id=passbook_id,
+                        section_id=section_id,
+                        as_of_date=as_of_date,
+                        balance=balance
+                    )
+                    for (passbook_id, section_id), balance in balances.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['passbook', 'section', 'as_of_date'],
+                update_fields=['balance', 'updated_at'],
+            )
+            written += len(balances)
+        
+        return written
+    
+    @staticmethod
+    def invalidate_balance_snapshots(passbook_id, section_id, from_date):
+        """Drop snapshots that a new, removed or back-dated entry on from_date has made stale"""
+        from saccos.models import PassbookBalanceSnapshot
+        
+        return PassbookBalanceSnapshot.objects.filter(
+            passbook_id=passbook_id,
+            section_id=section_id,
+            as_of_date__gte=from_date
+        ).delete()[0]
+    
     @staticmethod
     def get_all_balances(passbook):
         """
@@ -212,26 +349,34 @@ class PassbookService:
             'sections': []
         }
         
+        sections = list(sections)
+        section_ids = [section_obj.id for section_obj in sections]
+        
+        # Opening and closing balances come from the nearest snapshot plus later entries
+        opening_balances = PassbookService.get_balances_as_of(
+            [passbook.id], section_ids, start_date - timedelta(days=1)
+        )
+        closing_balances = PassbookService.get_balances_as_of(
+            [passbook.id], section_ids, end_date
+        )
+        
+        # Entries in the period, fetched once for all sections
+        period_entries = defaultdict(list)
+        for entry in PassbookEntry.objects.filter(
+            passbook=passbook,
+            section_id__in=section_ids,
+            transaction_date__gte=start_date,
+            transaction_date__lte=end_date
+        ).order_by('transaction_date', 'created_at'):
+            period_entries[entry.section_id].append(entry)
+        
         total_credits = Decimal('0')
         total_debits = Decimal('0')
         
         for section_obj in sections:
-            # Get opening balance (balance at start_date)
-            opening_entry = PassbookEntry.objects.filter(
-                passbook=passbook,
-                section=section_obj,
-                transaction_date__lt=start_date
-            ).order_by('-transaction_date', '-created_at').first()
-            
-            opening_balance = opening_entry.balance_after if opening_entry else Decimal('0')
-            
-            # Get entries in period
-            entries = PassbookEntry.objects.filter(
-                passbook=passbook,
-                section=section_obj,
-                transaction_date__gte=start_date,
-                transaction_date__lte=end_date
-            ).order_by('transaction_date', 'created_at')
+            key = (passbook.id, section_obj.id)
+            opening_balance = opening_balances.get(key, Decimal('0'))
+            entries = period_entries[section_obj.id]
             
             # Calculate totals
             section_credits = sum(
@@ -241,7 +386,7 @@ class PassbookService:
                 e.amount for e in entries if e.transaction_type == 'debit'
             )
             
-            closing_balance = PassbookService.get_section_balance(passbook, section_obj)
+            closing_balance = closing_balances.get(key, Decimal('0'))
             
             statement['sections'].append({
                 'section': {
@@ -251,7 +396,7 @@ class PassbookService:
                     'color': section_obj.color
                 },
                 'opening_balance': opening_balance,
-                'entries': list(entries),
+                'entries': entries,
                 'credits': section_credits,
                 'debits': section_debits,
                 'closing_balance': closing_balance
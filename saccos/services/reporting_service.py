@@ -1,3 +1,4 @@
+from collections import defaultdict
 from decimal import Decimal
 from django.utils import timezone
 from django.db.models import Sum, Count, Q, Avg
@@ -377,27 +378,29 @@ class ReportingService:
         if total_meetings == 0:
             return {'error': 'No meetings in this period'}
         
-        members = sacco.members.filter(status='active')
+        # One grouped query over the members' contributions to these meetings
+        in_period = Q(weekly_contributions__meeting__in=meetings)
+        members = list(
+            sacco.members.filter(status='active')
+            .select_related('user')
+            .annotate(
+                attended=Count('weekly_contributions', filter=in_period & Q(weekly_contributions__was_present=True)),
+                missed=Count('weekly_contributions', filter=in_period & Q(weekly_contributions__was_present=False)),
+                contributed=Sum('weekly_contributions__amount_contributed', filter=in_period),
+            )
+        )
         member_stats = []
         
         for member in members:
-            contributions = member.weekly_contributions.filter(
-                meeting__in=meetings
-            )
-            
-            attended = contributions.filter(was_present=True).count()
-            missed = contributions.filter(was_present=False).count()
-            attendance_rate = (attended / total_meetings * 100) if total_meetings > 0 else 0
+            attendance_rate = (member.attended / total_meetings * 100) if total_meetings > 0 else 0
             
             member_stats.append({
                 'member_number': member.member_number,
                 'name': member.user.get_full_name(),
-                'attended': attended,
-                'missed': missed,
+                'attended': member.attended,
+                'missed': member.missed,
                 'attendance_rate': round(attendance_rate, 2),
-                'total_contributed': contributions.aggregate(
-                    total=Sum('amount_contributed')
-                )['total'] or Decimal('0')
+                'total_contributed': member.contributed or Decimal('0')
             })
         
         # Sort by attendance rate
@@ -410,7 +413,7 @@ class ReportingService:
             },
             'summary': {
                 'total_meetings': total_meetings,
-                'total_members': members.count(),
+                'total_members': len(members),
                 'average_attendance_rate': round(
                     sum(m['attendance_rate'] for m in member_stats) / len(member_stats),
                     2
@@ -432,7 +435,8 @@ class ReportingService:
         Returns:
             dict: Savings report
         """
-        from saccos.models import PassbookSection, PassbookEntry
+        from saccos.models import MemberPassbook, PassbookSection
+        from saccos.services.passbook_service import PassbookService
         
         if not end_date:
             end_date = timezone.now().date()
@@ -446,28 +450,28 @@ class ReportingService:
             is_active=True
         )
         
-        members = sacco.members.filter(status='active')
-        member_savings = []
+        members = list(sacco.members.filter(status='active').select_related('user'))
         
-        for member in members:
-            passbook = member.get_passbook()
-            total_savings = Decimal('0')
-            
-            for section in savings_sections:
-                balance = PassbookEntry.objects.filter(
-                    passbook=passbook,
-                    section=section,
-                    transaction_date__lte=end_date
-                ).order_by('-created_at').first()
-                
-                if balance:
-                    total_savings += balance.balance_after
-            
-            member_savings.append({
+        # Balances at end_date from the nearest snapshot plus the entries after it
+        passbook_members = dict(
+            MemberPassbook.objects.filter(member__in=members).values_list('id', 'member_id')
+        )
+        balances = PassbookService.get_balances_as_of(
+            list(passbook_members), savings_sections.values('id'), end_date
+        )
+        
+        savings_by_member = defaultdict(Decimal)
+        for (passbook_id, section_id), balance in balances.items():
+            savings_by_member[passbook_members[passbook_id]] += balance
+        
+        member_savings = [
+            {
                 'member_number': member.member_number,
                 'name': member.user.get_full_name(),
-                'total_savings': total_savings
-            })
+                'total_savings': savings_by_member.get(member.id, Decimal('0'))
+            }
+            for member in members
+        ]
         
         # Sort by savings amount
         member_savings.sort(key=lambda x: x['total_savings'], reverse=True)
@@ -563,33 +567,70 @@ class ReportingService:
         Returns:
             dict: Member rankings
         """
-        members = sacco.members.filter(status='active')
-        member_data = []
+        from saccos.models import PassbookEntry, PassbookSection, WeeklyContribution
+        
+        members = list(sacco.members.filter(status='active').select_related('user'))
+        savings_section_ids = list(
+            PassbookSection.objects.filter(
+                sacco=sacco, is_active=True, section_type='savings'
+            ).values_list('id', flat=True)
+        )
+        
+        # Net balance per member and savings section in one grouped query
+        section_balances = {}
+        for member_id, section_id, credits, debits in (
+            PassbookEntry.objects.filter(
+                passbook__member__in=members,
+                section_id__in=savings_section_ids
+            )
+            .values('passbook__member_id', 'section_id')
+            .annotate(
+                credits=Sum('amount', filter=Q(transaction_type='credit')),
+                debits=Sum('amount', filter=Q(transaction_type='debit'))
+            )
+            .values_list('passbook__member_id', 'section_id', 'credits', 'debits')
+            .order_by()
+        ):
+            section_balances[(member_id, section_id)] = (credits or Decimal('0')) - (debits or Decimal('0'))
+        
+        loan_counts = {
+            row['member_id']: row
+            for row in sacco.loans.filter(member__in=members)
+            .values('member_id')
+            .annotate(
+                taken=Count('id'),
+                active=Count('id', filter=Q(status__in=['disbursed', 'active']))
+            )
+            .order_by()
+        }
+        attendance_counts = {
+            row['member_id']: row
+            for row in WeeklyContribution.objects.filter(member__in=members)
+            .values('member_id')
+            .annotate(total=Count('id'), present=Count('id', filter=Q(was_present=True)))
+            .order_by()
+        }
         
+        member_data = []
         for member in members:
-            passbook = member.get_passbook()
-            balances = passbook.get_all_balances()
-            
+            # Summed per section as floats, matching MemberPassbook.get_all_balances
             total_savings = sum(
-                data['balance'] for name, data in balances.items()
-                if data.get('section_type') == 'savings'
+                float(section_balances.get((member.id, section_id), Decimal('0')))
+                for section_id in savings_section_ids
             )
             
-            loans_taken = member.loans.count()
-            active_loans = member.loans.filter(status__in=['disbursed', 'active']).count()
-            
-            contributions = member.weekly_contributions.all()
+            loans = loan_counts.get(member.id, {'taken': 0, 'active': 0})
+            attendance = attendance_counts.get(member.id)
             attendance_rate = (
-                contributions.filter(was_present=True).count() /
-                contributions.count() * 100
-            ) if contributions.count() > 0 else 0
+                attendance['present'] / attendance['total'] * 100
+            ) if attendance else 0
             
             member_data.append({
                 'member_number': member.member_number,
                 'name': member.user.get_full_name(),
                 'total_savings': total_savings,
-                'loans_taken': loans_taken,
-                'active_loans': active_loans,
+                'loans_taken': loans['taken'],
+                'active_loans': loans['active'],
                 'attendance_rate': round(attendance_rate, 2),
                 'date_joined': member.date_joined
             })
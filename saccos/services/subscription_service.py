@@ -5,6 +5,9 @@ from django.utils import timezone
 from dateutil.relativedelta import relativedelta
 
 
+MEGABYTE = 1024 * 1024
+
+
 class SubscriptionService:
     """
     Service for managing SACCO subscriptions
@@ -238,11 +241,154 @@ class SubscriptionService:
         
         return subscription
     
+    @staticmethod
+    def recount_usage_counters(saccos=None):
+        """
+        Rebuild usage counters from scratch with grouped queries
+        
+        Args:
+            saccos: Optional iterable of SaccoOrganization instances or ids (defaults to all)
+            
+        Returns:
+            int: Number of counters written
+        """
+        from django.db.models import Count
+        from saccos.models import SaccoLoan, SaccoMember, SaccoOrganization, SaccoUsageCounter, WeeklyMeeting
+        
+        sacco_ids = SaccoOrganization.objects.values_list('id', flat=True)
+        if saccos is not None:
+            sacco_ids = sacco_ids.filter(id__in=[getattr(s, 'pk', s) for s in saccos])
+        sacco_ids = list(sacco_ids)
+        if not sacco_ids:
+            return 0
+        
+        current_year = timezone.now().year
+        
+        def counts(queryset):
+            rows = queryset.filter(sacco_id__in=sacco_ids).values('sacco_id').annotate(total=Count('id'))
+            return {row['sacco_id']: row['total'] for row in rows}
+        
+        members = counts(SaccoMember.objects.filter(status='active'))
+        meetings = counts(WeeklyMeeting.objects.filter(year=current_year))
+        loans = counts(SaccoLoan.objects.all())
+        
+        counters = [
+            SaccoUsageCounter(
+                sacco_id=sacco_id,
+                active_members=members.get(sacco_id, 0),
+                meetings_year=current_year,
+                meetings_count=meetings.get(sacco_id, 0),
+                loans_count=loans.get(sacco_id, 0),
+            )
+            for sacco_id in sacco_ids
+        ]
+        # storage_bytes is only ever maintained incrementally, so it is left untouched
+        SaccoUsageCounter.objects.bulk_create(
+            counters,
+            update_conflicts=True,
+            unique_fields=['sacco'],
+            update_fields=['active_members', 'meetings_year', 'meetings_count', 'loans_count', 'updated_at'],
+        )
+        return len(counters)
+    
+    @staticmethod
+    def get_usage_counter(sacco):
+        """
+        Get the SACCO's usage counter, building it on first use
+        
+        Args:
+            sacco: SaccoOrganization instance
+            
+        Returns:
+            SaccoUsageCounter instance
+        """
+        from saccos.models import SaccoUsageCounter
+        
+        counter = SaccoUsageCounter.objects.filter(sacco=sacco).first()
+        if counter is None:
+            SubscriptionService.recount_usage_counters([sacco])
+            counter = SaccoUsageCounter.objects.get(sacco=sacco)
+        return counter
+    
+    @staticmethod
+    def adjust_usage(sacco_id, active_members=0, loans=0, storage_bytes=0):
+        """
+        Apply deltas to a SACCO's usage counter in one UPDATE
+        
+        Counters that do not exist yet are left alone; they are built from a
+        full recount the first time they are read.
+        """
+        from django.db.models import F
+        from saccos.models import SaccoUsageCounter
+        
+        changes = {}
+        if active_members:
+            changes['active_members'] = F('active_members') + active_members
+        if loans:
+            changes['loans_count'] = F('loans_count') + loans
+        if storage_bytes:
+            changes['storage_bytes'] = F('storage_bytes') + storage_bytes
+        if sacco_id and changes:
+            SaccoUsageCounter.objects.filter(sacco_id=sacco_id).update(updated_at=timezone.now(), **changes)
+    
+    @staticmethod
+    def adjust_meeting_usage(sacco_id, year, delta):
+        """Count a meeting created (+1) or deleted (-1) in ``year`` against the current-year counter"""
+        from django.db.models import Case, F, Value, When
+        from saccos.models import SaccoUsageCounter
+        
+        if not sacco_id or year != timezone.now().year:
+            return
+        # A counter still holding last year's count starts again from this meeting
+        SaccoUsageCounter.objects.filter(sacco_id=sacco_id).update(
+            meetings_count=Case(
+                When(meetings_year=year, then=F('meetings_count') + delta),
+                default=Value(max(delta, 0)),
+            ),
+            meetings_year=year,
+            updated_at=timezone.now(),
+        )
+    
+    @staticmethod
+    def record_storage_usage(sacco, size_bytes):
+        """
+        Record bytes added (positive) or freed (negative) by SACCO file uploads
+        
+        Args:
+            sacco: SaccoOrganization instance
+            size_bytes: Change in stored bytes
+        """
+        SubscriptionService.get_usage_counter(sacco)
+        SubscriptionService.adjust_usage(sacco.pk, storage_bytes=size_bytes)
+    
+    @staticmethod
+    def is_within_limit(sacco, resource, adding=1):
+        """
+        Cheap limit check for write paths
+        
+        Args:
+            sacco: SaccoOrganization instance
+            resource: 'members', 'meetings' or 'storage' (bytes for storage)
+            adding: Amount about to be added
+            
+        Returns:
+            bool: True when the SACCO has no subscription or stays within its plan
+        """
+        limits = SubscriptionService.check_usage_limits(sacco)
+        if not limits['has_subscription']:
+            return True
+        usage = limits['limits'][resource]
+        if resource == 'storage':
+            return usage['used_bytes'] + adding <= usage['limit'] * MEGABYTE
+        return usage['used'] + adding <= usage['limit']
+    
     @staticmethod
     def check_usage_limits(sacco):
         """
         Check if SACCO is within subscription limits
         
+        Reads the maintained usage counter instead of counting rows.
+        
         Args:
             sacco: SaccoOrganization instance
             
@@ -257,18 +403,19 @@ class SubscriptionService:
         
         subscription = sacco.subscription
         plan = subscription.plan
+        counter = SubscriptionService.get_usage_counter(sacco)
         
         # Check member count
-        active_members = sacco.members.filter(status='active').count()
+        active_members = counter.active_members
         members_ok = active_members <= plan.max_members
         
         # Check meetings this year
-        current_year = timezone.now().year
-        meetings_this_year = sacco.weekly_meetings.filter(year=current_year).count()
+        meetings_this_year = counter.meetings_in_year(timezone.now().year)
         meetings_ok = meetings_this_year <= plan.max_weekly_meetings
         
-        # Storage check (simplified - would need actual file size calculation)
-        storage_ok = True  # Placeholder
+        # Check storage
+        storage_mb = counter.storage_bytes / MEGABYTE
+        storage_ok = counter.storage_bytes <= plan.max_storage_mb * MEGABYTE
         
         return {
             'has_subscription': True,
@@ -287,7 +434,11 @@ class SubscriptionService:
                     'percentage': (meetings_this_year / plan.max_weekly_meetings * 100) if plan.max_weekly_meetings > 0 else 0
                 },
                 'storage': {
-                    'ok': storage_ok
+                    'used_bytes': counter.storage_bytes,
+                    'used_mb': round(storage_mb, 2),
+                    'limit': plan.max_storage_mb,
+                    'ok': storage_ok,
+                    'percentage': (storage_mb / plan.max_storage_mb * 100) if plan.max_storage_mb > 0 else 0
                 }
             },
             'within_limits': members_ok and meetings_ok and storage_ok
@@ -295,6 +446,90 @@ class SubscriptionService:
     
     @staticmethod
     @transaction.atomic
+    def record_usage_metrics_bulk(period_start, period_end, saccos=None):
+        """
+        Write UsageMetrics snapshots for a period across many SACCOs
+        
+        Member and storage usage come from the usage counters; meetings,
+        contributions and loans for the period come from one grouped query
+        each. Existing snapshots for the same period start are updated.
+        
+        Args:
+            period_start: Start date
+            period_end: End date
+            saccos: Optional iterable of SaccoOrganization instances or ids (defaults to all)
+            
+        Returns:
+            list of UsageMetrics instances
+        """
+        from django.db.models import Count, Q
+        from saccos.models import SaccoLoan, SaccoOrganization, SaccoUsageCounter, UsageMetrics, WeeklyMeeting
+        
+        sacco_ids = SaccoOrganization.objects.values_list('id', flat=True)
+        if saccos is not None:
+            sacco_ids = sacco_ids.filter(id__in=[getattr(s, 'pk', s) for s in saccos])
+        sacco_ids = list(sacco_ids)
+        if not sacco_ids:
+            return []
+        
+        counters = {c.sacco_id: c for c in SaccoUsageCounter.objects.filter(sacco_id__in=sacco_ids)}
+        missing = [sacco_id for sacco_id in sacco_ids if sacco_id not in counters]
+        if missing:
+            SubscriptionService.recount_usage_counters(missing)
+            counters.update({c.sacco_id: c for c in SaccoUsageCounter.objects.filter(sacco_id__in=missing)})
+        
+        meetings = {
+            row['sacco_id']: row
+            for row in WeeklyMeeting.objects.filter(
+                sacco_id__in=sacco_ids,
+                meeting_date__gte=period_start,
+                meeting_date__lte=period_end
+            ).values('sacco_id').annotate(
+                held=Count('id'),
+                contributions=Sum('total_collected', filter=Q(status='completed'))
+            )
+        }
+        loans = {
+            row['sacco_id']: row
+            for row in SaccoLoan.objects.filter(
+                sacco_id__in=sacco_ids,
+                disbursement_date__gte=period_start,
+                disbursement_date__lte=period_end
+            ).values('sacco_id').annotate(
+                created=Count('id'),
+                disbursed=Sum('principal_amount')
+            )
+        }
+        
+        snapshots = []
+        for sacco_id in sacco_ids:
+            counter = counters[sacco_id]
+            meeting_row = meetings.get(sacco_id, {})
+            loan_row = loans.get(sacco_id, {})
+            snapshots.append(UsageMetrics(
+                sacco_id=sacco_id,
+                period_start=period_start,
+                period_end=period_end,
+                active_members_count=max(counter.active_members, 0),
+                meetings_held=meeting_row.get('held', 0),
+                loans_created=loan_row.get('created', 0),
+                storage_used_mb=-(-max(counter.storage_bytes, 0) // MEGABYTE),
+                total_contributions=meeting_row.get('contributions') or Decimal('0'),
+                total_loans_disbursed=loan_row.get('disbursed') or Decimal('0'),
+            ))
+        
+        UsageMetrics.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=['sacco', 'period_start'],
+            update_fields=[
+                'period_end', 'active_members_count', 'meetings_held', 'loans_created',
+                'storage_used_mb', 'total_contributions', 'total_loans_disbursed', 'updated_at'
+            ],
+        )
+        return snapshots
+    
+    @staticmethod
     def record_usage_metrics(sacco, period_start, period_end):
         """
         Record usage metrics for a period
@@ -309,46 +544,8 @@ class SubscriptionService:
         """
         from saccos.models import UsageMetrics
         
-        # Calculate metrics
-        active_members = sacco.members.filter(status='active').count()
-        
-        meetings = sacco.weekly_meetings.filter(
-            meeting_date__gte=period_start,
-            meeting_date__lte=period_end
-        )
-        meetings_held = meetings.count()
-        
-        total_contributions = meetings.filter(
-            status='completed'
-        ).aggregate(
-            total=Sum('total_collected')
-        )['total'] or Decimal('0')
-        
-        loans = sacco.loans.filter(
-            disbursement_date__gte=period_start,
-            disbursement_date__lte=period_end
-        )
-        loans_created = loans.count()
-        
-        total_loans_disbursed = loans.aggregate(
-            total=Sum('principal_amount')
-        )['total'] or Decimal('0')
-        
-        # Create or update metrics
-        metrics, created = UsageMetrics.objects.update_or_create(
-            sacco=sacco,
-            period_start=period_start,
-            defaults={
-                'period_end': period_end,
-                'active_members_count': active_members,
-                'meetings_held': meetings_held,
-                'loans_created': loans_created,
-                'total_contributions': total_contributions,
-                'total_loans_disbursed': total_loans_disbursed
-            }
-        )
-        
-        return metrics
+        SubscriptionService.record_usage_metrics_bulk(period_start, period_end, saccos=[sacco])
+        return UsageMetrics.objects.get(sacco=sacco, period_start=period_start)
     
     @staticmethod
     def get_subscription_status(sacco):
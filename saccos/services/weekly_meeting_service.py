@@ -96,6 +96,123 @@ class WeeklyMeetingService:
         
         return contribution
     
+    CONTRIBUTION_AMOUNT_FIELDS = [
+        'amount_contributed', 'optional_savings', 'compulsory_savings_deduction',
+        'welfare_deduction', 'development_deduction', 'other_deductions',
+    ]
+    
+    @staticmethod
+    @transaction.atomic
+    def record_contributions_bulk(meeting, contributions):
+        """
+        Upsert the full attendance/contribution sheet for a meeting at once
+        
+        The sheet is validated against the meeting's SACCO and active cash
+        round membership in one pass, contributions are written with
+        bulk_create/bulk_update and meeting totals are recalculated once.
+        All-or-nothing: any invalid row raises ValueError and nothing is saved.
+        
+        Args:
+            meeting: WeeklyMeeting instance
+            contributions: List of dicts with 'member' (id) and optional
+                'was_present', 'amount_contributed', 'optional_savings',
+                deduction amounts and 'notes'
+            
+        Returns:
+            dict with created and updated WeeklyContribution lists
+        """
+        from saccos.models import CashRoundMember, SaccoMember, WeeklyContribution, WeeklyMeeting
+        
+        # Serialize concurrent sheet submissions for the same meeting
+        locked = WeeklyMeeting.objects.select_for_update().only('status').get(pk=meeting.pk)
+        if locked.status == 'completed':
+            raise ValueError("Cannot record contributions for a completed meeting")
+        
+        rows = {}
+        for index, item in enumerate(contributions, start=1):
+            if not isinstance(item, dict):
+                raise ValueError(f"Row {index}: must be an object")
+            try:
+                member_id = int(item.get('member', item.get('member_id')))
+            except (TypeError, ValueError):
+                raise ValueError(f"Row {index}: member is required")
+            if member_id in rows:
+                raise ValueError(f"Row {index}: duplicate entry for member {member_id}")
+            
+            values = {}
+            for field in WeeklyMeetingService.CONTRIBUTION_AMOUNT_FIELDS:
+                if item.get(field) in (None, ''):
+                    continue
+                try:
+                    values[field] = Decimal(str(item[field]))
+                    if not values[field].is_finite():
+                        raise ArithmeticError(field)
+                except ArithmeticError:
+                    raise ValueError(f"Row {index}: invalid {field}")
+                if values[field] < 0:
+                    raise ValueError(f"Row {index}: {field} cannot be negative")
+            if 'was_present' in item:
+                values['was_present'] = item['was_present'] not in (False, 'false', 'False', 0, '0')
+            if 'notes' in item:
+                values['notes'] = item['notes'] or ''
+            rows[member_id] = (index, values)
+        
+        member_ids = set(
+            SaccoMember.objects.filter(sacco=meeting.sacco, id__in=rows).values_list('id', flat=True)
+        )
+        if meeting.cash_round_id:
+            member_ids &= set(
+                CashRoundMember.objects.filter(
+                    cash_round_id=meeting.cash_round_id,
+                    member_id__in=rows,
+                    is_active=True
+                ).values_list('member_id', flat=True)
+            )
+        
+        existing = {c.member_id: c for c in meeting.contributions.filter(member_id__in=rows)}
+        
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for member_id, (index, values) in rows.items():
+            if member_id not in member_ids:
+                scope = "this meeting's cash round" if meeting.cash_round_id else 'this SACCO'
+                raise ValueError(f"Row {index}: member {member_id} is not part of {scope}")
+            
+            contribution = existing.get(member_id)
+            if contribution is None:
+                contribution = WeeklyContribution(meeting=meeting, member_id=member_id)
+                to_create.append(contribution)
+            elif contribution.funding_source == 'sacco':
+                raise ValueError(
+                    f"Row {index}: member {member_id} was covered by the SACCO as a defaulter"
+                )
+            else:
+                contribution.updated_at = now
+                to_update.append(contribution)
+            
+            for field, value in values.items():
+                setattr(contribution, field, value)
+            contribution.is_recipient = (member_id == meeting.cash_round_recipient_id)
+            if contribution.is_recipient:
+                contribution.calculate_total_deductions()
+        
+        # bulk_create/bulk_update skip WeeklyContribution.save(), so totals are recalculated once below
+        WeeklyContribution.objects.bulk_create(to_create)
+        WeeklyContribution.objects.bulk_update(
+            to_update,
+            WeeklyMeetingService.CONTRIBUTION_AMOUNT_FIELDS + [
+                'was_present', 'notes', 'is_recipient', 'total_deductions', 'updated_at'
+            ]
+        )
+        
+        meeting.calculate_totals()
+        
+        return {
+            'created': to_create,
+            'updated': to_update,
+        }
+    
     @staticmethod
     @transaction.atomic
     def record_defaulter(
@@ -496,6 +613,8 @@ class WeeklyMeetingService:
                 section_id=section_id,
                 apply_changes=True,
             )
+            # The queryset delete skips PassbookEntry.delete(), so drop stale snapshots here
+            PassbookService.invalidate_balance_snapshots(passbook_id, section_id, meeting.meeting_date)
         
         # 3. Delete missed_contribution loans created for this meeting
         # These are created when marking members as defaulters
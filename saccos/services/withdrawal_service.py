@@ -5,6 +5,8 @@ from django.db import transaction
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 
+from common.sequences import next_sequence_value
+
 
 class WithdrawalService:
     @staticmethod
@@ -51,104 +53,130 @@ class WithdrawalService:
         ).order_by('display_order', 'id')
 
     @staticmethod
-    def get_reserved_amounts_by_section(member):
-        from django.db.models import Sum
-        from saccos.models import WithdrawalAllocation
-
-        rows = WithdrawalAllocation.objects.filter(
+    def get_section_availability(sacco, member, passbook=None):
+        """
+        Get balance, reserved and available amounts for all withdrawable sections
+
+        Balances and pending/approved reservations are computed as correlated
+        subqueries, so every section is loaded in a single query.
+
+        Args:
+            sacco: SaccoOrganization instance
+            member: SaccoMember instance
+            passbook: MemberPassbook instance (defaults to the member's passbook)
+
+        Returns:
+            list: Dicts with section, balance, reserved and available (Decimal)
+        """
+        from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+        from django.db.models.functions import Coalesce
+        from saccos.models import PassbookEntry, WithdrawalAllocation
+
+        passbook = passbook or member.get_passbook()
+        amount_field = DecimalField(max_digits=15, decimal_places=2)
+
+        balance = PassbookEntry.objects.filter(
+            passbook=passbook,
+            section=OuterRef('pk'),
+        ).values('section').annotate(
+            total=Sum(Case(
+                When(transaction_type='credit', then=F('amount')),
+                default=-F('amount'),
+                output_field=amount_field,
+            ))
+        ).values('total')
+
+        reserved = WithdrawalAllocation.objects.filter(
+            section=OuterRef('pk'),
             withdrawal__member=member,
             withdrawal__status__in=['pending', 'approved'],
-        ).values('section_id').annotate(total=Sum('amount'))
-
-        reserved = {}
-        for r in rows:
-            reserved[int(r['section_id'])] = r['total'] or Decimal('0')
-        return reserved
+        ).values('section').annotate(total=Sum('amount')).values('total')
 
-    @staticmethod
-    def get_available_summary(sacco, member):
-        from saccos.services.passbook_service import PassbookService
+        zero = Value(Decimal('0'), output_field=amount_field)
+        sections = WithdrawalService.get_withdrawable_sections(sacco).annotate(
+            balance=Coalesce(Subquery(balance, output_field=amount_field), zero),
+            reserved=Coalesce(Subquery(reserved, output_field=amount_field), zero),
+        )
 
-        passbook = member.get_passbook()
-        sections = list(WithdrawalService.get_withdrawable_sections(sacco))
-        reserved_by_section = WithdrawalService.get_reserved_amounts_by_section(member)
+        rows = []
+        for section in sections:
+            section_balance = Decimal(section.balance)
+            section_reserved = Decimal(section.reserved)
+            rows.append({
+                'section': section,
+                'balance': section_balance,
+                'reserved': section_reserved,
+                'available': max(section_balance - section_reserved, Decimal('0')),
+            })
+        return rows
 
+    @staticmethod
+    def _summarize_availability(rows):
         total_balance = Decimal('0')
         total_reserved = Decimal('0')
         total_available = Decimal('0')
         section_rows = []
 
-        for section in sections:
-            balance = PassbookService.get_section_balance(passbook, section)
-            reserved = reserved_by_section.get(section.id, Decimal('0'))
-            available = balance - reserved
-            if available < 0:
-                available = Decimal('0')
-
-            total_balance += balance
-            total_reserved += reserved
-            total_available += available
+        for row in rows:
+            section = row['section']
+            total_balance += row['balance']
+            total_reserved += row['reserved']
+            total_available += row['available']
 
             section_rows.append({
                 'section_id': section.id,
                 'section_name': section.name,
                 'section_type': section.section_type,
                 'color': section.color,
-                'balance': WithdrawalService._format_decimal(balance),
-                'reserved': WithdrawalService._format_decimal(reserved),
-                'available': WithdrawalService._format_decimal(available),
+                'balance': WithdrawalService._format_decimal(row['balance']),
+                'reserved': WithdrawalService._format_decimal(row['reserved']),
+                'available': WithdrawalService._format_decimal(row['available']),
             })
 
         return {
-            'member_id': member.id,
             'total_balance': WithdrawalService._format_decimal(total_balance),
             'total_reserved': WithdrawalService._format_decimal(total_reserved),
             'total_available': WithdrawalService._format_decimal(total_available),
             'sections': section_rows,
         }
 
+    @staticmethod
+    def get_available_summary(sacco, member):
+        rows = WithdrawalService.get_section_availability(sacco, member)
+        return {'member_id': member.id, **WithdrawalService._summarize_availability(rows)}
+
     @staticmethod
     def _generate_withdrawal_number(sacco):
         from saccos.models import SaccoWithdrawal
 
         prefix = sacco.registration_number or 'WD'
-        last = SaccoWithdrawal.objects.filter(
-            sacco=sacco,
-            withdrawal_number__startswith=prefix,
-        ).order_by('-id').first()
 
-        if last:
-            match = re.search(r'-(\d+)$', last.withdrawal_number)
-            next_num = int(match.group(1)) + 1 if match else 1
-        else:
-            next_num = 1
+        def last_withdrawal_number():
+            last = SaccoWithdrawal.objects.filter(
+                sacco=sacco,
+                withdrawal_number__startswith=prefix,
+            ).order_by('-id').first()
+            match = re.search(r'-(\d+)$', last.withdrawal_number) if last else None
+            return int(match.group(1)) if match else 0
 
+        next_num = next_sequence_value(f'saccos.withdrawal:{sacco.id}:{prefix}', seed=last_withdrawal_number)
         return f"{prefix}-{next_num:05d}"
 
     @staticmethod
-    def _build_auto_allocations(sacco, member, amount: Decimal):
-        from saccos.services.passbook_service import PassbookService
-
-        passbook = member.get_passbook()
-        reserved_by_section = WithdrawalService.get_reserved_amounts_by_section(member)
-        sections = list(WithdrawalService.get_withdrawable_sections(sacco))
-
+    def _build_auto_allocations(availability, amount: Decimal):
+        """Allocate ``amount`` across sections in display order from precomputed availability"""
         remaining = amount
         allocations = []
 
-        for section in sections:
+        for row in availability:
             if remaining <= 0:
                 break
-            balance = PassbookService.get_section_balance(passbook, section)
-            reserved = reserved_by_section.get(section.id, Decimal('0'))
-            available = balance - reserved
-            if available <= 0:
+            if row['available'] <= 0:
                 continue
 
-            take = min(available, remaining)
-            if take > 0:
-                allocations.append({'section': section, 'amount': take})
-                remaining -= take
+            take = min(row['available'], remaining)
+            allocations.append({'section': row['section'], 'amount': take})
+            remaining -= take
 
         if remaining > 0:
             raise ValueError('Insufficient withdrawable balance')
@@ -167,14 +195,18 @@ class WithdrawalService:
         notes='',
         allocations=None,
     ):
-        from saccos.models import SaccoWithdrawal, WithdrawalAllocation, PassbookSection
+        from saccos.models import MemberPassbook, SaccoWithdrawal, WithdrawalAllocation, PassbookSection
 
         amount = WithdrawalService._coerce_decimal(amount)
 
         request_date_obj = WithdrawalService._to_date(request_date) or timezone.now().date()
 
-        summary = WithdrawalService.get_available_summary(sacco=sacco, member=member)
-        total_available = Decimal(str(summary['total_available']))
+        # Lock the passbook so concurrent requests for this member allocate one at a time
+        passbook = MemberPassbook.objects.select_for_update().get(pk=member.get_passbook().pk)
+        availability = WithdrawalService.get_section_availability(sacco, member, passbook=passbook)
+        available_by_section = {row['section'].id: row['available'] for row in availability}
+
+        total_available = sum(available_by_section.values(), Decimal('0'))
         if amount > total_available:
             raise ValueError('Requested amount exceeds available withdrawable balance')
 
@@ -192,6 +224,7 @@ class WithdrawalService:
 
         if allocations:
             built = []
+            requested = {}
             total = Decimal('0')
             for row in allocations:
                 section_id = row.get('section') or row.get('section_id')
@@ -199,20 +232,25 @@ class WithdrawalService:
                 section = PassbookSection.objects.get(id=section_id, sacco=sacco)
                 if not section.withdrawable:
                     raise ValueError(f"Section '{section.name}' is not withdrawable")
+                requested[section.id] = requested.get(section.id, Decimal('0')) + alloc_amount
+                if requested[section.id] > available_by_section.get(section.id, Decimal('0')):
+                    raise ValueError(f"Allocation for section '{section.name}' exceeds its available balance")
                 built.append({'section': section, 'amount': alloc_amount})
                 total += alloc_amount
 
             if total != amount:
                 raise ValueError('Allocation total must equal requested amount')
         else:
-            built = WithdrawalService._build_auto_allocations(sacco=sacco, member=member, amount=amount)
+            built = WithdrawalService._build_auto_allocations(availability, amount)
 
-        for row in built:
-            WithdrawalAllocation.objects.create(
+        WithdrawalAllocation.objects.bulk_create([
+            WithdrawalAllocation(
                 withdrawal=withdrawal,
                 section=row['section'],
                 amount=row['amount'],
             )
+            for row in built
+        ])
 
         return withdrawal
 
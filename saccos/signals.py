@@ -0,0 +1,94 @@
+# saccos/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import LoanPayment, PassbookEntry, SaccoLoan, SaccoMember, WeeklyMeeting
+
+
+def _invalidate_dashboard(sacco_id):
+    from .services.analytics_service import AnalyticsService
+
+    if sacco_id:
+        transaction.on_commit(lambda: AnalyticsService.invalidate_dashboard_metrics(sacco_id))
+
+
+@receiver([post_save, post_delete], sender=SaccoMember)
+@receiver([post_save, post_delete], sender=SaccoLoan)
+@receiver([post_save, post_delete], sender=WeeklyMeeting)
+def invalidate_dashboard_for_sacco_record(sender, instance, **kwargs):
+    _invalidate_dashboard(instance.sacco_id)
+
+
+@receiver([post_save, post_delete], sender=PassbookEntry)
+def invalidate_dashboard_for_passbook_entry(sender, instance, **kwargs):
+    _invalidate_dashboard(instance.passbook.sacco_id)
+
+
+@receiver([post_save, post_delete], sender=LoanPayment)
+def invalidate_dashboard_for_loan_payment(sender, instance, **kwargs):
+    # Balances are applied with queryset updates, which send no SaccoLoan signals
+    _invalidate_dashboard(instance.loan.sacco_id)
+
+
+def _adjust_usage(sacco_id, **deltas):
+    from .services.subscription_service import SubscriptionService
+
+    SubscriptionService.adjust_usage(sacco_id, **deltas)
+
+
+@receiver(post_init, sender=SaccoMember)
+def remember_member_status(sender, instance, **kwargs):
+    # Deferred status is unknown here; reading it would cost a query per instance
+    if 'status' not in instance.__dict__:
+        instance._usage_was_active = None
+    else:
+        instance._usage_was_active = instance.pk is not None and instance.status == 'active'
+
+
+@receiver(post_save, sender=SaccoMember)
+def count_member_usage(sender, instance, **kwargs):
+    is_active = instance.status == 'active'
+    if instance._usage_was_active is not None and is_active != instance._usage_was_active:
+        _adjust_usage(instance.sacco_id, active_members=1 if is_active else -1)
+    instance._usage_was_active = is_active
+
+
+@receiver(post_delete, sender=SaccoMember)
+def uncount_member_usage(sender, instance, **kwargs):
+    if instance._usage_was_active:
+        _adjust_usage(instance.sacco_id, active_members=-1)
+
+
+@receiver(post_save, sender=SaccoLoan)
+def count_loan_usage(sender, instance, created, **kwargs):
+    if created:
+        _adjust_usage(instance.sacco_id, loans=1)
+
+
+@receiver(post_delete, sender=SaccoLoan)
+def uncount_loan_usage(sender, instance, **kwargs):
+    _adjust_usage(instance.sacco_id, loans=-1)
+
+
+@receiver(post_save, sender=WeeklyMeeting)
+def count_meeting_usage(sender, instance, created, **kwargs):
+    from .services.subscription_service import SubscriptionService
+
+    if created:
+        SubscriptionService.adjust_meeting_usage(instance.sacco_id, instance.year, 1)
+
+
+@receiver(post_delete, sender=WeeklyMeeting)
+def uncount_meeting_usage(sender, instance, **kwargs):
+    from .services.subscription_service import SubscriptionService
+
+    SubscriptionService.adjust_meeting_usage(instance.sacco_id, instance.year, -1)
+
+
+@receiver([post_save, post_delete], sender=SaccoMember)
+def invalidate_membership_context(sender, instance, **kwargs):
+    from common.request_context import invalidate_user_context
+
+    invalidate_user_context(instance.user_id, parts=('membership',))
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from saccos.models import (
+    SaccoOrganization,
+    SaccoMember,
+    SaccoLoan,
+    PassbookSection,
+)
+from saccos.services.analytics_service import AnalyticsService
+from saccos.services.passbook_service import PassbookService
+
+
+class DashboardMetricsTests(TestCase):
+    """Tests for the aggregated, cached SACCO dashboard metrics"""
+
+    def setUp(self):
+        cache.clear()
+        self.sacco = SaccoOrganization.objects.create(name="Dashboard SACCO")
+        PassbookSection.create_default_sections(self.sacco)
+        self.section = PassbookSection.objects.filter(sacco=self.sacco, section_type='savings').first()
+        self.recorder = User.objects.create_user(
+            username='dash-secretary', email='dash-secretary@example.com', password='pass123'
+        )
+        self.members = []
+        for index in range(2):
+            user = User.objects.create_user(
+                username=f'dash-member{index}', email=f'dash-member{index}@example.com', password='pass123'
+            )
+            self.members.append(SaccoMember.objects.create(
+                user=user, sacco=self.sacco, member_number=f'D00{index}'
+            ))
+        today = timezone.now().date()
+        SaccoLoan.objects.create(
+            sacco=self.sacco, member=self.members[0], loan_number='DL-1',
+            principal_amount=Decimal('100000'), interest_rate=Decimal('10'),
+            total_amount=Decimal('110000'), balance_principal=Decimal('60000'),
+            balance_interest=Decimal('5000'), application_date=today,
+            due_date=today - timedelta(days=1), status='active',
+        )
+        self._credit(self.members[0], '3000')
+        self._credit(self.members[1], '1000')
+
+    def _credit(self, member, amount):
+        PassbookService.record_entry(
+            passbook=member.get_passbook(),
+            section=self.section,
+            amount=Decimal(amount),
+            transaction_type='credit',
+            description='Savings',
+            recorded_by=self.recorder,
+        )
+
+    def test_metrics_are_aggregated(self):
+        metrics = AnalyticsService.get_dashboard_metrics(self.sacco)
+
+        self.assertEqual(metrics['members'], {'total': 2, 'new_this_month': 2})
+        self.assertEqual(metrics['savings']['total'], Decimal('4000'))
+        self.assertEqual(metrics['savings']['per_member'], Decimal('2000'))
+        self.assertEqual(metrics['loans']['active'], 1)
+        self.assertEqual(metrics['loans']['outstanding_amount'], Decimal('65000'))
+        self.assertEqual(metrics['loans']['overdue'], 1)
+
+    def test_cached_snapshot_is_reused_until_a_write(self):
+        AnalyticsService.get_cached_dashboard_metrics(self.sacco)
+        with self.assertNumQueries(0):
+            metrics = AnalyticsService.get_cached_dashboard_metrics(self.sacco)
+        self.assertEqual(metrics['savings']['total'], Decimal('4000'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._credit(self.members[1], '500')
+        metrics = AnalyticsService.get_cached_dashboard_metrics(self.sacco)
+        self.assertEqual(metrics['savings']['total'], Decimal('4500'))
+
+    def test_staleness_bound_and_force_refresh(self):
+        AnalyticsService.get_cached_dashboard_metrics(self.sacco)
+        # A write the signals do not see (no on-commit callbacks run in TestCase)
+        self._credit(self.members[0], '250')
+
+        self.assertEqual(
+            AnalyticsService.get_cached_dashboard_metrics(self.sacco)['savings']['total'], Decimal('4000')
+        )
+        self.assertEqual(
+            AnalyticsService.get_cached_dashboard_metrics(self.sacco, max_age=0)['savings']['total'],
+            Decimal('4250')
+        )
+        self._credit(self.members[0], '250')
+        self.assertEqual(
+            AnalyticsService.get_cached_dashboard_metrics(self.sacco, force_refresh=True)['savings']['total'],
+            Decimal('4500')
+        )
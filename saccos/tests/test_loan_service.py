@@ -0,0 +1,117 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+from saccos.models import (
+    SaccoOrganization,
+    SaccoMember,
+    SaccoLoan,
+    LoanPayment,
+    PassbookSection,
+    PassbookEntry,
+)
+from saccos.services.loan_service import LoanService
+
+
+class LoanRepaymentTests(TestCase):
+    """Tests for locked, delta-based loan repayments"""
+
+    def setUp(self):
+        self.sacco = SaccoOrganization.objects.create(name="Loan SACCO")
+        PassbookSection.create_default_sections(self.sacco)
+        self.recorder = User.objects.create_user(
+            username='loan-treasurer', email='loan-treasurer@example.com', password='pass123'
+        )
+        self.loans = []
+        for index in range(2):
+            user = User.objects.create_user(
+                username=f'borrower{index}', email=f'borrower{index}@example.com', password='pass123'
+            )
+            member = SaccoMember.objects.create(user=user, sacco=self.sacco, member_number=f'L00{index}')
+            self.loans.append(SaccoLoan.objects.create(
+                sacco=self.sacco, member=member, loan_number=f'LN-{index}',
+                principal_amount=Decimal('100000'), interest_rate=Decimal('10'),
+                interest_amount=Decimal('10000'), total_amount=Decimal('110000'),
+                balance_principal=Decimal('100000'), balance_interest=Decimal('10000'),
+                application_date=date(2025, 1, 1), status='disbursed',
+            ))
+
+    def test_payment_applies_interest_first_as_deltas(self):
+        loan = self.loans[0]
+        # A stale in-memory balance must not affect the split
+        loan.balance_interest = Decimal('0')
+
+        result = LoanService.record_loan_payment(
+            loan=loan, payment_amount='15000', payment_date=date(2025, 2, 1), recorded_by=self.recorder
+        )
+
+        payment = result['payment']
+        self.assertEqual((payment.interest_amount, payment.principal_amount), (Decimal('10000'), Decimal('5000')))
+        loan.refresh_from_db()
+        self.assertEqual(loan.balance_interest, Decimal('0'))
+        self.assertEqual(loan.balance_principal, Decimal('95000'))
+        self.assertEqual(loan.amount_paid_principal, Decimal('5000'))
+        self.assertEqual(result['remaining_balance'], Decimal('95000'))
+        self.assertIsNotNone(payment.passbook_entry)
+
+    def test_paying_off_marks_loan_paid(self):
+        result = LoanService.record_loan_payment(
+            loan=self.loans[0], payment_amount='110000', payment_date=date(2025, 2, 1), recorded_by=self.recorder
+        )
+        self.assertTrue(result['is_paid_off'])
+        with self.assertRaises(ValueError):
+            LoanService.record_loan_payment(
+                loan=self.loans[0], payment_amount='100', payment_date=date(2025, 2, 2), recorded_by=self.recorder
+            )
+
+    def test_bulk_import_splits_sequential_payments_per_loan(self):
+        first, second = self.loans
+        result = LoanService.record_bulk_loan_payments(
+            sacco=self.sacco,
+            payments=[
+                {'loan': first.id, 'amount': '6000'},
+                {'loan': first.id, 'amount': '6000', 'reference_number': 'R-2'},
+                {'loan': second.id, 'amount': '2500', 'payment_date': '2025-03-04'},
+            ],
+            recorded_by=self.recorder,
+            payment_date='2025-03-03',
+        )
+
+        self.assertEqual(len(result['payments']), 3)
+        splits = [(p.interest_amount, p.principal_amount) for p in result['payments']]
+        self.assertEqual(splits, [
+            (Decimal('6000'), Decimal('0')),
+            (Decimal('4000'), Decimal('2000')),
+            (Decimal('2500'), Decimal('0')),
+        ])
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.balance_interest, first.balance_principal), (Decimal('0'), Decimal('98000')))
+        self.assertEqual(second.balance_interest, Decimal('7500'))
+        self.assertEqual(LoanPayment.objects.get(reference_number='R-2').passbook_entry.amount, Decimal('2000'))
+        self.assertEqual(PassbookEntry.objects.filter(section__section_type='interest').count(), 3)
+
+    def test_bulk_import_is_all_or_nothing(self):
+        with self.assertRaises(ValueError):
+            LoanService.record_bulk_loan_payments(
+                sacco=self.sacco,
+                payments=[{'loan': self.loans[0].id, 'amount': '500'}, {'loan': 999999, 'amount': '500'}],
+                recorded_by=self.recorder,
+            )
+        self.assertFalse(LoanPayment.objects.exists())
+        self.loans[0].refresh_from_db()
+        self.assertEqual(self.loans[0].balance_interest, Decimal('10000'))
+
+    def test_bulk_endpoint_rejects_malformed_rows(self):
+        client = APIClient()
+        client.force_authenticate(self.recorder)
+        for row in (5, {'loan': self.loans[0].id, 'amount': 'NaN'}, {'loan': self.loans[0].id, 'amount': 'Infinity'}):
+            response = client.post(
+                '/api/saccos/loan-payments/bulk/', {'sacco': self.sacco.id, 'payments': [row]}, format='json'
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertTrue(response.data['error'].startswith('Row 1:'))
+        self.assertFalse(LoanPayment.objects.exists())
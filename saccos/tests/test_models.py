@@ -10,7 +10,9 @@ from saccos.models import (
     MemberPassbook,
     PassbookSection,
     PassbookEntry,
-    DeductionRule
+    DeductionRule,
+    WeeklyMeeting,
+    WeeklyContribution,
 )
 
 
@@ -312,3 +314,63 @@ class DeductionRuleTests(TestCase):
         # Should not be effective day after tomorrow
         day_after = tomorrow + timedelta(days=1)
         self.assertFalse(rule.is_effective(day_after))
+
+
+class WeeklyMeetingTotalsTests(TestCase):
+    """Tests for aggregate-based meeting totals"""
+
+    def setUp(self):
+        self.sacco = SaccoOrganization.objects.create(name="Totals SACCO")
+        self.members = []
+        for index in range(3):
+            user = User.objects.create_user(
+                username=f'totals{index}', email=f'totals{index}@example.com', password='pass123'
+            )
+            self.members.append(SaccoMember.objects.create(
+                user=user, sacco=self.sacco, member_number=f'T00{index}'
+            ))
+        self.meeting = WeeklyMeeting.objects.create(
+            sacco=self.sacco, meeting_date=timezone.now().date(), week_number=1, year=2025,
+            cash_round_recipient=self.members[0],
+        )
+
+    def test_totals_from_contributions(self):
+        WeeklyContribution.objects.create(
+            meeting=self.meeting, member=self.members[0], amount_contributed=Decimal('10000'),
+            optional_savings=Decimal('1000'), is_recipient=True, total_deductions=Decimal('7000'),
+        )
+        WeeklyContribution.objects.create(
+            meeting=self.meeting, member=self.members[1], amount_contributed=Decimal('10000'),
+            optional_savings=Decimal('500'),
+        )
+        WeeklyContribution.objects.create(
+            meeting=self.meeting, member=self.members[2], was_present=False,
+            amount_contributed=Decimal('10000'), funding_source='sacco',
+        )
+
+        self.meeting.refresh_from_db()
+        self.assertEqual((self.meeting.members_present, self.meeting.members_absent), (2, 1))
+        self.assertEqual(self.meeting.total_collected, Decimal('30000'))
+        self.assertEqual(self.meeting.total_deductions, Decimal('7000'))
+        self.assertEqual(self.meeting.amount_to_bank, Decimal('8500'))
+        self.assertEqual(self.meeting.amount_to_recipient, Decimal('23000'))
+
+    def test_unchanged_totals_skip_the_write(self):
+        WeeklyContribution.objects.create(
+            meeting=self.meeting, member=self.members[1], amount_contributed=Decimal('10000'),
+        )
+        # The aggregate and a read of the stored totals, but no UPDATE
+        with self.assertNumQueries(2):
+            self.meeting.calculate_totals()
+
+    def test_stale_instance_still_writes_changed_totals(self):
+        WeeklyContribution.objects.create(
+            meeting=self.meeting, member=self.members[1], amount_contributed=Decimal('10000'),
+        )
+        stale = WeeklyMeeting.objects.get(pk=self.meeting.pk)
+        WeeklyMeeting.objects.filter(pk=self.meeting.pk).update(total_collected=Decimal('0'))
+
+        # The stale copy already holds the right totals in memory; the stored row is what counts
+        stale.calculate_totals()
+        self.meeting.refresh_from_db()
+        self.assertEqual(self.meeting.total_collected, Decimal('10000'))
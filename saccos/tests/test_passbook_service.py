@@ -267,3 +267,121 @@ class PassbookServiceTests(TestCase):
         # Balance should be back to zero
         balance = PassbookService.get_section_balance(self.passbook, section)
         self.assertEqual(balance, Decimal('0'))
+
+
+class PassbookBalanceSnapshotTests(TestCase):
+    """Tests for point-in-time balances built from snapshots"""
+    
+    def setUp(self):
+        self.sacco = SaccoOrganization.objects.create(name="Snapshot SACCO")
+        PassbookSection.create_default_sections(self.sacco)
+        self.section = PassbookSection.objects.get(sacco=self.sacco, name='Compulsory Savings')
+        user = User.objects.create_user(
+            username='snapshot-member', email='snapshot-member@example.com', password='pass123'
+        )
+        self.member = SaccoMember.objects.create(user=user, sacco=self.sacco, member_number='S001')
+        self.passbook = PassbookService.create_passbook(self.member)
+        self.recorder = User.objects.create_user(
+            username='snapshot-secretary', email='snapshot-secretary@example.com', password='pass123'
+        )
+    
+    def _record(self, amount, when, transaction_type='credit'):
+        return PassbookService.record_entry(
+            passbook=self.passbook,
+            section=self.section,
+            amount=Decimal(amount),
+            transaction_type=transaction_type,
+            description='Entry',
+            recorded_by=self.recorder,
+            transaction_date=when
+        )
+    
+    def test_balance_as_of_combines_snapshot_and_later_entries(self):
+        from datetime import date
+        from saccos.models import PassbookBalanceSnapshot
+        
+        self._record('1000', date(2025, 1, 10))
+        self._record('500', date(2025, 1, 20))
+        self._record('200', date(2025, 2, 5), transaction_type='debit')
+        self._record('700', date(2025, 3, 1))
+        
+        self.assertEqual(PassbookService.create_balance_snapshots(date(2025, 1, 31), sacco=self.sacco), 1)
+        snapshot = PassbookBalanceSnapshot.objects.get(passbook=self.passbook, section=self.section)
+        self.assertEqual(snapshot.balance, Decimal('1500'))
+        
+        # Later lookups use the snapshot instead of the January entries
+        self.assertEqual(
+            PassbookService.get_section_balance_as_of(self.passbook, self.section, date(2025, 2, 28)),
+            Decimal('1300')
+        )
+        self.assertEqual(
+            PassbookService.get_section_balance_as_of(self.passbook, self.section, date(2025, 1, 15)),
+            Decimal('1000')
+        )
+        
+        statement = PassbookService.generate_statement(
+            self.passbook, date(2025, 2, 1), date(2025, 2, 28), section=self.section
+        )
+        section_data = statement['sections'][0]
+        self.assertEqual(section_data['opening_balance'], Decimal('1500'))
+        self.assertEqual(section_data['debits'], Decimal('200'))
+        self.assertEqual(section_data['closing_balance'], Decimal('1300'))
+    
+    def test_backdated_entry_invalidates_later_snapshots(self):
+        from datetime import date
+        from saccos.models import PassbookBalanceSnapshot
+        
+        self._record('1000', date(2025, 1, 10))
+        PassbookService.create_balance_snapshots(date(2025, 1, 31), sacco=self.sacco)
+        PassbookService.create_balance_snapshots(date(2025, 2, 28), sacco=self.sacco)
+        
+        self._record('300', date(2025, 2, 15))
+        self.assertEqual(
+            list(PassbookBalanceSnapshot.objects.values_list('as_of_date', flat=True)),
+            [date(2025, 1, 31)]
+        )
+        self.assertEqual(
+            PassbookService.get_section_balance_as_of(self.passbook, self.section, date(2025, 3, 31)),
+            Decimal('1300')
+        )
+    
+    def test_edited_entry_invalidates_snapshots_for_old_and_new_position(self):
+        from datetime import date
+        from saccos.models import PassbookBalanceSnapshot
+        
+        welfare = PassbookSection.objects.get(sacco=self.sacco, name='Welfare')
+        self._record('1000', date(2025, 1, 10))
+        entry = self._record('400', date(2025, 2, 10))
+        PassbookService.create_balance_snapshots(date(2025, 1, 31), sacco=self.sacco)
+        PassbookService.create_balance_snapshots(date(2025, 2, 28), sacco=self.sacco)
+        
+        # Correcting the amount makes the February snapshot stale
+        entry.amount = Decimal('600')
+        entry.save()
+        self.assertFalse(
+            PassbookBalanceSnapshot.objects.filter(section=self.section, as_of_date=date(2025, 2, 28)).exists()
+        )
+        self.assertEqual(
+            PassbookService.get_section_balance_as_of(self.passbook, self.section, date(2025, 3, 31)),
+            Decimal('1600')
+        )
+        
+        # Moving it back to January and into another section rebuilds both sides
+        PassbookService.create_balance_snapshots(date(2025, 2, 28), sacco=self.sacco)
+        entry.section = welfare
+        entry.transaction_date = date(2025, 1, 20)
+        entry.save()
+        self.assertEqual(
+            list(PassbookBalanceSnapshot.objects.filter(section=self.section).values_list('as_of_date', flat=True)),
+            [date(2025, 1, 31)]
+        )
+        self.assertEqual(
+            PassbookService.get_section_balance_as_of(self.passbook, self.section, date(2025, 3, 31)),
+            Decimal('1000')
+        )
+        self.assertEqual(
+            PassbookService.get_section_balance_as_of(self.passbook, welfare, date(2025, 1, 31)),
+            Decimal('600')
+        )
+        entry.refresh_from_db()
+        self.assertEqual(entry.balance_after, Decimal('600'))
@@ -0,0 +1,121 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from users.models import User
+from saccos.models import (
+    SaccoOrganization,
+    SaccoMember,
+    SaccoLoan,
+    PassbookSection,
+    WeeklyMeeting,
+    WeeklyContribution,
+)
+from saccos.services.passbook_service import PassbookService
+from saccos.services.reporting_service import ReportingService
+
+
+class ReportingServiceTests(TestCase):
+    """Tests for the set-based member reports"""
+
+    def setUp(self):
+        self.sacco = SaccoOrganization.objects.create(name="Reporting SACCO")
+        PassbookSection.create_default_sections(self.sacco)
+        self.savings = PassbookSection.objects.filter(sacco=self.sacco, section_type='savings')
+        self.recorder = User.objects.create_user(
+            username='report-secretary', email='report-secretary@example.com', password='pass123'
+        )
+
+        self.members = []
+        for index in range(3):
+            user = User.objects.create_user(
+                username=f'report-member{index}',
+                email=f'report-member{index}@example.com',
+                password='pass123',
+                first_name=f'Member{index}',
+            )
+            self.members.append(SaccoMember.objects.create(
+                user=user, sacco=self.sacco, member_number=f'R00{index}'
+            ))
+
+        self.meetings = [
+            WeeklyMeeting.objects.create(
+                sacco=self.sacco, meeting_date=date(2025, 3, day), week_number=week, year=2025
+            )
+            for week, day in enumerate([3, 10, 17], start=1)
+        ]
+
+    def _credit(self, member, section, amount, when):
+        PassbookService.record_entry(
+            passbook=member.get_passbook(),
+            section=section,
+            amount=Decimal(amount),
+            transaction_type='credit',
+            description='Savings',
+            recorded_by=self.recorder,
+            transaction_date=when,
+        )
+
+    def test_attendance_report_groups_by_member(self):
+        first, second, _ = self.members
+        for meeting in self.meetings:
+            WeeklyContribution.objects.create(meeting=meeting, member=first, amount_contributed=Decimal('5000'))
+        WeeklyContribution.objects.create(meeting=self.meetings[0], member=second, amount_contributed=Decimal('5000'))
+        WeeklyContribution.objects.create(meeting=self.meetings[1], member=second, was_present=False)
+
+        with self.assertNumQueries(2):
+            report = ReportingService.generate_attendance_report(
+                self.sacco, date(2025, 3, 1), date(2025, 3, 31)
+            )
+
+        self.assertEqual(report['summary'], {
+            'total_meetings': 3, 'total_members': 3, 'average_attendance_rate': 44.44,
+        })
+        rows = {row['member_number']: row for row in report['members']}
+        self.assertEqual([row['member_number'] for row in report['members']], ['R000', 'R001', 'R002'])
+        self.assertEqual(rows['R000']['total_contributed'], Decimal('15000'))
+        self.assertEqual((rows['R001']['attended'], rows['R001']['missed']), (1, 1))
+        self.assertEqual(rows['R001']['attendance_rate'], 33.33)
+        self.assertEqual(rows['R002']['total_contributed'], Decimal('0'))
+
+    def test_savings_report_uses_latest_balance_per_section(self):
+        first, second, _ = self.members
+        section = self.savings.first()
+        self._credit(first, section, '1000', date(2025, 3, 1))
+        self._credit(first, section, '500', date(2025, 3, 2))
+        self._credit(first, section, '700', date(2025, 4, 1))
+        self._credit(second, section, '300', date(2025, 3, 1))
+
+        report = ReportingService.generate_savings_report(
+            self.sacco, date(2025, 1, 1), date(2025, 3, 31)
+        )
+
+        self.assertEqual(
+            [(row['member_number'], row['total_savings']) for row in report['members']],
+            [('R000', Decimal('1500')), ('R001', Decimal('300')), ('R002', Decimal('0'))]
+        )
+        self.assertEqual(report['summary']['total_savings'], Decimal('1800'))
+
+    def test_member_ranking_report(self):
+        first, second, third = self.members
+        section = self.savings.first()
+        self._credit(second, section, '2500', date(2025, 3, 1))
+        self._credit(first, section, '1000', date(2025, 3, 1))
+        SaccoLoan.objects.create(
+            sacco=self.sacco, member=third, loan_number='RL-1', principal_amount=Decimal('100000'),
+            interest_rate=Decimal('10'), total_amount=Decimal('110000'),
+            application_date=date(2025, 3, 1), status='active',
+        )
+        WeeklyContribution.objects.create(meeting=self.meetings[0], member=third)
+        WeeklyContribution.objects.create(meeting=self.meetings[1], member=third, was_present=False)
+
+        report = ReportingService.generate_member_ranking_report(self.sacco)
+
+        self.assertEqual(
+            [(row['member_number'], row['total_savings']) for row in report['top_savers']],
+            [('R001', 2500.0), ('R000', 1000.0), ('R002', 0.0)]
+        )
+        self.assertEqual(report['most_loans'][0]['member_number'], 'R002')
+        self.assertEqual((report['most_loans'][0]['loans_taken'], report['most_loans'][0]['active_loans']), (1, 1))
+        self.assertEqual(report['best_attendance'][0]['attendance_rate'], 50.0)
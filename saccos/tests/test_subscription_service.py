@@ -0,0 +1,106 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from saccos.models import (
+    SaccoOrganization,
+    SaccoMember,
+    SaccoLoan,
+    SaccoUsageCounter,
+    SubscriptionPlan,
+    UsageMetrics,
+    WeeklyMeeting,
+)
+from saccos.services.subscription_service import SubscriptionService
+
+
+class UsageCounterTests(TestCase):
+    """Tests for maintained usage counters and bulk usage snapshots"""
+
+    def setUp(self):
+        self.sacco = SaccoOrganization.objects.create(name="Usage SACCO", registration_number="USG-001")
+        self.plan = SubscriptionPlan.objects.create(
+            name='Basic', description='Basic plan', monthly_price=Decimal('50000'),
+            yearly_price=Decimal('500000'), max_members=3, max_storage_mb=1,
+        )
+        SubscriptionService.create_trial_subscription(self.sacco, self.plan)
+        self.year = timezone.now().year
+        self.members = [self._member(index) for index in range(2)]
+
+    def _member(self, index, sacco=None):
+        user = User.objects.create_user(
+            username=f'usage{index}', email=f'usage{index}@example.com', password='pass123'
+        )
+        return SaccoMember.objects.create(user=user, sacco=sacco or self.sacco, member_number=f'U00{index}')
+
+    def test_counters_follow_writes(self):
+        # The first read builds the counter from a recount
+        counter = SubscriptionService.get_usage_counter(self.sacco)
+        self.assertEqual(counter.active_members, 2)
+
+        self._member(2)
+        self.members[0].status = 'suspended'
+        self.members[0].save()
+        WeeklyMeeting.objects.create(
+            sacco=self.sacco, meeting_date=date(self.year, 1, 6), week_number=2, year=self.year
+        )
+        old_meeting = WeeklyMeeting.objects.create(
+            sacco=self.sacco, meeting_date=date(self.year - 1, 1, 6), week_number=2, year=self.year - 1
+        )
+        old_meeting.delete()
+        SaccoLoan.objects.create(
+            sacco=self.sacco, member=self.members[1], loan_number='USG-1',
+            principal_amount=Decimal('1000'), interest_rate=Decimal('10'), interest_amount=Decimal('100'),
+            total_amount=Decimal('1100'), balance_principal=Decimal('1000'), balance_interest=Decimal('100'),
+            application_date=date(self.year, 1, 6),
+        )
+        SubscriptionService.record_storage_usage(self.sacco, 512 * 1024)
+
+        counter.refresh_from_db()
+        self.assertEqual(
+            (counter.active_members, counter.meetings_in_year(self.year), counter.loans_count, counter.storage_bytes),
+            (2, 1, 1, 512 * 1024),
+        )
+
+        SubscriptionService.recount_usage_counters([self.sacco])
+        counter.refresh_from_db()
+        self.assertEqual((counter.active_members, counter.meetings_count, counter.loans_count), (2, 1, 1))
+        self.assertEqual(counter.storage_bytes, 512 * 1024)
+
+    def test_limit_checks_read_the_counter(self):
+        self.sacco.refresh_from_db()
+        SubscriptionService.get_usage_counter(self.sacco)
+
+        # Subscription, plan and counter, whatever the number of rows
+        with self.assertNumQueries(3):
+            limits = SubscriptionService.check_usage_limits(self.sacco)
+        self.assertEqual(limits['limits']['members']['used'], 2)
+        self.assertTrue(limits['within_limits'])
+
+        self.assertTrue(SubscriptionService.is_within_limit(self.sacco, 'members'))
+        self.assertFalse(SubscriptionService.is_within_limit(self.sacco, 'members', adding=2))
+        self.assertFalse(SubscriptionService.is_within_limit(self.sacco, 'storage', adding=2 * 1024 * 1024))
+
+    def test_bulk_snapshot_covers_every_sacco(self):
+        other = SaccoOrganization.objects.create(name="Other Usage SACCO", registration_number="USG-002")
+        self._member(5, sacco=other)
+        WeeklyMeeting.objects.create(
+            sacco=self.sacco, meeting_date=date(2025, 3, 3), week_number=10, year=2025,
+            status='completed', total_collected=Decimal('40000'),
+        )
+
+        snapshots = SubscriptionService.record_usage_metrics_bulk(date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual(len(snapshots), 2)
+
+        metrics = UsageMetrics.objects.get(sacco=self.sacco, period_start=date(2025, 3, 1))
+        self.assertEqual((metrics.active_members_count, metrics.meetings_held), (2, 1))
+        self.assertEqual(metrics.total_contributions, Decimal('40000'))
+        self.assertEqual(UsageMetrics.objects.get(sacco=other).active_members_count, 1)
+        self.assertEqual(SaccoUsageCounter.objects.count(), 2)
+
+        # Re-running for the same period updates rather than duplicating
+        SubscriptionService.record_usage_metrics(self.sacco, date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual(UsageMetrics.objects.count(), 2)
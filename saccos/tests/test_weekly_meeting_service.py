@@ -0,0 +1,149 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+from saccos.models import (
+    SaccoOrganization,
+    SaccoMember,
+    CashRound,
+    CashRoundMember,
+    MemberPassbook,
+    PassbookEntry,
+    PassbookSection,
+    WeeklyMeeting,
+    WeeklyContribution,
+)
+from saccos.services.passbook_service import PassbookService
+from saccos.services.weekly_meeting_service import WeeklyMeetingService
+
+
+class BulkContributionTests(TestCase):
+    """Tests for upserting a whole meeting contribution sheet"""
+
+    def setUp(self):
+        self.sacco = SaccoOrganization.objects.create(name="Sheet SACCO")
+        self.members = []
+        for index in range(4):
+            user = User.objects.create_user(
+                username=f'sheet{index}', email=f'sheet{index}@example.com', password='pass123'
+            )
+            self.members.append(SaccoMember.objects.create(
+                user=user, sacco=self.sacco, member_number=f'S00{index}'
+            ))
+        self.cash_round = CashRound.objects.create(
+            sacco=self.sacco, name='Round 1', round_number=1, start_date=date(2025, 3, 3),
+            expected_end_date=date(2025, 6, 2), weekly_amount=Decimal('10000'), num_weeks=3,
+        )
+        # The last member is in the SACCO but not in this cash round
+        for position, member in enumerate(self.members[:3], start=1):
+            CashRoundMember.objects.create(
+                cash_round=self.cash_round, member=member, position_in_rotation=position
+            )
+        self.meeting = WeeklyMeeting.objects.create(
+            sacco=self.sacco, cash_round=self.cash_round, meeting_date=date(2025, 3, 3),
+            week_number=1, year=2025, cash_round_recipient=self.members[0],
+        )
+
+    def test_sheet_upserts_and_recalculates_once(self):
+        WeeklyContribution.objects.create(
+            meeting=self.meeting, member=self.members[1], amount_contributed=Decimal('5000'),
+        )
+
+        result = WeeklyMeetingService.record_contributions_bulk(self.meeting, [
+            {'member': self.members[0].id, 'amount_contributed': '10000',
+             'compulsory_savings_deduction': '2000', 'welfare_deduction': '1000'},
+            {'member': self.members[1].id, 'amount_contributed': '10000', 'optional_savings': '500'},
+            {'member': self.members[2].id, 'was_present': False, 'amount_contributed': '0'},
+        ])
+
+        self.assertEqual((len(result['created']), len(result['updated'])), (2, 1))
+        recipient = WeeklyContribution.objects.get(meeting=self.meeting, member=self.members[0])
+        self.assertTrue(recipient.is_recipient)
+        self.assertEqual(recipient.total_deductions, Decimal('3000'))
+
+        self.meeting.refresh_from_db()
+        self.assertEqual((self.meeting.members_present, self.meeting.members_absent), (2, 1))
+        self.assertEqual(self.meeting.total_collected, Decimal('20000'))
+        self.assertEqual(self.meeting.amount_to_bank, Decimal('3500'))
+        self.assertEqual(self.meeting.amount_to_recipient, Decimal('17000'))
+
+    def test_member_outside_cash_round_rejects_whole_sheet(self):
+        with self.assertRaisesMessage(ValueError, "Row 2: member"):
+            WeeklyMeetingService.record_contributions_bulk(self.meeting, [
+                {'member': self.members[1].id, 'amount_contributed': '10000'},
+                {'member': self.members[3].id, 'amount_contributed': '10000'},
+            ])
+        self.assertFalse(WeeklyContribution.objects.filter(meeting=self.meeting).exists())
+
+    def test_non_finite_amount_rejects_whole_sheet(self):
+        with self.assertRaisesMessage(ValueError, "Row 1: invalid amount_contributed"):
+            WeeklyMeetingService.record_contributions_bulk(self.meeting, [
+                {'member': self.members[1].id, 'amount_contributed': 'NaN'},
+            ])
+
+    def test_non_object_row_rejects_whole_sheet(self):
+        with self.assertRaisesMessage(ValueError, "Row 2: must be an object"):
+            WeeklyMeetingService.record_contributions_bulk(self.meeting, [
+                {'member': self.members[1].id, 'amount_contributed': '10000'},
+                self.members[2].id,
+            ])
+        self.assertFalse(WeeklyContribution.objects.filter(meeting=self.meeting).exists())
+
+    def test_bulk_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(
+            username='sheet-secretary', email='sheet-secretary@example.com', password='pass123'
+        ))
+        response = client.post(
+            f'/api/saccos/meetings/{self.meeting.id}/bulk_contributions/?sacco={self.sacco.id}',
+            {'contributions': [{'member': member.id, 'amount_contributed': '10000'} for member in self.members[:3]]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(len(response.data['meeting']['contributions']), 3)
+
+
+class ResetFinalizedMeetingTests(TestCase):
+    """Tests for undoing a finalized meeting"""
+
+    def setUp(self):
+        self.sacco = SaccoOrganization.objects.create(name="Reset SACCO")
+        self.user = User.objects.create_user(username='resetter', email='resetter@example.com', password='pass123')
+        member = SaccoMember.objects.create(user=self.user, sacco=self.sacco, member_number='R001')
+        self.passbook = MemberPassbook.objects.create(member=member, sacco=self.sacco, passbook_number='RST-R001')
+        self.section = PassbookSection.objects.create(
+            sacco=self.sacco, name='Savings', section_type='savings', weekly_amount=Decimal('5000'),
+        )
+        self.meeting = WeeklyMeeting.objects.create(
+            sacco=self.sacco, meeting_date=date(2025, 3, 3), week_number=1, year=2025,
+        )
+
+    def _entry(self, transaction_date, amount, meeting=None):
+        return PassbookEntry.objects.create(
+            passbook=self.passbook, section=self.section, transaction_date=transaction_date,
+            transaction_type='credit', amount=amount, description='Savings', recorded_by=self.user,
+            meeting=meeting,
+        )
+
+    def test_reset_drops_snapshots_that_counted_the_meeting(self):
+        self._entry(date(2025, 2, 10), Decimal('10000'))
+        self._entry(date(2025, 3, 3), Decimal('5000'), meeting=self.meeting)
+        self.meeting.status = 'completed'
+        self.meeting.save(update_fields=['status'])
+        PassbookService.create_balance_snapshots(date(2025, 2, 28), sacco=self.sacco)
+        PassbookService.create_balance_snapshots(date(2025, 3, 31), sacco=self.sacco)
+
+        WeeklyMeetingService.reset_finalized_meeting(self.meeting, self.user)
+
+        self.assertEqual(
+            PassbookService.get_section_balance_as_of(self.passbook, self.section, date(2025, 3, 31)),
+            Decimal('10000'),
+        )
+        # Snapshots before the meeting are still valid
+        self.assertEqual(
+            list(self.passbook.balance_snapshots.values_list('as_of_date', flat=True)), [date(2025, 2, 28)]
+        )
@@ -0,0 +1,71 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from users.models import User
+from saccos.models import SaccoOrganization, SaccoMember, PassbookSection
+from saccos.services.passbook_service import PassbookService
+from saccos.services.withdrawal_service import WithdrawalService
+
+
+class WithdrawalAvailabilityTests(TestCase):
+    """Tests for single-query withdrawal availability and locked allocation"""
+
+    def setUp(self):
+        self.sacco = SaccoOrganization.objects.create(name="Withdrawal SACCO")
+        PassbookSection.create_default_sections(self.sacco)
+        self.recorder = User.objects.create_user(
+            username='wd-treasurer', email='wd-treasurer@example.com', password='pass123'
+        )
+        user = User.objects.create_user(username='saver', email='saver@example.com', password='pass123')
+        self.member = SaccoMember.objects.create(user=user, sacco=self.sacco, member_number='W001')
+        self.passbook = self.member.get_passbook()
+        self.sections = list(WithdrawalService.get_withdrawable_sections(self.sacco))
+        first, second = self.sections[:2]
+        for section, amount, kind in [
+            (first, '30000', 'credit'), (first, '5000', 'debit'), (second, '10000', 'credit'),
+        ]:
+            PassbookService.record_entry(
+                passbook=self.passbook, section=section, amount=Decimal(amount), transaction_type=kind,
+                description='Seed', recorded_by=self.recorder, transaction_date=date(2025, 1, 6),
+            )
+
+    def test_summary_matches_per_section_balances_in_one_query(self):
+        WithdrawalService.create_withdrawal_request(
+            sacco=self.sacco, member=self.member, amount='20000', requested_by=self.recorder,
+        )
+
+        with self.assertNumQueries(1):
+            rows = WithdrawalService.get_section_availability(self.sacco, self.member, passbook=self.passbook)
+
+        for row in rows:
+            self.assertEqual(row['balance'], PassbookService.get_section_balance(self.passbook, row['section']))
+        first, second = rows[:2]
+        self.assertEqual((first['reserved'], first['available']), (Decimal('20000'), Decimal('5000')))
+        self.assertEqual((second['reserved'], second['available']), (Decimal('0'), Decimal('10000')))
+
+        summary = WithdrawalService.get_available_summary(self.sacco, self.member)
+        self.assertEqual(summary['total_balance'], '35000.00')
+        self.assertEqual(summary['total_reserved'], '20000.00')
+        self.assertEqual(summary['total_available'], '15000.00')
+
+    def test_auto_allocation_spills_over_and_respects_reservations(self):
+        withdrawal = WithdrawalService.create_withdrawal_request(
+            sacco=self.sacco, member=self.member, amount='28000', requested_by=self.recorder,
+        )
+        allocated = {a.section_id: a.amount for a in withdrawal.allocations.all()}
+        self.assertEqual(allocated, {self.sections[0].id: Decimal('25000'), self.sections[1].id: Decimal('3000')})
+
+        # Only 7000 remains once the first request holds its reservation
+        with self.assertRaises(ValueError):
+            WithdrawalService.create_withdrawal_request(
+                sacco=self.sacco, member=self.member, amount='8000', requested_by=self.recorder,
+            )
+
+    def test_manual_allocation_cannot_exceed_section_availability(self):
+        with self.assertRaisesMessage(ValueError, 'exceeds its available balance'):
+            WithdrawalService.create_withdrawal_request(
+                sacco=self.sacco, member=self.member, amount='12000', requested_by=self.recorder,
+                allocations=[{'section': self.sections[1].id, 'amount': '12000'}],
+            )
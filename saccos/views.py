@@ -5,6 +5,8 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from core.api import AppContextLoggingPermission
+from common.fieldsets import SparseFieldsetMixin
+from common.query_stats import query_budget
 from .models import (
     SaccoOrganization, SaccoMember, MemberPassbook,
     PassbookSection, PassbookEntry, DeductionRule,
@@ -29,7 +31,7 @@ from .services.passbook_service import PassbookService
 from .services.cash_round_service import CashRoundService
 
 
-class SaccoScopedMixin:
+class SaccoScopedMixin(SparseFieldsetMixin):
     context = "sacco"
     permission_classes = [IsAuthenticated, AppContextLoggingPermission]
 
@@ -338,6 +340,7 @@ class MemberPassbookViewSet(SaccoScopedMixin, viewsets.ReadOnlyModelViewSet):
         return MemberPassbook.objects.none()
     
     @action(detail=True, methods=['get'])
+    @query_budget(15)
     def balances(self, request, pk=None):
         """Get all section balances for a passbook"""
         passbook = self.get_object()
@@ -1144,6 +1147,36 @@ class WeeklyMeetingViewSet(SaccoScopedMixin, viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED
         )
     
+    @action(detail=True, methods=['post'])
+    def bulk_contributions(self, request, pk=None):
+        """
+        Upsert the full attendance/contribution sheet for the meeting
+        
+        Body: {'contributions': [{'member': id, 'was_present': bool,
+               'amount_contributed': ..., 'optional_savings': ..., 'notes': ...}, ...]}
+        """
+        from saccos.services.weekly_meeting_service import WeeklyMeetingService
+        
+        meeting = self.get_object()
+        contributions = request.data.get('contributions')
+        if not isinstance(contributions, list) or not contributions:
+            return Response({'error': 'contributions must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            result = WeeklyMeetingService.record_contributions_bulk(
+                meeting=meeting,
+                contributions=contributions
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = self.get_serializer(meeting)
+        return Response({
+            'meeting': serializer.data,
+            'created': len(result['created']),
+            'updated': len(result['updated']),
+        })
+    
     @action(detail=True, methods=['get'])
     def summary(self, request, pk=None):
         """Get meeting summary"""
@@ -1438,6 +1471,37 @@ class LoanPaymentViewSet(viewsets.ModelViewSet):
             raise ValidationError({'error': str(e)})
         
         serializer.instance = result['payment']
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Record many repayments at once (e.g. meeting-day collections)
+        
+        Body: {'sacco': id, 'payment_date': 'YYYY-MM-DD' (optional),
+               'payments': [{'loan': id, 'amount': ..., 'reference_number': ...}, ...]}
+        """
+        from saccos.services.loan_service import LoanService
+        
+        sacco = get_object_or_404(SaccoOrganization, id=request.data.get('sacco'))
+        payments = request.data.get('payments')
+        if not isinstance(payments, list) or not payments:
+            return Response({'error': 'payments must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            result = LoanService.record_bulk_loan_payments(
+                sacco=sacco,
+                payments=payments,
+                recorded_by=request.user,
+                payment_date=request.data.get('payment_date')
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'count': len(result['payments']),
+            'payments': self.get_serializer(result['payments'], many=True).data,
+            'loans': SaccoLoanSerializer(result['loans'], many=True).data,
+        }, status=status.HTTP_201_CREATED)
 
 
 class LoanGuarantorViewSet(viewsets.ModelViewSet):
@@ -7,6 +7,7 @@ from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
 
+from common.query_stats import query_budget
 from .models import SaccoOrganization, SaccoMember
 from .services.reporting_service import ReportingService
 from .services.analytics_service import AnalyticsService
@@ -210,15 +211,20 @@ def get_member_ranking_report(request, sacco_id):
     return Response(report)
 
 
+@query_budget(16)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_dashboard_metrics(request, sacco_id):
     """
     Get dashboard metrics for SACCO
+    
+    Query params:
+        - refresh: 'true' to recompute instead of using the cached snapshot
     """
     sacco = get_object_or_404(SaccoOrganization, id=sacco_id)
     
-    metrics = AnalyticsService.get_dashboard_metrics(sacco=sacco)
+    force_refresh = request.query_params.get('refresh', 'false').lower() == 'true'
+    metrics = AnalyticsService.get_cached_dashboard_metrics(sacco=sacco, force_refresh=force_refresh)
     
     # Get account balance from SACCO account
     account_balance = Decimal('0')
@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
 
 from core.api import AppContextLoggingPermission
+from common.fieldsets import SparseFieldsetMixin
 from .models import (
     SaccoOrganization, SubscriptionPlan, SaccoSubscription,
     SubscriptionInvoice, UsageMetrics
@@ -16,7 +17,7 @@ from .serializers import (
 from .services.subscription_service import SubscriptionService
 
 
-class SaccoScopedMixin:
+class SaccoScopedMixin(SparseFieldsetMixin):
     context = "sacco"
     permission_classes = [IsAuthenticated, AppContextLoggingPermission]
 
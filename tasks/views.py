@@ -9,6 +9,8 @@ from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 from core.api import AppContextLoggingPermission
+from common.fieldsets import SparseFieldsetMixin
+from common.pagination import EstimatedCountPagination
 
 from accounts.models import Department
 from users.models import User
@@ -26,10 +28,12 @@ class StudioScopedMixin:
     context = "studio"
 
 
-class TaskListCreateView(StudioScopedMixin, generics.ListCreateAPIView):
+class TaskListCreateView(StudioScopedMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated, AppContextLoggingPermission]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = TaskFilter
+    # The distinct() access query makes exact counts expensive on large task sets
+    pagination_class = EstimatedCountPagination
     # Allow client ordering with a stable default
     ordering_fields = [
         'id', 'title', 'created_at', 'updated_at', 'due_date',
@@ -37,6 +41,23 @@ class TaskListCreateView(StudioScopedMixin, generics.ListCreateAPIView):
     ]
     # Keep default close to model Meta.ordering while adding tie-breakers
     ordering = ['is_completed', 'kanban_position', 'position', 'due_date', '-updated_at', '-id']
+    # Model attributes behind TaskSerializer's computed fields, used to trim ?fields= queries
+    sparse_field_sources = {
+        'is_overdue': ('due_date', 'is_completed'),
+        'projectId': ('project',),
+        'assignedUsers': ('assigned_users', 'assigned_to'),
+        'assignedTeams': ('assigned_teams', 'assigned_team'),
+        'dueDate': ('due_date',),
+        'estimatedHours': ('estimated_hours',),
+        'actualHours': ('actual_hours',),
+        'createdAt': ('created_at',),
+        'updatedAt': ('updated_at',),
+        'tags': ('tags',),
+        'assigned_users_names': ('assigned_users',),
+        'assigned_teams_names': ('assigned_teams',),
+        'dependencies_titles': ('dependencies',),
+        'domain': ('project', 'source_backlog_item'),
+    }
 
     def get_serializer_class(self):
         return TaskCreateSerializer if self.request.method == 'POST' else TaskSerializer
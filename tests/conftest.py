@@ -13,6 +13,12 @@ def enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Fail the test when a request exceeds its view's query budget."""
+    settings.QUERY_BUDGET_STRICT = True
+
+
 @pytest.fixture(autouse=True)
 def clear_content_type_cache():
     """
@@ -0,0 +1,93 @@
+# tests/test_business_finance_reports.py
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from businesses.services.business_service import BusinessService
+from businesses.services.finance_integration_service import BusinessFinanceService
+from finance.models import AccountDailyTotal, Transaction
+from saccos.models import SaccoOrganization
+
+
+@pytest.fixture
+def business():
+    sacco = SaccoOrganization.objects.create(name='Reports SACCO', registration_number='RPT-001')
+    enterprise = BusinessService.create_business(sacco, 'Reports Shop', 'retail')
+    accounts = BusinessService.get_business_accounts(enterprise)
+
+    def post(account, tx_type, amount, when):
+        return Transaction.objects.create(
+            type=tx_type, amount=Decimal(amount), account=accounts[account],
+            category='sales', date=when,
+        )
+
+    post('cash', 'income', '1000', date(2024, 12, 30))
+    post('cash', 'expense', '300', date(2024, 12, 31))
+    post('revenue', 'income', '5000', date(2025, 1, 10))
+    post('cogs', 'expense', '2000', date(2025, 1, 10))
+    post('expenses', 'expense', '500', date(2025, 1, 20))
+    post('cash', 'income', '5000', date(2025, 1, 10))
+    post('cash', 'expense', '800', date(2025, 2, 5))
+    post('revenue', 'income', '1000', date(2025, 2, 5))
+    return enterprise, accounts, post
+
+
+@pytest.mark.django_db
+def test_reports_match_ledger_and_use_the_rollup(business):
+    enterprise, accounts, _ = business
+
+    pl = BusinessFinanceService.get_profit_and_loss(enterprise, date(2025, 1, 1), date(2025, 1, 31))
+    assert (pl['revenue'], pl['cogs'], pl['expenses']) == (Decimal('5000'), Decimal('2000'), Decimal('500'))
+    assert pl['net_profit'] == Decimal('2500')
+    assert pl['profit_margin'] == Decimal('50')
+
+    with CaptureQueriesContext(connection) as queries:
+        cf = BusinessFinanceService.get_cash_flow(enterprise, date(2025, 1, 1), date(2025, 2, 28))
+    # Accounts, the period aggregate and the rollup opening balance
+    assert len(queries) == 3
+    assert cf['opening_balance'] == Decimal('700')
+    assert (cf['cash_in'], cf['cash_out']) == (Decimal('5000'), Decimal('800'))
+    assert cf['closing_balance'] == Decimal('4900')
+
+
+@pytest.mark.django_db
+def test_rollup_follows_edits_and_deletes(business):
+    _, accounts, post = business
+    tx = post('cash', 'income', '250', date(2025, 3, 1))
+    assert AccountDailyTotal.balance_before(accounts['cash'], date(2025, 3, 2)) == Decimal('5150')
+
+    tx.date = date(2025, 3, 5)
+    tx.amount = Decimal('400')
+    tx.save()
+    assert not AccountDailyTotal.objects.filter(account=accounts['cash'], date=date(2025, 3, 1)).exists()
+    assert AccountDailyTotal.objects.get(account=accounts['cash'], date=date(2025, 3, 5)).income == Decimal('400')
+
+    tx.delete()
+    assert not AccountDailyTotal.objects.filter(account=accounts['cash'], date=date(2025, 3, 5)).exists()
+
+    before = list(AccountDailyTotal.objects.values_list('account_id', 'date', 'income', 'expense'))
+    AccountDailyTotal.rebuild()
+    assert list(AccountDailyTotal.objects.values_list('account_id', 'date', 'income', 'expense')) == before
+
+
+@pytest.mark.django_db
+def test_monthly_comparison_matches_per_month_reports(business):
+    enterprise, _, _ = business
+
+    with CaptureQueriesContext(connection) as queries:
+        comparison = BusinessFinanceService.get_monthly_comparison(enterprise, 2025)
+    assert len(queries) == 3
+    assert len(comparison['months']) == 12
+
+    for month in comparison['months'][:3]:
+        pl = month['profit_and_loss']
+        assert pl == BusinessFinanceService.get_profit_and_loss(enterprise, pl['start_date'], pl['end_date'])
+        cf = month['cash_flow']
+        assert cf == BusinessFinanceService.get_cash_flow(enterprise, cf['start_date'], cf['end_date'])
+
+    totals = comparison['totals']
+    assert totals['profit_and_loss']['revenue'] == Decimal('6000')
+    assert totals['cash_flow']['closing_balance'] == comparison['months'][-1]['cash_flow']['closing_balance']
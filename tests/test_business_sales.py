@@ -0,0 +1,306 @@
+# tests/test_business_sales.py
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from businesses.models import StockItem, StockMovement
+from businesses.services.business_service import BusinessService
+from businesses.services.sales_service import SalesService
+from businesses.services.stock_service import StockService
+from saccos.models import SaccoOrganization
+from users.models import User
+
+
+@pytest.fixture
+def shop():
+    sacco = SaccoOrganization.objects.create(name='Sales SACCO', registration_number='SAL-001')
+    enterprise = BusinessService.create_business(sacco, 'Corner Shop', 'retail')
+    config = enterprise.configuration
+    config.stock_management_enabled = True
+    config.sales_management_enabled = True
+    config.auto_create_finance_entries = False
+    config.save()
+    user = User.objects.create_user(username='cashier', email='cashier@example.com', password='pass123')
+    soda = StockItem.objects.create(
+        enterprise=enterprise, name='Soda', cost_price=Decimal('800'), selling_price=Decimal('1000'),
+    )
+    bread = StockItem.objects.create(
+        enterprise=enterprise, name='Bread', cost_price=Decimal('3000'), selling_price=Decimal('4000'),
+    )
+    StockService.record_opening_stock(soda, 5, user)
+    StockService.record_opening_stock(bread, 2, user)
+    return enterprise, user, soda, bread
+
+
+@pytest.mark.django_db
+def test_create_sale_query_count_does_not_grow_per_line(shop):
+    enterprise, user, soda, bread = shop
+    enterprise.configuration.tax_rate = Decimal('10')
+    enterprise.configuration.save()
+    SalesService.create_sale(enterprise, [{'stock_item_id': soda.id, 'quantity': 1}], user)
+
+    with CaptureQueriesContext(connection) as one_line:
+        SalesService.create_sale(enterprise, [{'stock_item_id': soda.id, 'quantity': 1}], user)
+    with CaptureQueriesContext(connection) as three_lines:
+        sale = SalesService.create_sale(
+            enterprise,
+            [
+                {'stock_item_id': soda.id, 'quantity': 2, 'discount': 200},
+                {'stock_item_id': bread.id, 'quantity': 1, 'unit_price': 3500},
+                {'stock_item_id': soda.id, 'quantity': 1},
+            ],
+            user,
+        )
+
+    assert len(three_lines) == len(one_line)
+    sale.refresh_from_db()
+    assert sale.sale_number
+    assert (sale.subtotal, sale.discount_amount, sale.tax_amount) == (Decimal('6500'), Decimal('200'), Decimal('630'))
+    assert sale.total_amount == sale.amount_paid == Decimal('6930')
+    assert list(sale.items.values_list('stock_item_id', 'total')) == [
+        (soda.id, Decimal('1980')), (bread.id, Decimal('3850')), (soda.id, Decimal('1100')),
+    ]
+
+
+@pytest.mark.django_db
+def test_create_sale_rejects_unknown_items(shop):
+    enterprise, user, _, _ = shop
+    with pytest.raises(ValueError, match='does not exist'):
+        SalesService.create_sale(enterprise, [{'stock_item_id': 999999, 'quantity': 1}], user)
+    with pytest.raises(ValueError, match='Invalid stock item id'):
+        SalesService.create_sale(enterprise, [{'stock_item_id': 'soda', 'quantity': 1}], user)
+
+
+@pytest.mark.django_db
+def test_create_sale_accepts_string_item_ids(shop):
+    enterprise, user, soda, _ = shop
+    sale = SalesService.create_sale(enterprise, [{'stock_item_id': str(soda.id), 'quantity': '2'}], user)
+    assert list(sale.items.values_list('stock_item_id', 'quantity')) == [(soda.id, 2)]
+
+
+@pytest.mark.django_db
+def test_complete_sale_issues_all_lines_together(shop):
+    enterprise, user, soda, bread = shop
+    sale = SalesService.create_sale(
+        enterprise,
+        [
+            {'stock_item_id': soda.id, 'quantity': 2},
+            {'stock_item_id': bread.id, 'quantity': 1},
+            {'stock_item_id': soda.id, 'quantity': 3},
+        ],
+        user,
+    )
+
+    SalesService.complete_sale(sale)
+
+    soda.refresh_from_db()
+    bread.refresh_from_db()
+    assert (soda.quantity_on_hand, bread.quantity_on_hand) == (0, 1)
+    movements = StockMovement.objects.filter(source_type='sale', source_id=sale.id)
+    assert sorted(movements.values_list('quantity', flat=True)) == [-3, -2, -1]
+    assert set(movements.values_list('unit_cost', flat=True)) == {Decimal('800'), Decimal('3000')}
+    assert sale.status == 'completed'
+
+
+@pytest.mark.django_db
+def test_complete_sale_checks_locked_quantities(shop):
+    enterprise, user, soda, _ = shop
+    first = SalesService.create_sale(enterprise, [{'stock_item_id': soda.id, 'quantity': 4}], user)
+    second = SalesService.create_sale(enterprise, [{'stock_item_id': soda.id, 'quantity': 4}], user)
+
+    SalesService.complete_sale(first)
+    # The second cashier's stale in-memory item must not allow an oversell
+    with pytest.raises(ValueError, match='Available: 1'):
+        SalesService.complete_sale(second)
+
+    soda.refresh_from_db()
+    assert soda.quantity_on_hand == 1
+    assert StockMovement.objects.filter(source_id=second.id).count() == 0
+
+
+@pytest.mark.django_db
+def test_sale_cannot_be_completed_twice(shop):
+    enterprise, user, soda, _ = shop
+    sale = SalesService.create_sale(enterprise, [{'stock_item_id': soda.id, 'quantity': 1}], user)
+    stale = type(sale).objects.get(pk=sale.pk)
+
+    SalesService.complete_sale(sale)
+    with pytest.raises(ValueError, match="status 'completed'"):
+        SalesService.complete_sale(stale)
+    soda.refresh_from_db()
+    assert soda.quantity_on_hand == 4
+
+
+@pytest.mark.django_db
+def test_issue_stock_updates_the_callers_instance(shop):
+    _, user, soda, _ = shop
+    stale = StockItem.objects.get(pk=soda.pk)
+    StockService.issue_stock(soda, 3, user)
+
+    with pytest.raises(ValueError, match='Available: 2'):
+        StockService.issue_stock(stale, 3, user)
+    movement = StockService.issue_stock(stale, 2, user)
+    assert stale.quantity_on_hand == 0
+    assert movement.quantity == -2
+
+
+@pytest.mark.django_db
+def test_stock_writers_keep_a_concurrent_sale_decrement(shop):
+    _, user, soda, _ = shop
+    stale = StockItem.objects.get(pk=soda.pk)
+    StockService.issue_stock(soda, 3, user)
+
+    # Each writer works from the locked row, not the stale copy's quantity of 5
+    StockService.receive_stock(stale, 4, Decimal('900'), user)
+    assert (stale.quantity_on_hand, stale.cost_price) == (6, Decimal('900'))
+    stale.quantity_on_hand = 5
+    with pytest.raises(ValueError, match='Available: 6'):
+        StockService.record_damage(stale, 7, 'Crushed', user)
+    StockService.record_damage(stale, 1, 'Crushed', user)
+    StockService.record_return(stale, 2, 'Unopened', user)
+    movement = StockService.adjust_stock(stale, 4, 'Count', user)
+    assert movement.quantity == -3
+    soda.refresh_from_db()
+    assert soda.quantity_on_hand == stale.quantity_on_hand == 4
+
+
+@pytest.mark.django_db
+def test_daily_summary_and_series_aggregate_cost_in_sql(shop):
+    from datetime import date, timedelta
+
+    from businesses.models import Sale
+
+    enterprise, user, soda, bread = shop
+    day = date(2025, 3, 3)
+    for items in (
+        [{'stock_item_id': soda.id, 'quantity': 2}, {'stock_item_id': bread.id, 'quantity': 1}],
+        [{'stock_item_id': soda.id, 'quantity': 1}],
+        [{'stock_item_id': bread.id, 'quantity': 1}],
+    ):
+        SalesService.complete_sale(SalesService.create_sale(enterprise, items, user))
+    # Two sales on the first day, one two days later; a draft is ignored
+    sales = list(Sale.objects.filter(enterprise=enterprise).order_by('id'))
+    Sale.objects.filter(pk__in=[sales[0].pk, sales[1].pk]).update(sale_date=day)
+    Sale.objects.filter(pk=sales[2].pk).update(sale_date=day + timedelta(days=2))
+    draft = SalesService.create_sale(enterprise, [{'stock_item_id': soda.id, 'quantity': 1}], user)
+    Sale.objects.filter(pk=draft.pk).update(sale_date=day)
+
+    with CaptureQueriesContext(connection) as queries:
+        summary = SalesService.get_daily_sales_summary(enterprise, day)
+    assert len(queries) == 1
+    assert summary['total_sales'] == 2
+    assert summary['total_revenue'] == Decimal('7000')
+    assert summary['total_cost'] == Decimal('5400')
+    assert summary['total_profit'] == Decimal('1600')
+
+    with CaptureQueriesContext(connection) as queries:
+        series = SalesService.get_daily_sales_series(enterprise, day, day + timedelta(days=2))
+    assert len(queries) == 1
+    assert [row['date'] for row in series] == [day, day + timedelta(days=1), day + timedelta(days=2)]
+    assert [row['total_sales'] for row in series] == [2, 0, 1]
+    assert [row['total_cost'] for row in series] == [Decimal('5400'), Decimal('0'), Decimal('3000')]
+    assert series[0] == summary
+
+
+@pytest.mark.django_db
+def test_stock_snapshots_roll_forward_and_value_as_of_any_date(shop):
+    from datetime import date
+
+    from businesses.models import StockSnapshot
+
+    enterprise, user, _, _ = shop
+    flour = StockItem.objects.create(enterprise=enterprise, name='Flour')
+    StockService.receive_stock(flour, 10, Decimal('500'), user, date=date(2025, 1, 5))
+    StockService.issue_stock(flour, 4, user, date=date(2025, 1, 20), source_type='sale')
+    StockService.receive_stock(flour, 5, Decimal('600'), user, date=date(2025, 2, 3))
+    StockService.record_damage(flour, 2, 'Wet', user, date=date(2025, 2, 10))
+
+    StockService.build_stock_snapshots(date(2025, 1, 31), enterprise=enterprise)
+    StockService.build_stock_snapshots(date(2025, 2, 28), enterprise=enterprise)
+    # Rebuilding a month refreshes its rows instead of duplicating them
+    StockService.build_stock_snapshots(date(2025, 1, 31), enterprise=enterprise)
+
+    january = StockSnapshot.objects.get(stock_item=flour, period_end=date(2025, 1, 31))
+    assert (january.quantity, january.unit_cost, january.value) == (6, Decimal('500'), Decimal('3000'))
+    assert (january.quantity_in, january.quantity_out, january.cogs) == (10, 4, Decimal('2000'))
+    february = StockSnapshot.objects.get(stock_item=flour, period_end=date(2025, 2, 28))
+    assert (february.quantity, february.value, february.quantity_out, february.cogs) == (9, Decimal('5400'), 2, Decimal('0'))
+
+    StockService.issue_stock(flour, 1, user, date=date(2025, 3, 2))
+    with CaptureQueriesContext(connection) as queries:
+        valuation = StockService.get_stock_valuation(enterprise, date(2025, 3, 15))
+    assert len(queries) == 1
+    position = next(row for row in valuation['items'] if row['stock_item_id'] == flour.id)
+    assert (position['quantity'], position['value']) == (8, Decimal('4800'))
+
+    # Before the first snapshot the movements are replayed
+    position = next(
+        row for row in StockService.get_stock_valuation(enterprise, date(2025, 1, 25))['items']
+        if row['stock_item_id'] == flour.id
+    )
+    assert (position['quantity'], position['value']) == (6, Decimal('3000'))
+
+    history = StockService.get_valuation_history(enterprise)
+    assert [(row['period_end'], row['cogs']) for row in history if row['total_quantity']] == [
+        (date(2025, 1, 31), Decimal('2000')), (date(2025, 2, 28), Decimal('0')),
+    ]
+
+    summary = {row['movement_type']: row for row in StockService.get_movement_summary(flour)}
+    assert summary['IN']['total_quantity'] == 15
+    assert summary['OUT']['count'] == 2
+    assert summary['DAMAGE']['total_value'] == Decimal('-1200')
+
+
+@pytest.mark.django_db
+def test_valuation_history_rejects_malformed_dates(shop):
+    enterprise, user, _, _ = shop
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = '/api/businesses/stock/valuation_history/'
+
+    response = client.get(url, {'enterprise': enterprise.id, 'start_date': '2025-13-01'})
+    assert response.status_code == 400
+    response = client.get(url, {'enterprise': enterprise.id, 'start_date': '2025-01-01', 'end_date': '2025-12-31'})
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_financial_comparison_rejects_out_of_range_years(shop):
+    enterprise, user, _, _ = shop
+    user.is_staff = True
+    user.save(update_fields=['is_staff'])
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = f'/api/businesses/enterprises/{enterprise.id}/financial_comparison/'
+
+    for year in ('0', '10000'):
+        assert client.get(url, {'year': year}).status_code == 400
+    response = client.get(url, {'year': '2025'})
+    assert response.status_code == 200
+    assert response.data['year'] == 2025
+
+
+@pytest.mark.django_db
+def test_current_valuation_matches_stock_value(shop):
+    enterprise, user, _, _ = shop
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.post('/api/businesses/stock/', {
+        'enterprise': enterprise.id, 'name': 'Milk', 'cost_price': '1500', 'selling_price': '2000',
+        'quantity_on_hand': 4,
+    }, format='json')
+    assert response.status_code == 201
+    assert response.data['quantity_on_hand'] == 4
+    milk = StockItem.objects.get(pk=response.data['id'])
+    assert milk.movements.get().notes == 'Opening stock'
+
+    # Stock only changes through movements once the item exists
+    response = client.patch(f'/api/businesses/stock/{milk.id}/', {'quantity_on_hand': 9}, format='json')
+    assert response.status_code == 400
+
+    valuation = StockService.get_stock_valuation(enterprise)
+    assert valuation['total_value'] == StockService.get_stock_value(enterprise) == Decimal('16000')
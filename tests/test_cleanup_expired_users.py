@@ -0,0 +1,39 @@
+# tests/test_cleanup_expired_users.py
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from ticketing.models import Event
+from users.models import User
+
+
+@pytest.fixture
+def event():
+    owner = User.objects.create_user(username='organizer', email='organizer@example.com', password='pass123')
+    return Event.objects.create(
+        name='Expo', date=timezone.now() + timedelta(days=1), venue='Kampala', created_by=owner
+    )
+
+
+@pytest.mark.django_db
+def test_expired_temporary_users_are_deleted_in_batches(event):
+    past = timezone.now() - timedelta(hours=1)
+    expired = [User.create_temporary_user(event, expires_at=past)[0] for _ in range(5)]
+    active, _ = User.create_temporary_user(event)
+
+    out = StringIO()
+    call_command('cleanup_expired_users', '--dry-run', stdout=out)
+    assert 'Would delete 5 expired temporary users' in out.getvalue()
+    assert User.objects.filter(is_temporary=True).count() == 6
+
+    out = StringIO()
+    call_command('cleanup_expired_users', batch_size=2, stdout=out)
+    output = out.getvalue()
+    assert output.count('✓ Deleted') == 3
+    assert 'Successfully deleted 5 expired temporary users' in output
+    assert not User.objects.filter(id__in=[user.id for user in expired]).exists()
+    assert list(User.objects.filter(is_temporary=True)) == [active]
+    assert User.objects.filter(username='organizer').exists()
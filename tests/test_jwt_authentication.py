@@ -0,0 +1,148 @@
+# tests/test_jwt_authentication.py
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from saccos.models import SaccoMember, SaccoOrganization
+from users.authentication import CachedJWTAuthentication
+from users.models import User
+
+
+@pytest.fixture
+def user(settings):
+    settings.AUTH_USER_CACHE_ENABLED = True
+    cache.clear()
+    user = User.objects.create_user(username='jwtuser', email='jwtuser@example.com', password='pass123')
+    user.preferences.timezone = 'Europe/London'
+    user.preferences.save()
+    return user
+
+
+def _authenticate(user):
+    request = Request(APIRequestFactory().get(
+        '/api/tasks/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    ))
+    return request, CachedJWTAuthentication().authenticate(request)
+
+
+@pytest.mark.django_db
+def test_user_is_served_from_the_cache_after_the_first_request(user):
+    with CaptureQueriesContext(connection) as first:
+        _, (authenticated, _) = _authenticate(user)
+    # The user row and the preferences for the timezone
+    assert len(first) == 2
+    assert authenticated == user
+
+    with CaptureQueriesContext(connection) as second:
+        _, (cached, _) = _authenticate(user)
+    assert len(second) == 0
+    assert (cached.pk, cached.email, cached.role) == (user.pk, user.email, user.role)
+    assert not cached._state.adding
+
+
+@pytest.mark.django_db
+def test_password_hash_is_not_cached(user):
+    from users.authentication import _user_version, user_cache_key
+
+    _, (authenticated, _) = _authenticate(user)
+    cached_values = cache.get(user_cache_key(user.pk, _user_version(user.pk)))
+    assert user.password not in cached_values
+
+    _, (cached, _) = _authenticate(user)
+    assert 'password' in cached.get_deferred_fields()
+    assert cached.check_password('pass123')
+
+
+@pytest.mark.django_db
+def test_user_cache_is_off_without_the_setting(user, settings):
+    settings.AUTH_USER_CACHE_ENABLED = False
+    _authenticate(user)
+    with CaptureQueriesContext(connection) as queries:
+        _authenticate(user)
+    assert any('"users_user"' in query['sql'] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_saving_the_user_invalidates_the_cached_copy(user):
+    _authenticate(user)
+    User.objects.get(pk=user.pk).save()
+    _, (fresh, _) = _authenticate(user)
+    assert fresh.email == user.email
+
+    user.is_active = False
+    user.save()
+    with pytest.raises(AuthenticationFailed):
+        _authenticate(user)
+
+
+@pytest.mark.django_db
+def test_context_is_bound_to_the_token_user(user):
+    sacco = SaccoOrganization.objects.create(name='JWT SACCO', registration_number='JWT-001')
+    SaccoMember.objects.create(user=user, sacco=sacco, member_number='JW01')
+    try:
+        request, _ = _authenticate(user)
+        assert request._request.tenant.sacco_id == sacco.id
+        assert timezone.get_current_timezone_name() == 'Europe/London'
+    finally:
+        timezone.deactivate()
+
+
+@pytest.mark.django_db
+def test_api_requests_authenticate_with_bearer_tokens(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    assert client.get('/api/tasks/').status_code == 200
+    client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+    assert client.get('/api/tasks/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_refresh_rotates_and_blacklists_without_loading_the_user(user):
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    refresh = RefreshToken.for_user(user)
+    refresh['app'] = 'sacco'
+    client = APIClient()
+    client.cookies['refresh_token'] = str(refresh)
+    _authenticate(user)  # warms the user cache
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post('/api/users/token/refresh/')
+    assert response.status_code == 200
+    assert not any('"users_user"' in query['sql'] for query in queries.captured_queries)
+    new_refresh = RefreshToken(response.cookies['refresh_token'].value)
+    assert new_refresh['app'] == 'sacco'
+    assert AccessToken(response.data['access'])['user_id'] == str(user.pk)
+    assert OutstandingToken.objects.filter(jti=new_refresh['jti'], user=user).exists()
+    assert BlacklistedToken.objects.filter(token__jti=refresh['jti']).exists()
+
+    # The rotated-out token cannot be replayed
+    client.cookies['refresh_token'] = str(refresh)
+    assert client.post('/api/users/token/refresh/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_prune_tokens_deletes_expired_tokens_in_batches(user):
+    from datetime import timedelta
+
+    from django.core.management import call_command
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    tokens = [RefreshToken.for_user(user) for _ in range(5)]
+    for token in tokens[:3]:
+        token.blacklist()
+    expired_jtis = [token['jti'] for token in tokens[1:]]
+    OutstandingToken.objects.filter(jti__in=expired_jtis).update(expires_at=timezone.now() - timedelta(hours=1))
+
+    call_command('prune_tokens', batch_size=3, stdout=open('/dev/null', 'w'))
+
+    assert list(OutstandingToken.objects.values_list('jti', flat=True)) == [tokens[0]['jti']]
+    assert list(BlacklistedToken.objects.values_list('token__jti', flat=True)) == [tokens[0]['jti']]
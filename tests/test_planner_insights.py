@@ -0,0 +1,107 @@
+# tests/test_planner_insights.py
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from common.enums import BlockStatus
+from planner.models import DailyReview, ProductivityHistogram, ProductivityInsight, TimeBlock
+from planner.services import ProductivityAnalyzer
+from users.models import User
+
+
+def _block(user, day, hour, status=BlockStatus.DONE, is_break=False):
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(day, time(hour), tz)
+    return TimeBlock.objects.create(
+        owner_user=user, title='Focus', start=start, end=start + timedelta(minutes=45),
+        status=status, is_break=is_break,
+    )
+
+
+@pytest.mark.django_db
+def test_completed_blocks_update_local_hour_histogram():
+    user = User.objects.create_user(username='histo', email='histo@example.com', password='pass123')
+    day = timezone.localdate() - timedelta(days=1)
+    _block(user, day, 9)
+    _block(user, day, 9)
+    _block(user, day, 14)
+    _block(user, day, 10, status=BlockStatus.PLANNED)
+    _block(user, day, 11, is_break=True)
+
+    histogram = ProductivityHistogram.objects.get(owner_user=user, date=day)
+    assert histogram.completed_blocks == 3
+    assert histogram.hour_counts[9] == 2
+    assert histogram.hour_counts[14] == 1
+
+    # Un-completing a block takes it back out of the histogram
+    block = TimeBlock.objects.filter(owner_user=user, start__hour=14).first()
+    block.status = BlockStatus.SKIPPED
+    block.save(update_fields=['status'])
+    histogram = ProductivityHistogram.objects.get(owner_user=user, date=day)
+    assert histogram.completed_blocks == 2
+    assert histogram.hour_counts[14] == 0
+
+
+@pytest.mark.django_db
+def test_moving_a_completed_block_rebuilds_its_old_day_and_owner(django_assert_num_queries):
+    user = User.objects.create_user(username='mover', email='mover@example.com', password='pass123')
+    other = User.objects.create_user(username='taker', email='taker@example.com', password='pass123')
+    day = timezone.localdate() - timedelta(days=2)
+    block = _block(user, day, 9)
+
+    block.start += timedelta(days=1)
+    block.end += timedelta(days=1)
+    block.save()
+    assert not ProductivityHistogram.objects.filter(owner_user=user, date=day).exists()
+    assert ProductivityHistogram.objects.get(owner_user=user, date=day + timedelta(days=1)).completed_blocks == 1
+
+    block = TimeBlock.objects.get(pk=block.pk)
+    block.owner_user = other
+    block.save(update_fields=['owner_user'])
+    assert not ProductivityHistogram.objects.filter(owner_user=user, date=day + timedelta(days=1)).exists()
+    assert ProductivityHistogram.objects.get(owner_user=other, date=day + timedelta(days=1)).completed_blocks == 1
+
+    # A full save of a block that is not and was not completed leaves the histograms alone
+    planned = _block(user, day, 10, status=BlockStatus.PLANNED)
+    planned.title = 'Renamed'
+    with django_assert_num_queries(1):
+        planned.save()
+
+
+@pytest.mark.django_db
+def test_peak_hours_come_from_histograms():
+    user = User.objects.create_user(username='peaky', email='peaky@example.com', password='pass123')
+    today = timezone.localdate()
+    for offset in range(1, 6):
+        _block(user, today - timedelta(days=offset), 10)
+        _block(user, today - timedelta(days=offset), 15)
+    _block(user, today - timedelta(days=1), 10)
+
+    # Histograms are dropped and rebuilt for the whole range by one grouped query
+    ProductivityHistogram.objects.all().delete()
+    assert ProductivityAnalyzer.rebuild_histograms(today - timedelta(days=5), today) == 5
+
+    insight = ProductivityAnalyzer(user)._analyze_peak_hours()
+    assert insight.data == {'hours': [10]}
+    assert insight.sample_size == 11
+
+
+@pytest.mark.django_db
+def test_compute_daily_metrics_processes_users_in_chunks():
+    day = date(2025, 3, 3)
+    users = [
+        User.objects.create_user(username=f'nightly{index}', email=f'nightly{index}@example.com', password='pass123')
+        for index in range(3)
+    ]
+    for user in users:
+        _block(user, day, 9)
+        for offset in range(1, 8):
+            DailyReview.objects.create(owner_user=user, date=day - timedelta(days=offset))
+
+    call_command('compute_daily_metrics', date=day.isoformat(), chunk_size=2, generate_insights=True, stdout=None)
+
+    assert DailyReview.objects.filter(date=day).count() == 3
+    assert ProductivityHistogram.objects.filter(date=day).count() == 3
+    assert ProductivityInsight.objects.filter(insight_type='peak_hours').count() == 3
@@ -0,0 +1,117 @@
+# tests/test_planner_scheduling.py
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from planner.models import AvailabilityTemplate, BreakPolicy, CalendarEvent
+from planner.scheduling import merge_intervals, pack_tasks, subtract_intervals, to_minute, from_minute
+from planner.services import SmartScheduler
+from tasks.models import Task
+from users.models import User
+
+
+def test_merge_intervals_joins_overlaps_and_drops_empty():
+    assert merge_intervals([(30, 40), (0, 10), (5, 20), (20, 25), (50, 50)]) == [(0, 25), (30, 40)]
+
+
+def test_subtract_intervals_sweeps_busy_periods():
+    windows = [(0, 100), (200, 300)]
+    busy = [(10, 20), (90, 210), (250, 260)]
+    assert subtract_intervals(windows, busy) == [(0, 10), (20, 90), (210, 250), (260, 300)]
+    assert subtract_intervals(windows, busy, min_length=15) == [(20, 90), (210, 250), (260, 300)]
+
+
+def test_pack_tasks_splits_focus_blocks_with_breaks():
+    blocks = pack_tasks([(1, 'Deep work', 50), (2, 'Email', 15)], [(0, 120)], focus_minutes=25, break_minutes=5)
+    assert blocks == [
+        (1, 'Deep work', 0, 25, False),
+        (None, 'Break', 25, 30, True),
+        (1, 'Deep work', 30, 55, False),
+        (2, 'Email', 55, 70, False),
+    ]
+
+
+def test_pack_tasks_skips_slivers_shorter_than_min_block():
+    blocks = pack_tasks([(1, 'Task', 30)], [(0, 5), (10, 60)], focus_minutes=30, break_minutes=5)
+    assert blocks == [(1, 'Task', 10, 40, False)]
+
+
+def test_minute_round_trip():
+    tz = timezone.get_current_timezone()
+    moment = datetime(2025, 3, 3, 9, 30, tzinfo=tz)
+    assert from_minute(to_minute(moment), tz) == moment
+
+
+@pytest.mark.django_db
+def test_week_schedule_query_count_does_not_grow_per_day():
+    cache.clear()
+    user = User.objects.create_user(username='planner', email='planner@example.com', password='pass123')
+    monday = date(2025, 3, 3)
+    tz = timezone.get_current_timezone()
+    for weekday in range(5):
+        AvailabilityTemplate.objects.create(owner_user=user, day_of_week=weekday, start_time=time(9), end_time=time(12))
+    BreakPolicy.objects.create(owner_user=user, focus_minutes=60, break_minutes=10)
+    CalendarEvent.objects.create(
+        owner_user=user, title='Standup',
+        start=datetime.combine(monday, time(9), tz), end=datetime.combine(monday, time(9, 30), tz),
+    )
+    Task.objects.create(title='Plan sprint', created_by=user, estimated_minutes=90)
+
+    scheduler = SmartScheduler(user)
+    with CaptureQueriesContext(connection) as day_queries:
+        day = scheduler.generate_optimized_schedule('day', monday)
+    cache.clear()
+    with CaptureQueriesContext(connection) as week_queries:
+        week = scheduler.generate_optimized_schedule('week', monday)
+
+    assert len(week_queries) == len(day_queries)
+    assert day['window_minutes'] == 150
+    # Weekdays use the templates, the weekend falls back to the 9-5 default
+    assert week['window_minutes'] == 150 + 4 * 180 + 2 * 480
+    first = day['blocks'][0]
+    assert first['start'] == datetime.combine(monday, time(9, 30), tz).isoformat()
+    assert first['end'] == (datetime.combine(monday, time(9, 30), tz) + timedelta(minutes=60)).isoformat()
+    assert day['blocks'][1]['is_break'] is True
+
+
+@pytest.mark.django_db
+def test_team_scheduler_matches_individual_schedules_and_commits():
+    from accounts.models import Department, StaffProfile
+    from planner.models import TimeBlock
+    from planner.services import TeamScheduler
+
+    cache.clear()
+    department = Department.objects.create(name='Design')
+    members = []
+    for index in range(3):
+        user = User.objects.create_user(username=f'designer{index}', email=f'designer{index}@example.com', password='pass123')
+        StaffProfile.objects.update_or_create(user=user, defaults={'department': department})
+        Task.objects.create(title=f'Own task {index}', created_by=user, estimated_minutes=40)
+        members.append(user)
+    Task.objects.create(title='Team review', assigned_team=department, estimated_minutes=30)
+    monday = date(2025, 3, 3)
+    tz = timezone.get_current_timezone()
+    AvailabilityTemplate.objects.create(owner_team=department, day_of_week=0, start_time=time(8), end_time=time(12))
+    CalendarEvent.objects.create(
+        owner_team=department, title='All hands',
+        start=datetime.combine(monday, time(8), tz), end=datetime.combine(monday, time(8, 30), tz),
+    )
+
+    team = TeamScheduler(department, workers=1)
+    schedules = team.generate_schedules('day', monday)
+    assert set(schedules) == {member.id for member in members}
+
+    for member in members:
+        cache.clear()
+        expected = SmartScheduler(User.objects.get(pk=member.pk)).generate_optimized_schedule('day', monday)
+        assert schedules[member.id] == expected
+
+    created = team.commit_schedules(schedules, 'day', monday)
+    assert TimeBlock.objects.filter(owner_user__in=members).count() == created
+    # Re-committing replaces the earlier auto blocks instead of duplicating them
+    team.commit_schedules(schedules, 'day', monday)
+    assert TimeBlock.objects.filter(owner_user__in=members).count() == created
@@ -0,0 +1,100 @@
+# tests/test_query_budgets.py
+"""
+Budgeted endpoints stay within their query budgets.
+
+The conftest turns ``QUERY_BUDGET_STRICT`` on, so a request that runs more
+queries than its view's ``query_budget`` fails here with the repeated
+statements listed.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.enums import AccountType, FinanceScope, PersonalExpenseCategory
+from finance.models import Account, PersonalTransaction, Transaction
+from saccos.models import MemberPassbook, PassbookEntry, PassbookSection, SaccoMember, SaccoOrganization
+from ticketing.models import Batch, Event, Ticket
+from users.models import User
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='budget', email='budget@example.com', password='pass123')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def passbook(user):
+    sacco = SaccoOrganization.objects.create(name='Budget SACCO', registration_number='BUD-001')
+    sacco.admins.add(user)
+    member = SaccoMember.objects.create(user=user, sacco=sacco, member_number='B001', is_chairperson=True)
+    passbook = MemberPassbook.objects.create(member=member, sacco=sacco, passbook_number='BUD-B001')
+    today = timezone.localdate()
+    for order, (name, section_type) in enumerate([('Savings', 'savings'), ('Welfare', 'welfare')]):
+        section = PassbookSection.objects.create(
+            sacco=sacco, name=name, section_type=section_type, weekly_amount=Decimal('5000'), display_order=order,
+        )
+        for weeks in range(3):
+            PassbookEntry.objects.create(
+                passbook=passbook, section=section, transaction_date=today - timedelta(weeks=weeks),
+                transaction_type='credit', amount=Decimal('5000'), description='Contribution', recorded_by=user,
+            )
+    return passbook
+
+
+def test_passbook_balances_within_budget(client, passbook):
+    response = client.get(f'/api/saccos/passbooks/{passbook.id}/balances/')
+    assert response.status_code == 200
+    assert len(response.data) == 2
+
+
+def test_sacco_dashboard_within_budget(client, passbook):
+    url = f'/api/saccos/{passbook.sacco_id}/analytics/dashboard/'
+    assert client.get(url, {'refresh': 'true'}).status_code == 200
+    assert client.get(url).status_code == 200
+
+
+def test_ticket_verify_within_budget(client, user):
+    event = Event.objects.create(
+        name='Budget Gig', date=timezone.now() + timedelta(days=1), venue='Hall', created_by=user,
+    )
+    batch = Batch.objects.create(event=event, quantity=2, created_by=user)
+    Ticket.objects.create(
+        batch=batch, short_code='BUD001', qr_code='TTBUDGET001', status='activated',
+        activated_at=timezone.now(), activated_by=user,
+    )
+
+    response = client.post('/api/ticketing/tickets/verify/', {'qr_code': 'TTBUDGET001'}, format='json')
+    assert response.data['success'] is True
+    # The duplicate path stays within the same budget
+    response = client.post('/api/ticketing/tickets/verify/', {'qr_code': 'TTBUDGET001'}, format='json')
+    assert response.data['error'] == 'Already scanned'
+
+
+def test_finance_endpoints_within_budget(client, user):
+    personal = Account.objects.create(
+        name='Wallet', type=AccountType.WALLET, scope=FinanceScope.PERSONAL, owner=user, domain='studio',
+    )
+    studio = Account.objects.create(name='Studio Bank', type=AccountType.BANK, scope=FinanceScope.COMPANY, domain='studio')
+    for days in range(3):
+        PersonalTransaction.objects.create(
+            user=user, account=personal, type='expense', amount=Decimal('1000'),
+            expense_category=PersonalExpenseCategory.choices[0][0], description='Lunch',
+            reason='Lunch', date=timezone.now() - timedelta(days=days),
+        )
+        Transaction.objects.create(
+            type='income', account=studio, amount=Decimal('50000'), description='Invoice',
+            date=timezone.localdate() - timedelta(days=days),
+        )
+
+    assert client.get('/api/finance/personal/dashboard/').status_code == 200
+    assert client.get('/api/finance/summary/').status_code == 200
@@ -84,10 +84,18 @@ class Batch(BaseModel):
         super().save(*args, **kwargs)
     
     def generate_batch_number(self):
-        """Generate a unique batch number"""
-        timestamp = timezone.now().strftime('%y%m%d')
-        random_suffix = ''.join(secrets.choice(string.digits) for _ in range(4))
-        return f"B{timestamp}{random_suffix}"
+        """Generate a unique batch number from the day's counter"""
+        from common.sequences import next_sequence_value
+
+        prefix = f"B{timezone.now().strftime('%y%m%d')}"
+
+        def last_batch_number():
+            # Earlier batches used random suffixes, so continue after the largest one
+            suffixes = Batch.objects.filter(batch_number__startswith=prefix).values_list('batch_number', flat=True)
+            return max((int(number[len(prefix):]) for number in suffixes if number[len(prefix):].isdigit()), default=0)
+
+        sequence = next_sequence_value(f"ticketing.batch:{prefix}", seed=last_batch_number)
+        return f"{prefix}{sequence:04d}"
     
     @property
     def activated_count(self):
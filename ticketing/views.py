@@ -14,6 +14,9 @@ import logging
 import json
 
 from core.api import AppContextLoggingPermission
+from common.fieldsets import SparseFieldsetMixin
+from common.pagination import EstimatedCountPagination, KeysetPagination
+from common.query_stats import query_budget
 from .models import (
     Event, EventMembership, BatchMembership,
     TicketType, Batch, Ticket, ScanLog, BatchExport, TemporaryUser,
@@ -32,7 +35,7 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
-class TicketingScopedMixin:
+class TicketingScopedMixin(SparseFieldsetMixin):
     context = "ticketing"
 
 
@@ -286,6 +289,7 @@ class BatchViewSet(TicketingScopedMixin, viewsets.ModelViewSet):
     """ViewSet for managing ticket batches"""
     queryset = Batch.objects.all()
     permission_classes = [IsAuthenticated, AppContextLoggingPermission]
+    pagination_class = EstimatedCountPagination
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -690,6 +694,7 @@ class TicketViewSet(TicketingScopedMixin, viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     @action(detail=False, methods=['post'])
+    @query_budget(8)
     def verify(self, request):
         """Verify/scan a ticket for entry"""
         from rest_framework.exceptions import PermissionDenied
@@ -828,6 +833,8 @@ class ScanLogViewSet(TicketingScopedMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ScanLog.objects.all()
     serializer_class = ScanLogSerializer
     permission_classes = [IsAuthenticated, AppContextLoggingPermission]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         """Filter scan logs with optional parameters"""
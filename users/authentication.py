@@ -0,0 +1,127 @@
+# users/authentication.py
+"""
+JWT authentication that hydrates the user from a short-lived cache.
+
+The cached payload is the user's concrete field values except the password hash,
+keyed by user id and a per-user version. Saving or deleting a user stores a new
+version, so a request that loaded the row before the change can only write to
+the abandoned key. Versions live in the cache itself, so the cache is only used
+when ``AUTH_USER_CACHE_ENABLED`` is set, which requires a cache shared by all
+workers; otherwise every request reads the user row.
+"""
+import time
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from common.request_context import RequestContext
+
+USER_CACHE_TIMEOUT = 60
+USER_VERSION_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(user_id):
+    return f"auth_user_version:{user_id}"
+
+
+def _user_version(user_id):
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = time.time_ns()
+        cache.set(_version_key(user_id), version, USER_VERSION_TIMEOUT)
+    return version
+
+
+def user_cache_key(user_id, version):
+    return f"auth_user:{user_id}:{version}"
+
+
+def invalidate_cached_user(user_id):
+    """Move the user to a new cache version (e.g. after a save or deactivation)."""
+    if user_id:
+        cache.set(_version_key(user_id), time.time_ns(), USER_VERSION_TIMEOUT)
+
+
+def _cached_field_names(user_model):
+    # The password stays deferred; it is loaded from the database only if read
+    return [field.attname for field in user_model._meta.concrete_fields if field.attname != 'password']
+
+
+def _dump(user):
+    return [getattr(user, name) for name in _cached_field_names(type(user))]
+
+
+def _load(user_model, values):
+    return user_model.from_db(router.db_for_read(user_model), _cached_field_names(user_model), values)
+
+
+def get_cached_user(user_id):
+    """Return the user for a token's user id, from the cache when possible, or None."""
+    user_model = get_user_model()
+    if not getattr(settings, 'AUTH_USER_CACHE_ENABLED', False):
+        return user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+
+    key = user_cache_key(user_id, _user_version(user_id))
+    values = cache.get(key)
+    if values is not None:
+        return _load(user_model, values)
+
+    user = user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+    if user is not None:
+        cache.set(key, _dump(user), USER_CACHE_TIMEOUT)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` with the user row served from the cache.
+
+    Once authenticated, the request's tenant/preferences context is bound to the
+    user and their timezone activated, as the middleware only sees the session user.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            self._bind_context(request, result[0])
+        return result
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+    def _bind_context(self, request, user):
+        http_request = getattr(request, '_request', request)
+        context = RequestContext(http_request, user=user)
+        http_request.tenant = context
+        if context.timezone:
+            try:
+                timezone.activate(ZoneInfo(context.timezone))
+            except Exception:
+                timezone.deactivate()
@@ -1,6 +1,8 @@
+import time
 from datetime import timedelta
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 
 from users.models import User
@@ -21,31 +23,73 @@ class Command(BaseCommand):
             default=0,
             help='Delete users expired more than N days ago (default: 0 for immediate)',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Users deleted per transaction (default: 200)',
+        )
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Keep running, cleaning up every --interval seconds',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=300,
+            help='Seconds between runs with --watch (default: 300)',
+        )
 
     def handle(self, *args, **options):
-        now = timezone.now()
-        cutoff_time = now - timedelta(days=options['days'])
-        
-        expired_users = User.objects.filter(
+        if options['dry_run']:
+            self.report(self.expired_users(options['days']))
+            return
+
+        while True:
+            self.cleanup(options['days'], max(options['batch_size'], 1))
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+    def expired_users(self, days):
+        cutoff_time = timezone.now() - timedelta(days=days)
+        return User.objects.filter(
             is_temporary=True,
             expires_at__lt=cutoff_time
         )
-        
+
+    def report(self, expired_users):
         count = expired_users.count()
-        
-        if options['dry_run']:
+        self.stdout.write(
+            self.style.WARNING(f'Would delete {count} expired temporary users')
+        )
+        for user in expired_users.only('username', 'expires_at')[:10]:  # Show first 10
+            self.stdout.write(f'  - {user.username} (expired: {user.expires_at})')
+        if count > 10:
+            self.stdout.write(f'  ... and {count - 10} more')
+
+    def cleanup(self, days, batch_size):
+        """Delete expired users in id-ordered batches, one transaction each.
+
+        Keeping batches small bounds the related rows the deletion collector
+        loads and the time any one transaction holds locks.
+        """
+        expired_users = self.expired_users(days)
+        deleted = 0
+        while True:
+            ids = list(expired_users.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                User.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            self.stdout.write(f'✓ Deleted {deleted} expired temporary users so far')
+
+        if deleted:
             self.stdout.write(
-                self.style.WARNING(f'Would delete {count} expired temporary users')
+                self.style.SUCCESS(f'Successfully deleted {deleted} expired temporary users')
             )
-            for user in expired_users[:10]:  # Show first 10
-                self.stdout.write(f'  - {user.username} (expired: {user.expires_at})')
-            if count > 10:
-                self.stdout.write(f'  ... and {count - 10} more')
         else:
-            if count > 0:
-                expired_users.delete()
-                self.stdout.write(
-                    self.style.SUCCESS(f'Successfully deleted {count} expired temporary users')
-                )
-            else:
-                self.stdout.write('No expired temporary users found')
+            self.stdout.write('No expired temporary users found')
+        return deleted
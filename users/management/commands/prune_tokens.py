@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted JWT refresh tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tokens deleted per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many tokens would be deleted without deleting',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lte=now)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f"Would delete {expired.count()} expired outstanding tokens "
+                f"({BlacklistedToken.objects.filter(token__expires_at__lte=now).count()} blacklisted)"
+            ))
+            return
+
+        batch_size = max(options['batch_size'], 1)
+        outstanding_count = 0
+        blacklisted_count = 0
+        while True:
+            # Walk by id so each batch is a short index range scan
+            ids = list(expired.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                # Blacklist rows first, so the outstanding delete has nothing to cascade
+                blacklisted_count += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                outstanding_count += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            self.stdout.write(f"✓ Deleted {len(ids)} outstanding tokens")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\nCompleted! Deleted {outstanding_count} outstanding and {blacklisted_count} blacklisted tokens."
+        ))
@@ -1,9 +1,11 @@
 # users/signals.py
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from .models import User, UserPreferences
 from accounts.models import StaffProfile, CustomerProfile
+from common.request_context import invalidate_user_context
+from .authentication import invalidate_cached_user
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -19,3 +21,12 @@ def create_user_preferences(sender, instance, created, **kwargs):
     if created:
         UserPreferences.objects.create(user=instance)
 
+
+@receiver([post_save, post_delete], sender=UserPreferences)
+def invalidate_preferences_context(sender, instance, **kwargs):
+    invalidate_user_context(instance.user_id, parts=('preferences',))
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_auth_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
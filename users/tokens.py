@@ -13,3 +13,43 @@ def decode_uid(uidb64):
         return force_str(urlsafe_base64_decode(uidb64))
     except (TypeError, ValueError, OverflowError, DjangoUnicodeDecodeError):
         return None
+
+
+def rotate_refresh_token(refresh, user_id):
+    """
+    Rotate a validated refresh token in place, following the SIMPLE_JWT settings.
+
+    Does what ``TokenRefreshSerializer`` does for rotation, but writes the
+    outstanding/blacklist rows with the known ``user_id`` instead of looking the
+    user up again for each of them.
+    """
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+    from rest_framework_simplejwt.utils import datetime_from_epoch
+
+    if not api_settings.ROTATE_REFRESH_TOKENS:
+        return refresh
+
+    if api_settings.BLACKLIST_AFTER_ROTATION:
+        outstanding, _ = OutstandingToken.objects.get_or_create(
+            jti=refresh[api_settings.JTI_CLAIM],
+            defaults={
+                'user_id': user_id,
+                'created_at': refresh.current_time,
+                'token': str(refresh),
+                'expires_at': datetime_from_epoch(refresh['exp']),
+            },
+        )
+        BlacklistedToken.objects.get_or_create(token=outstanding)
+
+    refresh.set_jti()
+    refresh.set_exp()
+    refresh.set_iat()
+    OutstandingToken.objects.create(
+        user_id=user_id,
+        jti=refresh[api_settings.JTI_CLAIM],
+        created_at=refresh.current_time,
+        token=str(refresh),
+        expires_at=datetime_from_epoch(refresh['exp']),
+    )
+    return refresh
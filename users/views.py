@@ -7,6 +7,7 @@ from rest_framework.views import APIView
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework import serializers as drf_serializers
 from django.contrib.auth import authenticate
 from django.utils import timezone
@@ -18,7 +19,8 @@ from config.settings import base
 from django.conf import settings
 from users.serializers import RegisterSerializer, LoginSerializer, PasswordResetRequestSerializer, \
     PasswordResetConfirmSerializer, UserSerializer
-from users.tokens import account_activation_token, decode_uid
+from users.authentication import get_cached_user
+from users.tokens import account_activation_token, decode_uid, rotate_refresh_token
 from users.models import User
 from users.utils import send_password_reset_email
 from django.contrib.auth import authenticate
@@ -91,101 +93,31 @@ class CookieTokenRefreshView(generics.GenericAPIView):
     serializer_class = drf_serializers.Serializer
 
     def post(self, request):
-        print(f"DEBUG: Token refresh POST method called")
+        refresh_token = request.COOKIES.get('refresh_token')
 
-        try:
-            print(f"DEBUG: Inside try block")
-            logger.info(f"🔵 [TOKEN REFRESH] Refresh attempt started", extra={
-                'timestamp': timezone.now().isoformat(),
-                'ip_address': request.META.get('REMOTE_ADDR'),
-                'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-                'cookies_present': list(request.COOKIES.keys()),
-                'has_refresh_cookie': 'refresh_token' in request.COOKIES,
-            })
-            
-            refresh_token = request.COOKIES.get('refresh_token')
-
-            if not refresh_token:
-                # Fast-fail: Don't log repeatedly, just return clear error
-                response = Response({
-                    'error': 'Missing refresh token cookie',
-                    'code': 'MISSING_REFRESH_COOKIE',
-                    'message': 'Authentication required. Please log in again.'
-                }, status=401)  # Use 401 to trigger proper logout
-                return clear_refresh_cookie(response)
+        if not refresh_token:
+            # Fast-fail: Don't log repeatedly, just return clear error
+            response = Response({
+                'error': 'Missing refresh token cookie',
+                'code': 'MISSING_REFRESH_COOKIE',
+                'message': 'Authentication required. Please log in again.'
+            }, status=401)  # Use 401 to trigger proper logout
+            return clear_refresh_cookie(response)
 
-            logger.info(f"🔵 [TOKEN REFRESH] Validating refresh token", extra={
-                'timestamp': timezone.now().isoformat(),
-                'token_preview': refresh_token[:20] + '...',
-                'token_length': len(refresh_token),
-            })
-            
+        try:
             refresh = RefreshToken(refresh_token)
-            print(f"DEBUG: RefreshToken created successfully")
-            
-            # Get user from the token payload
-            user_id = refresh.payload.get('user_id')
-            user = User.objects.get(id=user_id)
-            print(f"DEBUG: User retrieved: {user.id} - {user.username}")
-            
-            logger.info(f"🟢 [TOKEN REFRESH] Token validation successful", extra={
-                'timestamp': timezone.now().isoformat(),
-                'user_id': user.id,
-                'username': user.username,
-            })
-            
-            # Create response with new refresh token
-            new_refresh = RefreshToken.for_user(user)
-            print(f"DEBUG: New refresh token created")
 
-            app = refresh.payload.get('app')
-            if app and app in VALID_APPS:
-                new_refresh['app'] = app
-                new_refresh.access_token['app'] = app
+            # The user comes from the auth cache; claims (e.g. app) carry over on rotation
+            user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+            user = get_cached_user(user_id) if user_id else None
+            if user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user):
+                raise TokenError('No active account found for the given token')
 
-            new_refresh_token = str(new_refresh)
-            print(f"DEBUG: New refresh token string: {len(new_refresh_token)} chars")
-            
-            new_access_token = str(new_refresh.access_token)
-            print(f"DEBUG: New access token string: {len(new_access_token)} chars")
-            
-            logger.info(f"🟢 [TOKEN REFRESH] New tokens generated", extra={
-                'timestamp': timezone.now().isoformat(),
-                'user_id': user.id,
-                'new_access_token_length': len(new_access_token),
-                'new_access_token_preview': new_access_token[:20] + '...',
-                'new_refresh_token_length': len(new_refresh_token),
-                'new_refresh_token_preview': new_refresh_token[:20] + '...',
-            })
-            
-            response = Response({
-                'access': new_access_token,
-            })
-
-            # Set new refresh token cookie
-            cookie_max_age = 7 * 24 * 60 * 60  # 7 days
-            response.set_cookie(
-                'refresh_token',
-                new_refresh_token,
-                max_age=cookie_max_age,
-                **get_refresh_cookie_kwargs()
-            )
-            
-            logger.info(f"🟢 [TOKEN REFRESH] Response prepared with new tokens", extra={
-                'timestamp': timezone.now().isoformat(),
-                'user_id': user.id,
-                'new_refresh_preview': new_refresh_token[:20] + '...',
-                'cookie_domain': getattr(settings, 'SESSION_COOKIE_DOMAIN', None),
-            })
-
-            return response
+            new_access_token = str(refresh.access_token)
+            new_refresh_token = str(rotate_refresh_token(refresh, user.pk))
 
         except TokenError as e:
-            logger.warning(f"🔴 [TOKEN REFRESH] Token validation failed", extra={
-                'timestamp': timezone.now().isoformat(),
-                'error': str(e),
-                'token_preview': refresh_token[:20] + '...',
-            })
+            logger.warning("[TOKEN REFRESH] Token validation failed: %s", e)
             response = Response(
                 {
                     'error': 'Invalid or expired refresh token',
@@ -195,20 +127,26 @@ class CookieTokenRefreshView(generics.GenericAPIView):
                 status=401
             )
             return clear_refresh_cookie(response)
-        except Exception as e:
-            import traceback
-            logger.error(f"🔴 [TOKEN REFRESH] Unexpected error", extra={
-                'timestamp': timezone.now().isoformat(),
-                'error': str(e),
-                'error_type': type(e).__name__,
-                'traceback': traceback.format_exc(),
-            })
-            # Also print to console for immediate debugging
-            print(f"TOKEN REFRESH ERROR: {type(e).__name__}: {str(e)}")
-            print(f"TRACEBACK: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("[TOKEN REFRESH] Unexpected error")
             response = Response({'error': 'Token refresh failed'}, status=500)
             return clear_refresh_cookie(response)
 
+        response = Response({
+            'access': new_access_token,
+        })
+
+        # Set new refresh token cookie
+        cookie_max_age = 7 * 24 * 60 * 60  # 7 days
+        response.set_cookie(
+            'refresh_token',
+            new_refresh_token,
+            max_age=cookie_max_age,
+            **get_refresh_cookie_kwargs()
+        )
+
+        return response
+
 
 class CurrentUserView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]